@@ -1,35 +1,79 @@
 // Global variables
 let networkData = null;
+let cohortData = null;
+let shardHashes = new Map();
 let currentGovernorate = null;
 let currentView = 'post';
 let simulation = null;
 let charts = {};
 let currentZoom = null;
+let expandedClusters = new Set();
+let lodPositions = new Map();
+let clusterMembers = new Map();
+
+// Zoom scale above which visible clusters are expanded into their companies
+const LOD_EXPAND_SCALE = 1.8;
+// Member companies of each governorate's clusters, one file per governorate,
+// fetched the first time one of its clusters is expanded
+const CLUSTERS_DIR = 'governorate_clusters';
+
+// Render telemetry: measurements are POSTed to start_server.py, which
+// aggregates percentiles (GET /api/telemetry). Open with ?debug or press
+// Shift+D to show the debug overlay.
+const TELEMETRY_ENDPOINT = '/api/telemetry';
+const TELEMETRY_FLUSH_MS = 10000;
+const TELEMETRY_HISTORY = 200;
+const TELEMETRY_BATCH = 200;  // events per POST
+let telemetryQueue = [];
+let telemetryHistory = new Map();
+let telemetryPosting = location.protocol.startsWith('http');
+let debugOverlay = null;
+let renderedNodeCount = null;
 
 // Color schemes
 const nodeColors = {
     decision_maker: '#4CAF50',
     process: '#FF9800',
-    data_source: '#2196F3'
+    data_source: '#2196F3',
+    cluster: '#9C27B0'
 };
 
 // Initialize the application
 async function init() {
     try {
+        performance.mark('fetch-start');
         const response = await fetch('governorate_networks.json');
+        measureTelemetry('fetch', 'fetch-start', true);
+        performance.mark('json-start');
         networkData = await response.json();
+        measureTelemetry('json_parse', 'json-start');
+        measureTelemetry('fetch_json', 'fetch-start');
+        const payloadBytes = Number(response.headers.get('Content-Length'));
+        if (payloadBytes) recordTelemetry('payload_bytes', payloadBytes);
+        // Only start_server.py sends a shard version; plain static servers do not
+        const shardVersion = response.headers.get('X-Shard-Version');
         
-        // Populate governorate selector
-        const select = document.getElementById('governorate-select');
-        select.innerHTML = '<option value="">اختر المحافظة...</option>';
+        // Hashes of the shards just fetched, so announcements of shards we
+        // already hold are skipped. Only seeded if no change slipped in
+        // between the two requests; otherwise every announced shard is refetched.
+        if (shardVersion !== null) {
+            const manifest = await fetch('api/shards', { cache: 'no-cache' })
+                .then(r => r.ok ? r.json() : null)
+                .catch(() => null);
+            if (manifest && String(manifest.version) === shardVersion) {
+                shardHashes = new Map(Object.entries(manifest.shards));
+            }
+        }
         
-        Object.keys(networkData).sort().forEach(gov => {
-            const option = document.createElement('option');
-            option.value = gov;
-            option.textContent = `${gov} (${networkData[gov].metrics.total_companies} شركة)`;
-            select.appendChild(option);
+        await loadCohorts();
+        document.getElementById('cohort-metric').addEventListener('change', () => {
+            if (currentGovernorate) updateCohortChart(currentGovernorate);
         });
         
+        // Populate governorate selector
+        const select = document.getElementById('governorate-select');
+        populateGovernorateSelect();
+        
         // Set default governorate
         if (Object.keys(networkData).length > 0) {
             const firstGov = Object.keys(networkData).sort()[0];
@@ -44,6 +88,9 @@ async function init() {
             }
         });
         
+        initTelemetry();
+        if (shardVersion !== null) subscribeToShards(shardVersion);
+        
         document.getElementById('view-mode').addEventListener('change', (e) => {
             currentView = e.target.value;
             if (currentGovernorate) {
@@ -58,8 +105,91 @@ async function init() {
     }
 }
 
+// Implementation-year cohorts are optional (older outputs lack them)
+async function loadCohorts() {
+    cohortData = await fetch('governorate_cohorts.json', { cache: 'no-cache' })
+        .then(r => r.ok ? r.json() : null)
+        .catch(() => null);
+    document.getElementById('cohort-panel').style.display = cohortData ? '' : 'none';
+}
+
+// Fill the governorate selector from networkData, keeping the current selection
+function populateGovernorateSelect() {
+    const select = document.getElementById('governorate-select');
+    select.innerHTML = '<option value="">اختر المحافظة...</option>';
+    
+    Object.keys(networkData).sort().forEach(gov => {
+        const option = document.createElement('option');
+        option.value = gov;
+        option.textContent = `${gov} (${networkData[gov].metrics.total_companies} شركة)`;
+        select.appendChild(option);
+    });
+    if (currentGovernorate && networkData[currentGovernorate]) {
+        select.value = currentGovernorate;
+    }
+}
+
+// Live updates: start_server.py announces changed governorate shards over
+// Server-Sent Events; only those shards are refetched and re-rendered.
+// URLs are relative so the app also works under /datasets/<name>/.
+function subscribeToShards(version) {
+    if (!window.EventSource) return;
+    const events = new EventSource(`api/events?since=${encodeURIComponent(version)}`);
+    events.addEventListener('shards', (e) => applyShardChanges(JSON.parse(e.data)));
+}
+
+async function applyShardChanges(changes) {
+    const changed = Object.entries(changes.changed)
+        .filter(([gov, hash]) => shardHashes.get(gov) !== hash);
+    
+    performance.mark('shards-start');
+    const shards = await Promise.all(changed.map(async ([gov, hash]) => {
+        const response = await fetch(`api/shards/${encodeURIComponent(gov)}`);
+        return response.ok ? [gov, hash, await response.json()] : null;
+    }));
+    shards.forEach(shard => {
+        if (!shard) return;
+        const [gov, hash, data] = shard;
+        networkData[gov] = data;
+        shardHashes.set(gov, hash);
+        clusterMembers.delete(gov);
+    });
+    changes.removed.forEach(gov => {
+        delete networkData[gov];
+        shardHashes.delete(gov);
+        clusterMembers.delete(gov);
+    });
+    if (changed.length > 0) measureTelemetry('shard_refetch', 'shards-start');
+    
+    // Cohorts are one file for all governorates, rebuilt with the shards
+    const rebuilt = changed.length > 0 || changes.removed.length > 0;
+    if (rebuilt) await loadCohorts();
+    
+    populateGovernorateSelect();
+    const touched = changed.some(([gov]) => gov === currentGovernorate) ||
+        changes.removed.includes(currentGovernorate);
+    if (!touched) {
+        if (rebuilt && currentGovernorate) updateCohortChart(currentGovernorate);
+        return;
+    }
+    if (networkData[currentGovernorate]) {
+        loadGovernorate(currentGovernorate);
+    } else {
+        const first = Object.keys(networkData).sort()[0];
+        currentGovernorate = null;
+        if (first) {
+            document.getElementById('governorate-select').value = first;
+            loadGovernorate(first);
+        }
+    }
+}
+
 // Load governorate data and render
 function loadGovernorate(governorate) {
+    if (governorate !== currentGovernorate) {
+        expandedClusters = new Set();
+        lodPositions = new Map();
+    }
     currentGovernorate = governorate;
     const data = networkData[governorate];
     
@@ -69,10 +199,16 @@ function loadGovernorate(governorate) {
     updateMetrics(data.metrics);
     
     // Render network
-    renderNetwork(data);
+    if (currentView === 'lod' && expandedClusters.size > 0) {
+        renderClusters();
+    } else {
+        renderNetwork(data);
+    }
     
     // Update charts
+    performance.mark('charts-start');
     updateCharts(data);
+    measureTelemetry('chart_rebuild', 'charts-start');
 }
 
 // Update metrics display
@@ -94,7 +230,7 @@ function updateMetrics(metrics) {
         {
             title: 'المرونة في اتخاذ القرار (بعد)',
             value: metrics.avg_post_bi_agility.toFixed(1),
-            change: `+${metrics.avg_agility_improvement.toFixed(1)}`
+            change: `+${metrics.avg_agility_improvement.toFixed(1)}${formatCi(metrics, 'agility')}`
         },
         {
             title: 'الكفاءة التشغيلية (قبل)',
@@ -104,7 +240,7 @@ function updateMetrics(metrics) {
         {
             title: 'الكفاءة التشغيلية (بعد)',
             value: metrics.avg_post_bi_efficiency.toFixed(1),
-            change: `+${metrics.avg_efficiency_improvement.toFixed(1)}`
+            change: `+${metrics.avg_efficiency_improvement.toFixed(1)}${formatCi(metrics, 'efficiency')}`
         },
         {
             title: 'القرارات المبنية على البيانات (قبل)',
@@ -114,7 +250,7 @@ function updateMetrics(metrics) {
         {
             title: 'القرارات المبنية على البيانات (بعد)',
             value: `${metrics.avg_post_bi_data_driven.toFixed(1)}%`,
-            change: `+${metrics.avg_data_driven_improvement.toFixed(1)}%`
+            change: `+${metrics.avg_data_driven_improvement.toFixed(1)}%${formatCi(metrics, 'data_driven')}`
         },
         {
             title: 'نمو الإيرادات',
@@ -140,8 +276,18 @@ function updateMetrics(metrics) {
     });
 }
 
-// Render network visualization
-function renderNetwork(data) {
+// Format the bootstrap confidence interval of an improvement, if available
+function formatCi(metrics, name) {
+    const ci = metrics.improvement_ci && metrics.improvement_ci[name];
+    if (!ci) return '';
+    return ` (95%: ${ci.ci_low.toFixed(1)} – ${ci.ci_high.toFixed(1)})`;
+}
+
+// Render network visualization (members: the governorate's cluster members, if fetched)
+function renderNetwork(data, members = null) {
+    performance.mark('render-start');
+    // The previous simulation's nodes are about to be removed
+    if (simulation) simulation.stop();
     const container = document.getElementById('network-container');
     container.innerHTML = '';
     
@@ -149,10 +295,14 @@ function renderNetwork(data) {
     let network;
     if (currentView === 'pre') {
         network = data.pre_bi_network;
+    } else if (currentView === 'lod') {
+        network = buildLodNetwork(data.lod_network, members);
     } else {
         network = data.network;
     }
     
+    renderedNodeCount = network.nodes.length;
+    
     const width = container.clientWidth;
     const height = container.clientHeight;
     
@@ -169,14 +319,22 @@ function renderNetwork(data) {
         .on('zoom', (event) => {
             g.attr('transform', event.transform);
             currentZoom = event.transform;
+        })
+        .on('end', (event) => {
+            // Only user zooms expand clusters, not the transform restored below
+            if (currentView === 'lod' && event.sourceEvent && event.transform.k >= LOD_EXPAND_SCALE) {
+                expandVisibleClusters(network.nodes, event.transform, width, height);
+            }
         });
     
-    svg.call(zoom);
-    currentZoom = d3.zoomIdentity;
-    
     // Create a group for all elements
     const g = svg.append('g');
     
+    // Keep the zoom level when the clustered view is re-rendered after an expansion
+    const initialZoom = currentView === 'lod' && currentZoom ? currentZoom : d3.zoomIdentity;
+    svg.call(zoom);
+    svg.call(zoom.transform, initialZoom);
+    
     // Create tooltip
     const tooltip = d3.select('#tooltip');
     
@@ -214,7 +372,8 @@ function renderNetwork(data) {
             const strokeColors = {
                 decision_maker: '#2E7D32',
                 process: '#E65100',
-                data_source: '#1565C0'
+                data_source: '#1565C0',
+                cluster: '#6A1B9A'
             };
             return strokeColors[d.type] || '#666';
         })
@@ -228,7 +387,9 @@ function renderNetwork(data) {
                     ${d.industry ? `الصناعة: ${d.industry}<br/>` : ''}
                     ${d.agility ? `المرونة: ${d.agility.toFixed(1)}<br/>` : ''}
                     ${d.efficiency ? `الكفاءة: ${d.efficiency.toFixed(1)}<br/>` : ''}
+                    ${d.bi_year ? `سنة التطبيق: ${d.bi_year}<br/>` : ''}
                     ${d.company_count ? `عدد الشركات: ${d.company_count}` : ''}
+                    ${d.member_count ? `عدد الشركات: ${d.member_count} (انقر للتوسيع)` : ''}
                 `)
                 .style('left', (event.pageX + 10) + 'px')
                 .style('top', (event.pageY - 10) + 'px');
@@ -239,6 +400,20 @@ function renderNetwork(data) {
         })
         .on('mouseout', function() {
             tooltip.style('display', 'none');
+        })
+        .on('click', function(event, d) {
+            if (currentView !== 'lod') return;
+            const clusterId = d.type === 'cluster' ? d.id : d.cluster;
+            if (!clusterId) return;
+            // Clicking a cluster expands it, clicking one of its companies collapses it
+            if (expandedClusters.has(clusterId)) {
+                expandedClusters.delete(clusterId);
+            } else {
+                expandedClusters.add(clusterId);
+            }
+            tooltip.style('display', 'none');
+            network.nodes.forEach(n => lodPositions.set(n.id, { x: n.x, y: n.y }));
+            renderClusters();
         });
     
     // Add labels for important nodes
@@ -255,7 +430,13 @@ function renderNetwork(data) {
         .attr('dy', d => d.size + 15);
     
     // Update positions on simulation tick
+    const tickStats = { count: 0, total: 0, max: 0, start: performance.now(), last: null, frames: 0 };
     simulation.on('tick', () => {
+        const tickStart = performance.now();
+        if (tickStats.start === null) tickStats.start = tickStart;
+        if (tickStats.last !== null) tickStats.frames += tickStart - tickStats.last;
+        tickStats.last = tickStart;
+        
         link
             .attr('x1', d => d.source.x)
             .attr('y1', d => d.source.y)
@@ -269,7 +450,113 @@ function renderNetwork(data) {
         labels
             .attr('x', d => d.x)
             .attr('y', d => d.y);
+        
+        const tickTime = performance.now() - tickStart;
+        tickStats.count++;
+        tickStats.total += tickTime;
+        tickStats.max = Math.max(tickStats.max, tickTime);
     });
+    
+    simulation.on('end.telemetry', () => {
+        recordTelemetry('simulation_ticks', tickStats.count);
+        recordTelemetry('simulation_settle', performance.now() - tickStats.start);
+        if (tickStats.count > 0) {
+            recordTelemetry('tick_mean', tickStats.total / tickStats.count);
+            recordTelemetry('tick_max', tickStats.max);
+        }
+        if (tickStats.count > 1) {
+            recordTelemetry('frame_interval', tickStats.frames / (tickStats.count - 1));
+        }
+        // A drag restarts the simulation; measure that run separately
+        Object.assign(tickStats, { count: 0, total: 0, max: 0, start: null, last: null, frames: 0 });
+    });
+    
+    measureTelemetry('render_network', 'render-start');
+    
+    if (currentView === 'lod') {
+        simulation.on('end', () => {
+            network.nodes.forEach(n => lodPositions.set(n.id, { x: n.x, y: n.y }));
+        });
+    }
+}
+
+// Fetch the member companies of a governorate's clusters (once per governorate)
+function loadClusterMembers(gov) {
+    if (!clusterMembers.has(gov)) {
+        const request = fetch(`${CLUSTERS_DIR}/${encodeURIComponent(gov)}.json`)
+            .then(r => r.ok ? r.json() : {})
+            .catch(() => ({}));
+        clusterMembers.set(gov, request);
+    }
+    return clusterMembers.get(gov);
+}
+
+// Re-render the clustered view once the members of its expanded clusters are loaded
+async function renderClusters() {
+    const gov = currentGovernorate;
+    const members = await loadClusterMembers(gov);
+    if (gov !== currentGovernorate || currentView !== 'lod') return;
+    renderNetwork(networkData[gov], members);
+}
+
+// Build the clustered network, replacing expanded clusters with their member
+// companies (clusters whose members are not loaded stay collapsed)
+function buildLodNetwork(lod, members) {
+    const nodes = [];
+    const links = [];
+    const clusterNodes = new Map();
+    
+    lod.nodes.forEach(n => {
+        if (n.type === 'cluster' && expandedClusters.has(n.id) && members && members[n.id]) {
+            clusterNodes.set(n.id, n);
+            members[n.id].forEach(member => {
+                nodes.push({ ...member, cluster: n.id, ...lodPosition(member.id, n.id) });
+                links.push({
+                    source: member.id,
+                    target: n.parent,
+                    type: 'belongs_to',
+                    strength: 1.0
+                });
+            });
+        } else {
+            nodes.push({ ...n, ...lodPosition(n.id) });
+        }
+    });
+    
+    lod.links.forEach(l => {
+        if (!clusterNodes.has(l.source) && !clusterNodes.has(l.target)) {
+            links.push({ ...l });
+        }
+    });
+    
+    return { nodes, links };
+}
+
+// Last known position of a node (or of its cluster) so expansions do not reshuffle the layout
+function lodPosition(id, fallbackId) {
+    const pos = lodPositions.get(id) || (fallbackId && lodPositions.get(fallbackId));
+    if (!pos) return {};
+    return {
+        x: pos.x + (Math.random() - 0.5) * 10,
+        y: pos.y + (Math.random() - 0.5) * 10
+    };
+}
+
+// Expand every collapsed cluster whose centre is inside the zoomed viewport
+function expandVisibleClusters(nodes, transform, width, height) {
+    let changed = false;
+    nodes.forEach(n => {
+        if (n.type !== 'cluster' || expandedClusters.has(n.id)) return;
+        const [x, y] = transform.apply([n.x, n.y]);
+        if (x >= 0 && x <= width && y >= 0 && y <= height) {
+            expandedClusters.add(n.id);
+            changed = true;
+        }
+    });
+    if (changed) {
+        nodes.forEach(n => lodPositions.set(n.id, { x: n.x, y: n.y }));
+        renderClusters();
+    }
 }
 
 // Drag behavior
@@ -302,7 +589,8 @@ function getTypeName(type) {
     const names = {
         decision_maker: 'صانع القرار',
         process: 'عملية/قسم',
-        data_source: 'مصدر بيانات'
+        data_source: 'مصدر بيانات',
+        cluster: 'مجموعة شركات'
     };
     return names[type] || type;
 }
@@ -322,6 +610,9 @@ function updateCharts(data) {
     
     // Growth Chart
     updateGrowthChart(metrics);
+    
+    // Cohort trend chart
+    updateCohortChart(currentGovernorate);
 }
 
 function updatePerformanceChart(metrics) {
@@ -504,6 +795,67 @@ function updateGrowthChart(metrics) {
     });
 }
 
+// Mean improvement per BI implementation year: governorate total and each industry
+function updateCohortChart(governorate) {
+    if (!cohortData || !cohortData.governorates[governorate]) return;
+    const ctx = document.getElementById('cohort-chart');
+    if (charts.cohort) {
+        charts.cohort.destroy();
+    }
+    
+    const metric = document.getElementById('cohort-metric').value;
+    const cohorts = cohortData.governorates[governorate];
+    const palette = [
+        'rgb(255, 99, 132)', 'rgb(54, 162, 235)', 'rgb(255, 206, 86)', 'rgb(75, 192, 192)',
+        'rgb(153, 102, 255)', 'rgb(255, 159, 64)', 'rgb(199, 199, 199)'
+    ];
+    
+    const datasets = [{
+        label: 'المحافظة (الإجمالي)',
+        data: cohorts.total.mean[metric],
+        counts: cohorts.total.count,
+        borderColor: 'rgb(102, 126, 234)',
+        borderWidth: 3,
+        tension: 0.3
+    }];
+    cohortData.industries.forEach((industry, i) => {
+        if (!cohorts.count[i].some(c => c > 0)) return;
+        datasets.push({
+            label: industry,
+            data: cohorts.mean[metric][i],
+            counts: cohorts.count[i],
+            borderColor: palette[i % palette.length],
+            borderWidth: 1,
+            borderDash: [4, 3],
+            tension: 0.3
+        });
+    });
+    
+    charts.cohort = new Chart(ctx, {
+        type: 'line',
+        data: {
+            labels: cohortData.years,
+            datasets
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            spanGaps: true,
+            plugins: {
+                legend: {
+                    position: 'top',
+                },
+                tooltip: {
+                    callbacks: {
+                        label: (item) => `${item.dataset.label}: ${item.parsed.y.toFixed(2)} ` +
+                            `(${item.dataset.counts[item.dataIndex]} شركة)`
+                    }
+                }
+            }
+        }
+    });
+}
+
 // Switch view between pre and post BI
 function switchView(view) {
     currentView = view;
@@ -511,6 +863,7 @@ function switchView(view) {
     // Update toggle buttons
     document.getElementById('toggle-post').classList.toggle('active', view === 'post');
     document.getElementById('toggle-pre').classList.toggle('active', view === 'pre');
+    document.getElementById('toggle-lod').classList.toggle('active', view === 'lod');
     
     // Update select
     document.getElementById('view-mode').value = view;
@@ -559,6 +912,99 @@ function exportData() {
     URL.revokeObjectURL(url);
 }
 
+// Measure from a performance mark to now and record it for the current governorate and view
+function measureTelemetry(name, startMark, keepMark = false) {
+    performance.measure(name, startMark);
+    const entries = performance.getEntriesByName(name, 'measure');
+    recordTelemetry(name, entries[entries.length - 1].duration);
+    performance.clearMeasures(name);
+    if (!keepMark) performance.clearMarks(startMark);
+}
+
+function recordTelemetry(name, value) {
+    const event = {
+        name,
+        value,
+        governorate: currentGovernorate,
+        view: currentView,
+        nodes: renderedNodeCount
+    };
+    if (telemetryPosting) telemetryQueue.push(event);
+    
+    if (!telemetryHistory.has(name)) telemetryHistory.set(name, []);
+    const history = telemetryHistory.get(name);
+    history.push(value);
+    if (history.length > TELEMETRY_HISTORY) history.shift();
+    updateDebugOverlay();
+}
+
+// Send queued measurements; stop posting if the server has no telemetry endpoint
+function flushTelemetry(useBeacon) {
+    if (!telemetryPosting) return;
+    // Batches stay well under the server's request size limit
+    while (telemetryQueue.length > 0) {
+        const body = JSON.stringify({ events: telemetryQueue.splice(0, TELEMETRY_BATCH) });
+        if (useBeacon && navigator.sendBeacon) {
+            navigator.sendBeacon(TELEMETRY_ENDPOINT, new Blob([body], { type: 'application/json' }));
+            continue;
+        }
+        fetch(TELEMETRY_ENDPOINT, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body
+        }).then(response => {
+            if (!response.ok) telemetryPosting = false;
+        }).catch(() => {
+            telemetryPosting = false;
+        });
+    }
+}
+
+function initTelemetry() {
+    setInterval(() => flushTelemetry(false), TELEMETRY_FLUSH_MS);
+    document.addEventListener('visibilitychange', () => {
+        if (document.visibilityState === 'hidden') flushTelemetry(true);
+    });
+    document.addEventListener('keydown', (e) => {
+        if (e.shiftKey && e.key === 'D') toggleDebugOverlay();
+    });
+    if (new URLSearchParams(location.search).has('debug')) toggleDebugOverlay();
+}
+
+function toggleDebugOverlay() {
+    if (debugOverlay) {
+        debugOverlay.remove();
+        debugOverlay = null;
+        return;
+    }
+    debugOverlay = document.createElement('div');
+    debugOverlay.className = 'debug-overlay';
+    document.body.appendChild(debugOverlay);
+    updateDebugOverlay();
+}
+
+function percentile(sorted, p) {
+    return sorted[Math.min(sorted.length - 1, Math.floor(p * sorted.length))];
+}
+
+// Last value and session p50/p95 of every measurement
+function updateDebugOverlay() {
+    if (!debugOverlay) return;
+    const rows = [...telemetryHistory.entries()].map(([name, values]) => {
+        const sorted = [...values].sort((a, b) => a - b);
+        const fmt = v => v >= 100 ? v.toFixed(0) : v.toFixed(2);
+        return `<tr><td>${name}</td><td>${fmt(values[values.length - 1])}</td>` +
+            `<td>${fmt(percentile(sorted, 0.5))}</td><td>${fmt(percentile(sorted, 0.95))}</td>` +
+            `<td>${values.length}</td></tr>`;
+    });
+    debugOverlay.innerHTML = `
+        <strong>${currentGovernorate || '-'} / ${currentView}</strong>
+        <table>
+            <tr><th>metric (ms)</th><th>last</th><th>p50</th><th>p95</th><th>n</th></tr>
+            ${rows.join('')}
+        </table>`;
+}
+
 // Initialize on load
 window.addEventListener('DOMContentLoaded', init);
 
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark Harness
+Times every pipeline stage on synthetic datasets of increasing size and
+records peak memory, writing JSON results that can be compared across commits.
+
+Each (size, stage) pair runs in a fresh interpreter so peak RSS belongs to
+that stage alone (plus loading its input).
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DATA_DIR = "bench_data"
+RESULTS_DIR = "bench_results"
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+STAGES = ["load", "correct", "networks", "cube", "verify"]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB (None if unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def run_stage(stage, csv_path, work_dir):
+    """Run one stage on ``csv_path``; returns its timings"""
+    from syria_bi import build_cube, build_networks, correct, export, load, save_cube, verify
+
+    started = time.perf_counter()
+    df = load(csv_path)
+    load_seconds = time.perf_counter() - started
+    if stage in ("networks", "cube"):
+        df, _ = correct(df)
+    input_rss = peak_rss_mb()
+
+    started = time.perf_counter()
+    if stage == "correct":
+        correct(df)
+    elif stage == "networks":
+        export(build_networks(df), os.path.join(work_dir, "governorate_networks.json"))
+    elif stage == "cube":
+        save_cube(build_cube(df), os.path.join(work_dir, "governorate_cube.json"))
+    elif stage == "verify":
+        verify(df)
+    seconds = load_seconds if stage == "load" else time.perf_counter() - started
+
+    return {"seconds": seconds, "input_rss_mb": input_rss, "peak_rss_mb": peak_rss_mb()}
+
+
+def dataset(label, seed):
+    """Path of the synthetic CSV for ``label``, generating it on first use"""
+    from syria_bi.synthetic import write_synthetic_csv
+
+    path = os.path.join(DATA_DIR, f"synthetic_{label}_seed{seed}.csv")
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        print(f"Generating {path} ...", flush=True)
+        temp_path = path + ".tmp"
+        write_synthetic_csv(temp_path, SIZES[label], seed=seed)
+        os.replace(temp_path, path)
+    return path
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    import numpy
+    import pandas
+
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+    }
+
+
+def compare(results, baseline_path):
+    """Print each stage's time and peak RSS relative to a previous results file"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    previous = {(r["size"], r["stage"]): r for r in baseline["results"]}
+
+    print(f"\nCompared with {baseline_path} (commit {baseline['environment'].get('commit')})")
+    print(f"{'Size':5} | {'Stage':9} | {'Time x':>7} | {'RSS x':>7}")
+    print("-" * 38)
+    for r in results:
+        old = previous.get((r["size"], r["stage"]))
+        if old is None or "error" in r or "error" in old:
+            continue
+        time_ratio = r["seconds"] / old["seconds"] if old["seconds"] else float("nan")
+        rss_ratio = (r["peak_rss_mb"] / old["peak_rss_mb"]
+                     if r["peak_rss_mb"] and old["peak_rss_mb"] else float("nan"))
+        print(f"{r['size']:5} | {r['stage']:9} | {time_ratio:7.2f} | {rss_ratio:7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["10k", "100k"],
+                        help="dataset sizes to run (default: 10k 100k)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES,
+                        help="stages to time (default: all)")
+    parser.add_argument("--seed", type=int, default=42, help="synthetic data seed")
+    parser.add_argument("--output", help=f"results file (default: {RESULTS_DIR}/<timestamp>_<commit>.json)")
+    parser.add_argument("--compare", metavar="RESULTS", help="print ratios against an earlier results file")
+    parser.add_argument("--worker", nargs=2, metavar=("STAGE", "CSV"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        stage, csv_path = args.worker
+        with tempfile.TemporaryDirectory() as work_dir:
+            print(json.dumps(run_stage(stage, csv_path, work_dir)))
+        return
+
+    results = []
+    print(f"{'Size':5} | {'Stage':9} | {'Seconds':>9} | {'Peak RSS MiB':>12}")
+    print("-" * 45)
+    for label in args.sizes:
+        csv_path = dataset(label, args.seed)
+        for stage in args.stages:
+            proc = subprocess.run([sys.executable, __file__, "--worker", stage, csv_path],
+                                  capture_output=True, text=True)
+            record = {"size": label, "rows": SIZES[label], "stage": stage}
+            if proc.returncode != 0:
+                record["error"] = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"
+                print(f"{label:5} | {stage:9} | {'failed':>9} | {record['error']}")
+            else:
+                record.update(json.loads(proc.stdout.strip().splitlines()[-1]))
+                rss = record["peak_rss_mb"]
+                print(f"{label:5} | {stage:9} | {record['seconds']:9.2f} | "
+                      f"{rss if rss is None else format(rss, '12.1f')}")
+            results.append(record)
+
+    env = environment()
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}_{env['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"environment": env, "seed": args.seed, "results": results}, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
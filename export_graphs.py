@@ -0,0 +1,41 @@
+"""Export every governorate's network and pre_bi_network graphs to GraphML, GEXF or Parquet"""
+
+import argparse
+import os
+
+from syria_bi import EXPORT_DIR, NETWORKS_FILE, export_graphs
+from syria_bi.graph_export import FORMATS, GRAPHS
+from syria_bi.instrumentation import add_profile_arguments, profile_from_args
+from syria_bi.json_stream import iter_json_object
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--format", dest="formats", action="append", choices=FORMATS,
+                        help="output format, repeatable (default: graphml)")
+    parser.add_argument("--graph", dest="graphs", action="append", choices=GRAPHS,
+                        help="graph to export, repeatable (default: both)")
+    parser.add_argument("--input", default=NETWORKS_FILE,
+                        help="networks file written by process_data.py (default: %(default)s)")
+    parser.add_argument("--output-dir", default=EXPORT_DIR,
+                        help="directory for the exported files (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes converting governorates (default: %(default)s)")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    formats = list(dict.fromkeys(args.formats or ["graphml"]))
+    graphs = list(dict.fromkeys(args.graphs or GRAPHS))
+    with profile_from_args(args, "export_graphs"):
+        print(f"Exporting {', '.join(graphs)} from {args.input} as {', '.join(formats)}...")
+        written = export_graphs(
+            iter_json_object(args.input), args.output_dir, formats, graphs, args.workers
+        )
+
+    for path, totals in written.items():
+        print(f"  {path}: {totals['nodes']} nodes, {totals['edges']} edges")
+    print(f"\n✅ Exported {len(written)} files to '{args.output_dir}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,221 +1,107 @@
-import pandas as pd
-import json
-import numpy as np
-from collections import defaultdict
-
-# Read the CSV data (prefer corrected version if available)
-import os
-data_file = 'expanded_syria_bi_data_corrected.csv' if os.path.exists('expanded_syria_bi_data_corrected.csv') else 'expanded_syria_bi_data.csv'
-df = pd.read_csv(data_file)
-print(f"Using data file: {data_file}")
-
-# Process data for each governorate
-governorates = df['Governorate'].unique()
-industries = df['Industry'].unique()
-
-governorate_data = {}
-
-for gov in governorates:
-    gov_df = df[df['Governorate'] == gov]
-    
-    # Calculate aggregated metrics
-    metrics = {
-        'total_companies': len(gov_df),
-        'industries': gov_df['Industry'].value_counts().to_dict(),
-        'avg_pre_bi_agility': gov_df['Pre_BI_Decision_Making_Agility_Score'].mean(),
-        'avg_post_bi_agility': gov_df['Post_BI_Decision_Making_Agility_Score'].mean(),
-        'avg_pre_bi_efficiency': gov_df['Pre_BI_Operational_Efficiency_Index'].mean(),
-        'avg_post_bi_efficiency': gov_df['Post_BI_Operational_Efficiency_Index'].mean(),
-        'avg_pre_bi_data_driven': gov_df['Pre_BI_Data_Driven_Decisions_Percentage'].mean(),
-        'avg_post_bi_data_driven': gov_df['Post_BI_Data_Driven_Decisions_Percentage'].mean(),
-        'avg_revenue_growth': gov_df['Revenue_Growth_After_BI_Percentage'].mean(),
-        'avg_cost_reduction': gov_df['Cost_Reduction_After_BI_Percentage'].mean(),
-        'avg_customer_satisfaction': gov_df['Customer_Satisfaction_Increase_After_BI_Percentage'].mean(),
-        'avg_market_share': gov_df['Market_Share_Increase_After_BI_Percentage'].mean(),
-        'avg_agility_improvement': gov_df['Decision_Making_Agility_Improvement'].mean(),
-        'avg_efficiency_improvement': gov_df['Operational_Efficiency_Improvement'].mean(),
-        'avg_data_driven_improvement': gov_df['Data_Driven_Decisions_Improvement'].mean(),
-        'bi_years': sorted(gov_df['BI_Implementation_Year'].unique().tolist())
-    }
-    
-    # Generate network nodes and links
-    # Nodes: Companies (Data Sources), Industries (Processes/Silos), Governorate (Decision Maker Hub)
-    nodes = []
-    links = []
-    
-    # Add governorate as central decision maker hub
-    nodes.append({
-        'id': f'{gov}_hub',
-        'type': 'decision_maker',
-        'label': f'{gov} Hub',
-        'size': 50,
-        'group': 0
-    })
-    
-    # Add industry nodes (Processes/Silos)
-    industry_nodes = {}
-    for idx, industry in enumerate(industries):
-        industry_companies = gov_df[gov_df['Industry'] == industry]
-        if len(industry_companies) > 0:
-            node_id = f'{gov}_{industry}'
-            industry_nodes[industry] = node_id
-            nodes.append({
-                'id': node_id,
-                'type': 'process',
-                'label': industry,
-                'size': 30 + len(industry_companies) * 2,
-                'group': idx + 1,
-                'company_count': len(industry_companies)
-            })
-            
-            # Link industry to governorate hub
-            links.append({
-                'source': f'{gov}_hub',
-                'target': node_id,
-                'type': 'governance',
-                'strength': len(industry_companies) / 10
-            })
-    
-    # Add company nodes (Data Sources) - sample for visualization
-    company_sample_size = min(50, len(gov_df))  # Limit to 50 for performance
-    sampled_companies = gov_df.sample(n=company_sample_size, random_state=42) if len(gov_df) > company_sample_size else gov_df
-    
-    for idx, company in sampled_companies.iterrows():
-        company_id = f'company_{company["Company_ID"]}'
-        industry = company['Industry']
-        
-        # Determine node properties based on BI metrics
-        agility_score = company['Post_BI_Decision_Making_Agility_Score']
-        efficiency = company['Post_BI_Operational_Efficiency_Index']
-        
-        nodes.append({
-            'id': company_id,
-            'type': 'data_source',
-            'label': f"Company {company['Company_ID']}",
-            'size': 10 + (agility_score + efficiency / 10),
-            'group': industries.tolist().index(industry) + 1,
-            'industry': industry,
-            'agility': agility_score,
-            'efficiency': efficiency,
-            'data_driven': company['Post_BI_Data_Driven_Decisions_Percentage'],
-            'revenue_growth': company['Revenue_Growth_After_BI_Percentage']
-        })
-        
-        # Link company to its industry
-        if industry in industry_nodes:
-            links.append({
-                'source': company_id,
-                'target': industry_nodes[industry],
-                'type': 'belongs_to',
-                'strength': 1.0
-            })
-        
-        # Create some inter-company connections (simulating data sharing)
-        if idx % 3 == 0 and len(nodes) > 1:
-            # Connect to a random company in same industry
-            same_industry_companies = [n for n in nodes if n.get('industry') == industry and n['type'] == 'data_source']
-            if len(same_industry_companies) > 1:
-                target_company = np.random.choice([n['id'] for n in same_industry_companies if n['id'] != company_id])
-                links.append({
-                    'source': company_id,
-                    'target': target_company,
-                    'type': 'data_flow',
-                    'strength': 0.5
-                })
-    
-    # Generate pre-BI network (more fragmented, fewer connections)
-    pre_bi_nodes = []
-    pre_bi_links = []
-    
-    # Add governorate hub
-    pre_bi_nodes.append({
-        'id': f'{gov}_hub',
-        'type': 'decision_maker',
-        'label': f'{gov} Hub',
-        'size': 40,
-        'group': 0
-    })
-    
-    # Add industry nodes (more isolated)
-    for idx, industry in enumerate(industries):
-        industry_companies = gov_df[gov_df['Industry'] == industry]
-        if len(industry_companies) > 0:
-            node_id = f'{gov}_{industry}'
-            pre_bi_nodes.append({
-                'id': node_id,
-                'type': 'process',
-                'label': industry,
-                'size': 25 + len(industry_companies) * 1.5,
-                'group': idx + 1,
-                'company_count': len(industry_companies)
-            })
-            
-            # Weaker connection to hub
-            pre_bi_links.append({
-                'source': f'{gov}_hub',
-                'target': node_id,
-                'type': 'governance',
-                'strength': len(industry_companies) / 20
-            })
-    
-    # Add company nodes with pre-BI metrics
-    for idx, company in sampled_companies.iterrows():
-        company_id = f'company_{company["Company_ID"]}'
-        industry = company['Industry']
-        
-        agility_score = company['Pre_BI_Decision_Making_Agility_Score']
-        efficiency = company['Pre_BI_Operational_Efficiency_Index']
-        
-        pre_bi_nodes.append({
-            'id': company_id,
-            'type': 'data_source',
-            'label': f"Company {company['Company_ID']}",
-            'size': 8 + (agility_score + efficiency / 15),
-            'group': industries.tolist().index(industry) + 1,
-            'industry': industry,
-            'agility': agility_score,
-            'efficiency': efficiency,
-            'data_driven': company['Pre_BI_Data_Driven_Decisions_Percentage']
-        })
-        
-        # Link company to industry (weaker)
-        if industry in industry_nodes:
-            pre_bi_links.append({
-                'source': company_id,
-                'target': industry_nodes[industry],
-                'type': 'belongs_to',
-                'strength': 0.7
-            })
-        
-        # Fewer inter-company connections (fragmented)
-        if idx % 7 == 0 and len(pre_bi_nodes) > 1:
-            same_industry_companies = [n for n in pre_bi_nodes if n.get('industry') == industry and n['type'] == 'data_source']
-            if len(same_industry_companies) > 1:
-                target_company = np.random.choice([n['id'] for n in same_industry_companies if n['id'] != company_id])
-                pre_bi_links.append({
-                    'source': company_id,
-                    'target': target_company,
-                    'type': 'data_flow',
-                    'strength': 0.3
-                })
-    
-    governorate_data[gov] = {
-        'metrics': metrics,
-        'network': {
-            'nodes': nodes,
-            'links': links
-        },
-        'pre_bi_network': {
-            'nodes': pre_bi_nodes,
-            'links': pre_bi_links
-        }
-    }
-
-# Save to JSON
-with open('governorate_networks.json', 'w', encoding='utf-8') as f:
-    json.dump(governorate_data, f, indent=2, ensure_ascii=False)
-
-print(f"Processed {len(governorates)} governorates")
-print(f"Generated network data for all governorates")
-print("Data saved to governorate_networks.json")
+"""Build governorate_networks.json (with governorate_clusters/), governorate_cube.json and governorate_cohorts.json from the company CSV"""
 
+import argparse
+
+from syria_bi import (
+    CLUSTERS_DIR,
+    COHORTS_FILE,
+    COLUMN_STORE_DIR,
+    CUBE_FILE,
+    NETWORKS_FILE,
+    SKETCH_FILE,
+    build_cohorts,
+    build_cube,
+    build_lod_clusters,
+    build_networks,
+    export,
+    export_clusters,
+    load,
+    save_cohorts,
+    save_cube,
+    save_sketch,
+    write_column_store,
+)
+from syria_bi.instrumentation import add_profile_arguments, profile_from_args
+from syria_bi.sketches import DEFAULT_CHUNK_SIZE, DatasetSketch, read_chunks
+from syria_bi.storage import default_data_file
+from syria_bi.verification import CHECK_COUNTERS, CHECK_SAMPLES
+
+# Write governorate_networks.json without indentation (set False for indent=2)
+COMPACT_JSON = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sketch",
+        action="store_true",
+        help="read the CSV in chunks and build the cube, cohorts and column sketches "
+             "in one bounded-memory pass (governorate_networks.json is not rebuilt)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="rows per chunk with --sketch (default: %(default)s)")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    with profile_from_args(args, "process_data"):
+        if args.sketch:
+            process_sketch(args.chunk_size)
+        else:
+            process()
+
+
+def process():
+    # Read the CSV data (prefer corrected version if available)
+    data_file = default_data_file()
+    df = load(data_file)
+    print(f"Using data file: {data_file}")
+
+    # Stream each governorate to governorate_networks.json as soon as it is built
+    count = export(build_networks(df), NETWORKS_FILE, compact=COMPACT_JSON)
+
+    # Member companies of the clustered view, fetched when a cluster is expanded
+    export_clusters(build_lod_clusters(df), CLUSTERS_DIR)
+
+    # Save the governorate x industry x year aggregation cube
+    save_cube(build_cube(df), CUBE_FILE)
+
+    # Save the per-governorate x industry implementation-year cohorts
+    save_cohorts(build_cohorts(df), COHORTS_FILE)
+
+    # Save the memory-mapped column store with its company lookup indexes
+    write_column_store(df, COLUMN_STORE_DIR)
+
+    print(f"Processed {count} governorates")
+    print(f"Generated network data for all governorates")
+    print(f"Data saved to {NETWORKS_FILE}")
+    print(f"Cluster members saved to {CLUSTERS_DIR}/")
+    print(f"Aggregation cube saved to {CUBE_FILE}")
+    print(f"Implementation cohorts saved to {COHORTS_FILE}")
+    print(f"Column store and company indexes saved to {COLUMN_STORE_DIR}/")
+
+
+def process_sketch(chunk_size=DEFAULT_CHUNK_SIZE):
+    data_file = default_data_file()
+    print(f"Using data file: {data_file} (chunks of {chunk_size:,} rows)")
+
+    # Cube and cohort counts/sums add up across chunks; sketches merge
+    sketch = DatasetSketch(counters=CHECK_COUNTERS, samples=CHECK_SAMPLES)
+    cube = cohorts = None
+    for chunk in read_chunks(data_file, chunk_size):
+        sketch.update(chunk)
+        cube = build_cube(chunk) if cube is None else cube.merge(build_cube(chunk))
+        cohorts = build_cohorts(chunk) if cohorts is None else cohorts.merge(build_cohorts(chunk))
+
+    save_cube(cube, CUBE_FILE)
+    save_cohorts(cohorts, COHORTS_FILE)
+    save_sketch(sketch, SKETCH_FILE)
+
+    print(f"Sketched {sketch.rows:,} companies in {len(sketch.groups)} governorates")
+    print(f"Aggregation cube saved to {CUBE_FILE}")
+    print(f"Implementation cohorts saved to {COHORTS_FILE}")
+    print(f"Column sketches saved to {SKETCH_FILE}")
+    print(f"{NETWORKS_FILE} not rebuilt: networks need every company of a governorate")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Pipeline Runner
+Runs correct_data_issues -> process_data -> verify_data_accuracy / verify_data
+as one command, skipping stages whose inputs and code have not changed.
+"""
+
+import argparse
+
+from syria_bi.instrumentation import add_profile_arguments, profile_from_args
+from syria_bi.pipeline import CACHE_DIR, Pipeline, default_stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("stages", nargs="*",
+                        help="stages to bring up to date (default: all); dependencies are included")
+    parser.add_argument("--force", action="store_true", help="ignore the stage cache and rerun everything")
+    parser.add_argument("--indent", action="store_true", help="write governorate_networks.json with indent=2")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help=f"stage cache directory (default: {CACHE_DIR})")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    pipeline = Pipeline(default_stages(compact=not args.indent), cache_dir=args.cache_dir)
+    with profile_from_args(args, "run_pipeline"):
+        report = pipeline.run(args.stages or None, force=args.force)
+
+    print(f"{'Stage':20} | {'Status':7} | Seconds")
+    print("-" * 42)
+    for entry in report:
+        print(f"{entry['stage']:20} | {entry['status']:7} | {entry['seconds']:7.2f}")
+
+    if "verify_accuracy" in pipeline.stages and any(e["stage"] == "verify_accuracy" for e in report):
+        results = pipeline.value("verify_accuracy")
+        print(f"\nVerification: {results['total_issues']} issues, {results['total_warnings']} warnings")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,14 +4,495 @@ Simple HTTP server to run the interactive network visualization.
 This script starts a local web server so you can view the application in your browser.
 """
 
+import argparse
+import hashlib
 import http.server
+import json
+import math
+import multiprocessing
+import shutil
 import socketserver
+import threading
+import time
 import webbrowser
 import os
-import sys
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+from syria_bi.graph_export import FORMATS, GRAPHS, export_graphs, output_files
 
 PORT = 8000
 
+# Live shard updates: each dataset's governorate_networks.json is watched and
+# every governorate is a shard with a content hash. app.js subscribes to
+# api/events (Server-Sent Events) and refetches only changed shards.
+NETWORKS_FILE = "governorate_networks.json"
+# Files (and directories of files) a dataset directory provides; never taken
+# from the app root instead
+DATA_FILES = {NETWORKS_FILE, "governorate_cohorts.json", "governorate_cube.json"}
+DATA_DIRS = {"governorate_clusters"}
+SHARDS_PATH = "/api/shards"
+EVENTS_PATH = "/api/events"
+WATCH_INTERVAL = 1.0  # seconds between checks of the networks files
+EVENTS_KEEPALIVE = 15.0  # seconds between SSE keep-alive comments
+
+# Several datasets can be hosted at once, each under /datasets/<name>/ and
+# loaded on first access. The root path serves the first (default) dataset.
+DATASETS_PREFIX = "/datasets/"
+DATASETS_PATH = "/api/datasets"
+DEFAULT_DATASET = "default"
+MEMORY_BUDGET_MB = 512  # cached shard bytes kept across all datasets
+
+# Server-side graph export: api/export/<file> returns one of the files written
+# by export_graphs.py for the dataset's current shards, built on first request
+# and cached on disk until a shard changes
+EXPORT_PATH = "/api/export"
+EXPORT_CACHE_DIR = ".export_cache"
+EXPORT_FILES = {
+    name: (graph, fmt) for graph in GRAPHS for fmt in FORMATS for name in output_files(graph, fmt)
+}
+EXPORT_CONTENT_TYPES = {
+    "graphml": "application/graphml+xml",
+    "gexf": "application/gexf+xml",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Company lookups through the column store indexes written by process_data.py:
+# api/companies/<Company_ID>, api/companies?governorate=...[&industry=...]
+# and api/companies?year=...
+COMPANIES_PATH = "/api/companies"
+COLUMN_STORE_DIR = "company_columns"
+COMPANIES_LIMIT = 1000  # default number of ids returned by a filtered lookup
+
+# Browser render telemetry posted by app.js. Only the metrics and views
+# app.js records are kept, and governorates only if a dataset has them, so
+# clients cannot grow the store without bound.
+TELEMETRY_PATH = "/api/telemetry"
+TELEMETRY_SAMPLES = 1000  # most recent samples kept per metric / view / governorate
+TELEMETRY_MAX_BODY = 64 << 10
+TELEMETRY_METRICS = {
+    "fetch", "json_parse", "fetch_json", "payload_bytes", "shard_refetch", "chart_rebuild",
+    "render_network", "simulation_ticks", "simulation_settle", "tick_mean", "tick_max",
+    "frame_interval",
+}
+TELEMETRY_VIEWS = {"post", "pre", "lod", "compare"}
+PERCENTILES = (50, 90, 95, 99)
+
+
+class TelemetryStore:
+    """Recent telemetry samples with percentile summaries"""
+
+    def __init__(self, max_samples=TELEMETRY_SAMPLES, metrics=TELEMETRY_METRICS,
+                 views=TELEMETRY_VIEWS):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(lambda: deque(maxlen=max_samples))
+        self.metrics = metrics
+        self.views = views
+
+    def add(self, events, governorates=()):
+        """Record events of known metrics and views; the per-governorate
+        breakdown is only kept for governorates in ``governorates``"""
+        with self.lock:
+            for event in events:
+                value = event.get("value")
+                if not isinstance(value, (int, float)) or isinstance(value, bool):
+                    continue
+                if not math.isfinite(value):
+                    continue
+                name, view, gov = (event.get(key) for key in ("name", "view", "governorate"))
+                if not (isinstance(name, str) and isinstance(view, str)):
+                    continue
+                if name not in self.metrics or view not in self.views:
+                    continue
+                self.samples[(name, view, None)].append(value)
+                if isinstance(gov, str) and gov in governorates:
+                    self.samples[(name, view, gov)].append(value)
+
+    @staticmethod
+    def summarize(values):
+        ordered = sorted(values)
+        summary = {"count": len(ordered), "mean": sum(ordered) / len(ordered)}
+        for p in PERCENTILES:
+            # Nearest-rank percentile
+            rank = max(1, -(-p * len(ordered) // 100))
+            summary[f"p{p}"] = ordered[rank - 1]
+        summary["max"] = ordered[-1]
+        return summary
+
+    def report(self):
+        """{metric: {view: {'all': summary, 'governorates': {gov: summary}}}}"""
+        with self.lock:
+            items = [(key, list(values)) for key, values in self.samples.items()]
+        result = {}
+        for (name, view, gov), values in sorted(items, key=lambda item: str(item[0])):
+            entry = result.setdefault(name, {}).setdefault(view, {"governorates": {}})
+            if gov is None:
+                entry["all"] = self.summarize(values)
+            else:
+                entry["governorates"][gov] = self.summarize(values)
+        return result
+
+
+telemetry = TelemetryStore()
+
+
+class ShardStore:
+    """Shard bytes shared by every dataset, keyed by content hash.
+
+    Datasets whose shards have the same hash (e.g. governorates a correction
+    did not touch) hold the same bytes object, which is counted once.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}  # hash -> [bytes, reference count]
+        self.bytes = 0
+
+    def acquire(self, digest, data):
+        with self.lock:
+            entry = self.entries.get(digest)
+            if entry is None:
+                self.entries[digest] = [data, 1]
+                self.bytes += len(data)
+                return data
+            entry[1] += 1
+            return entry[0]
+
+    def release(self, digest):
+        with self.lock:
+            entry = self.entries[digest]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self.entries[digest]
+                self.bytes -= len(entry[0])
+
+
+class ShardCache:
+    """One networks file split into per-governorate shards with content hashes.
+
+    ``version`` increases whenever a reload changes, adds or removes a
+    shard; each shard records the version it last changed in, so clients can
+    ask for everything that changed since the version they hold. ``unload``
+    drops the bytes but keeps hashes and versions, so a reload of an
+    unchanged file announces nothing.
+    """
+
+    def __init__(self, path=NETWORKS_FILE, store=None):
+        self.path = path
+        self.store = store or ShardStore()
+        self.version = 0
+        self.loaded = False
+        self.shards = {}  # governorate -> {"hash", "bytes", "version"}
+        self.removed = {}  # governorate -> version it was removed in
+        self._stamp = None
+        self.changed = threading.Condition()
+
+    @staticmethod
+    def encode(value):
+        data = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return data, hashlib.sha256(data).hexdigest()
+
+    def refresh(self, load=True):
+        """Reload the file if it changed on disk (or, with ``load``, if it is
+        unloaded); returns True if any shard changed"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        if stamp == self._stamp and (self.loaded or not load):
+            return False
+        with open(self.path, "rb") as f:
+            data = json.loads(f.read())
+        encoded = {gov: self.encode(value) for gov, value in data.items()}
+
+        with self.changed:
+            # Take the new references before dropping the old ones, so
+            # unchanged shards are never freed and re-added
+            held = [shard["hash"] for shard in self.shards.values()] if self.loaded else []
+            shards = {}
+            updates = []
+            for gov, (shard, digest) in encoded.items():
+                previous = self.shards.get(gov)
+                shards[gov] = {
+                    "hash": digest,
+                    "bytes": self.store.acquire(digest, shard),
+                    "version": previous["version"] if previous else None,
+                }
+                if previous is None or previous["hash"] != digest:
+                    updates.append(gov)
+            for digest in held:
+                self.store.release(digest)
+            gone = [gov for gov in self.shards if gov not in encoded]
+            self.shards = shards
+            self.loaded = True
+            self._stamp = stamp
+            if not updates and not gone:
+                return False
+            self.version += 1
+            for gov in updates:
+                shards[gov]["version"] = self.version
+                self.removed.pop(gov, None)
+            for gov in gone:
+                self.removed[gov] = self.version
+            self.changed.notify_all()
+            return True
+
+    def unload(self):
+        """Release the shard bytes (hashes and versions are kept)"""
+        with self.changed:
+            if not self.loaded:
+                return
+            for shard in self.shards.values():
+                self.store.release(shard["hash"])
+                shard["bytes"] = None
+            self.loaded = False
+
+    def size(self):
+        """Bytes of the shards this cache references (shared ones included)"""
+        with self.changed:
+            if not self.loaded:
+                return 0
+            return sum(len(shard["bytes"]) for shard in self.shards.values())
+
+    def manifest(self):
+        with self.changed:
+            return {
+                "version": self.version,
+                "shards": {gov: shard["hash"] for gov, shard in sorted(self.shards.items())},
+            }
+
+    def changes_since(self, since):
+        """Shards changed and removed after version ``since``"""
+        with self.changed:
+            return {
+                "version": self.version,
+                "changed": {
+                    gov: shard["hash"] for gov, shard in sorted(self.shards.items())
+                    if shard["version"] > since
+                },
+                "removed": sorted(gov for gov, version in self.removed.items() if version > since),
+            }
+
+    def snapshot(self):
+        """``(version, [(governorate, hash, bytes), ...])`` of a loaded cache"""
+        with self.changed:
+            return self.version, [
+                (gov, shard["hash"], shard["bytes"]) for gov, shard in self.shards.items()
+            ]
+
+    def shard(self, gov):
+        with self.changed:
+            shard = self.shards.get(gov)
+            return dict(shard) if shard else None
+
+    def wait(self, since, timeout):
+        """Block until the version passes ``since`` or ``timeout`` expires"""
+        with self.changed:
+            return self.changed.wait_for(lambda: self.version > since, timeout)
+
+
+class Dataset:
+    """A named directory holding a networks file (and cohorts, cube, ...)"""
+
+    def __init__(self, name, directory, store):
+        self.name = name
+        self.directory = directory
+        self.shards = ShardCache(os.path.join(directory, NETWORKS_FILE), store)
+        self.last_used = 0.0
+        self.subscribers = 0  # open event streams; watched even when unloaded
+        self.users = 0  # responses reading the shard bytes; never evicted meanwhile
+        self.company_index = None  # (stamp, CompanyIndex) cached by DatasetRegistry
+
+
+class DatasetRegistry:
+    """Datasets loaded on first access and evicted least recently used first
+    once the shared shard bytes exceed ``budget`` bytes"""
+
+    def __init__(self, datasets, budget=MEMORY_BUDGET_MB << 20):
+        self.store = ShardStore()
+        self.budget = budget
+        self.lock = threading.RLock()
+        self.datasets = {
+            name: Dataset(name, directory, self.store) for name, directory in datasets.items()
+        }
+        self.default = next(iter(self.datasets))
+
+    def __contains__(self, name):
+        return name in self.datasets
+
+    def get(self, name=None):
+        """The dataset, loaded (None if unknown or its file is missing)"""
+        dataset = self.datasets.get(name or self.default)
+        if dataset is None:
+            return None
+        with self.lock:
+            try:
+                dataset.shards.refresh()
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Could not load {dataset.shards.path}: {e}")
+            if not dataset.shards.loaded:
+                return None
+            dataset.last_used = time.monotonic()
+            self.enforce_budget(keep=dataset)
+        return dataset
+
+    @contextmanager
+    def use(self, name=None):
+        """``get`` the dataset and pin it against eviction until the block exits"""
+        with self.lock:
+            dataset = self.get(name)
+            if dataset is not None:
+                dataset.users += 1
+        try:
+            yield dataset
+        finally:
+            if dataset is not None:
+                with self.lock:
+                    dataset.users -= 1
+                    self.enforce_budget()
+
+    def enforce_budget(self, keep=None):
+        with self.lock:
+            loaded = sorted(
+                (
+                    d for d in self.datasets.values()
+                    if d.shards.loaded and d is not keep and not d.users
+                ),
+                key=lambda d: d.last_used,
+            )
+            while self.store.bytes > self.budget and loaded:
+                dataset = loaded.pop(0)
+                dataset.shards.unload()
+                dataset.company_index = None
+                print(f"♻️  Evicted dataset '{dataset.name}' (memory budget)")
+
+    def company_index(self, dataset):
+        """The dataset's company index, opened once and reused until the
+        dataset reloads or is evicted or its column store is rewritten.
+        Raises OSError or ValueError if the column store is missing."""
+        # Imported here so NumPy and pandas are only loaded when lookups are used
+        from syria_bi.columnstore import MANIFEST
+        from syria_bi.indexes import open_company_index
+
+        directory = os.path.join(dataset.directory, COLUMN_STORE_DIR)
+        with self.lock:
+            stat = os.stat(os.path.join(directory, MANIFEST))
+            stamp = (dataset.shards.version, stat.st_ino, stat.st_mtime_ns)
+            if dataset.company_index is None or dataset.company_index[0] != stamp:
+                dataset.company_index = (stamp, open_company_index(directory))
+            return dataset.company_index[1]
+
+    def governorates(self):
+        """Governorates of every dataset read so far (loaded or not)"""
+        with self.lock:
+            return {gov for d in self.datasets.values() for gov in d.shards.shards}
+
+    def describe(self):
+        return {
+            "default": self.default,
+            "memory": {
+                "budget": self.budget,
+                "cached_bytes": self.store.bytes,
+                # bytes the datasets reference minus the bytes held once
+                "shared_bytes": sum(d.shards.size() for d in self.datasets.values()) - self.store.bytes,
+            },
+            "datasets": [
+                {
+                    "name": d.name,
+                    "directory": d.directory,
+                    "loaded": d.shards.loaded,
+                    "version": d.shards.version,
+                    "shards": len(d.shards.shards),
+                    "bytes": d.shards.size(),
+                    "subscribers": d.subscribers,
+                }
+                for d in self.datasets.values()
+            ],
+        }
+
+    def watch(self, interval=WATCH_INTERVAL):
+        """Poll the loaded and subscribed datasets forever (run in a daemon thread)"""
+        while True:
+            for dataset in list(self.datasets.values()):
+                if not (dataset.shards.loaded or dataset.subscribers):
+                    continue
+                try:
+                    with self.lock:
+                        if dataset.shards.refresh(load=False):
+                            print(f"🔄 {dataset.shards.path} changed (shard version {dataset.shards.version})")
+                            self.enforce_budget(keep=dataset)
+                except (OSError, ValueError) as e:
+                    print(f"⚠️  Could not reload {dataset.shards.path}: {e}")
+            time.sleep(interval)
+
+
+registry = DatasetRegistry({DEFAULT_DATASET: "."})
+
+
+class ExportCache:
+    """Exported graph files under ``directory/<dataset>/<digest>/``, where the
+    digest covers the shard hashes they were built from. Concurrent requests
+    for the same file wait for a single build; builds for older digests are
+    removed once a newer one completes."""
+
+    def __init__(self, directory=EXPORT_CACHE_DIR, workers=None):
+        self.directory = directory
+        self.workers = workers or os.cpu_count() or 1
+        self.lock = threading.Lock()
+        self.building = {}  # (dataset, digest, graph, format) -> Lock
+
+    @staticmethod
+    def digest(hashes):
+        """Digest of ``[(governorate, shard hash), ...]``"""
+        return hashlib.sha256(json.dumps(sorted(hashes)).encode("utf-8")).hexdigest()[:16]
+
+    def get(self, dataset, graph, fmt):
+        """Directory holding the current export of ``graph`` as ``fmt``"""
+        _, shards = dataset.shards.snapshot()
+        digest = self.digest([(gov, shard_hash) for gov, shard_hash, _ in shards])
+        root = os.path.join(self.directory, quote(dataset.name, safe=""))
+        directory = os.path.join(root, digest)
+        paths = [os.path.join(directory, name) for name in output_files(graph, fmt)]
+        key = (dataset.name, digest, graph, fmt)
+        with self.lock:
+            build = self.building.setdefault(key, threading.Lock())
+        with build:
+            if not all(os.path.exists(path) for path in paths):
+                networks = ((gov, json.loads(data)) for gov, _, data in shards)
+                # Worker processes are spawned rather than forked from this
+                # multi-threaded server
+                export_graphs(networks, directory, [fmt], [graph], self.workers,
+                              mp_context=multiprocessing.get_context("spawn"))
+        current = self.digest(dataset.shards.manifest()["shards"].items())
+        with self.lock:
+            self.building.pop(key, None)
+            if digest == current:
+                # Older builds are stale unless a request is still building one
+                active = {digest} | {k[1] for k in self.building if k[0] == dataset.name}
+                for name in os.listdir(root):
+                    if name not in active:
+                        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+        return directory
+
+
+exports = ExportCache()
+
+
+def split_dataset_path(path):
+    """``(dataset name, path within the dataset)``; the name is None for
+    paths outside /datasets/"""
+    if not path.startswith(DATASETS_PREFIX):
+        return None, path
+    name, _, rest = path[len(DATASETS_PREFIX):].partition("/")
+    return unquote(name), "/" + rest
+
+
+class ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True  # as http.server.HTTPServer, for quick restarts
+
 
 class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     def end_headers(self):
@@ -21,34 +502,290 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         self.send_header("Access-Control-Allow-Headers", "Content-Type")
         super().end_headers()
 
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.end_headers()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == TELEMETRY_PATH:
+            self.send_json(200, telemetry.report())
+            return
+        if url.path == DATASETS_PATH:
+            self.send_json(200, registry.describe())
+            return
+        name, path = split_dataset_path(url.path)
+        if name is not None and name not in registry:
+            self.send_error(404, f"Unknown dataset: {name}")
+        elif path == "/" + NETWORKS_FILE:
+            self.with_dataset(name, self.send_networks)
+        elif path == SHARDS_PATH:
+            self.with_dataset(name, lambda dataset: self.send_json(200, dataset.shards.manifest()))
+        elif path.startswith(SHARDS_PATH + "/"):
+            gov = unquote(path[len(SHARDS_PATH) + 1:])
+            self.with_dataset(name, lambda dataset: self.send_shard(dataset, gov))
+        elif path == EVENTS_PATH:
+            # Long-lived and reads only hashes, so the dataset is not pinned
+            self.with_dataset(name, lambda dataset: self.send_events(dataset, url.query), pin=False)
+        elif path == COMPANIES_PATH or path.startswith(COMPANIES_PATH + "/"):
+            self.send_companies(name, unquote(path[len(COMPANIES_PATH) + 1:]), url.query)
+        elif path.startswith(EXPORT_PATH + "/"):
+            filename = unquote(path[len(EXPORT_PATH) + 1:])
+            self.with_dataset(name, lambda dataset: self.send_export(dataset, filename))
+        else:
+            super().do_GET()
+
+    def translate_path(self, path):
+        # /datasets/<name>/<file>, and /<file> for the default dataset: the
+        # dataset's own file if it has one, otherwise the app from the server
+        # root. Data files (e.g. governorate_cohorts.json, governorate_clusters/)
+        # only ever come from the dataset, so its pages never mix in another
+        # dataset's data.
+        name, rest = split_dataset_path(urlsplit(path).path)
+        if name is None:
+            name = registry.default
+        elif name not in registry:
+            return super().translate_path(path)
+        root = self.directory
+        try:
+            self.directory = os.path.join(root, registry.datasets[name].directory)
+            local = super().translate_path(rest)
+        finally:
+            self.directory = root
+        if (os.path.exists(local) or os.path.basename(rest) in DATA_FILES
+                or rest.lstrip("/").partition("/")[0] in DATA_DIRS):
+            return local
+        return super().translate_path(rest)
+
+    def with_dataset(self, name, send, pin=True):
+        with registry.use(name) if pin else nullcontext(registry.get(name)) as dataset:
+            if dataset is None:
+                self.send_error(404, f"No {NETWORKS_FILE} for dataset: {name or registry.default}")
+            else:
+                send(dataset)
+
+    def send_networks(self, dataset):
+        # Assembled from the shard cache so the version header matches the body
+        version, shards = dataset.shards.snapshot()
+        parts = [b"{"]
+        for i, (gov, _, data) in enumerate(shards):
+            key = json.dumps(gov, ensure_ascii=False).encode("utf-8")
+            parts.extend([b"," if i else b"", key, b":", data])
+        parts.append(b"}")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(sum(len(part) for part in parts)))
+        self.send_header("X-Shard-Version", str(version))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        for part in parts:
+            self.wfile.write(part)
+
+    def send_shard(self, dataset, gov):
+        shard = dataset.shards.shard(gov)
+        if shard is None or shard["bytes"] is None:
+            self.send_error(404)
+            return
+        etag = f'"{shard["hash"]}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(shard["bytes"])))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(shard["bytes"])
+
+    def send_events(self, dataset, query):
+        """Server-Sent Events: one 'shards' event per change after the client's version"""
+        shards = dataset.shards
+        # EventSource resends the last event id when it reconnects
+        since = self.headers.get("Last-Event-ID") or parse_qs(query).get("since", ["0"])[0]
+        try:
+            since = int(since)
+        except ValueError:
+            since = 0
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        # The watcher reads subscribers under the registry lock
+        with registry.lock:
+            dataset.subscribers += 1
+        try:
+            while True:
+                if shards.version > since:
+                    changes = shards.changes_since(since)
+                    since = changes["version"]
+                    self.wfile.write(
+                        f"id: {since}\nevent: shards\ndata: {json.dumps(changes)}\n\n".encode("utf-8")
+                    )
+                    self.wfile.flush()
+                elif not shards.wait(since, EVENTS_KEEPALIVE):
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with registry.lock:
+                dataset.subscribers -= 1
+
+    def send_companies(self, name, company_id, query):
+        dataset = registry.datasets[name or registry.default]
+        try:
+            index = registry.company_index(dataset)
+        except (OSError, ValueError):
+            self.send_error(404, f"No {COLUMN_STORE_DIR} for dataset: {dataset.name} "
+                                 "(run process_data.py)")
+            return
+        if company_id:
+            record = index.company(int(company_id)) if company_id.lstrip("-").isdigit() else None
+            if record is None:
+                self.send_error(404, f"Unknown company: {company_id}")
+            else:
+                self.send_json(200, record)
+            return
+        params = {key: values[0] for key, values in parse_qs(query).items()}
+        try:
+            limit = int(params.get("limit", COMPANIES_LIMIT))
+            if "year" in params:
+                ids = index.ids_in_year(int(params["year"]))
+            elif "governorate" in params:
+                ids = index.ids_in(params["governorate"], params.get("industry"))
+            else:
+                raise ValueError("filter by governorate (and industry) or year")
+        except ValueError as e:
+            self.send_error(400, str(e))
+            return
+        self.send_json(200, {"total": len(ids), "ids": ids[:max(limit, 0)].tolist()})
+
+    def send_export(self, dataset, filename):
+        if filename not in EXPORT_FILES:
+            self.send_error(404, f"Unknown export: {filename}")
+            return
+        graph, fmt = EXPORT_FILES[filename]
+        try:
+            directory = exports.get(dataset, graph, fmt)
+            f = open(os.path.join(directory, filename), "rb")
+        except ImportError as e:  # parquet without pyarrow
+            self.send_error(501, str(e))
+            return
+        except OSError:  # superseded by a newer build while this one streamed
+            self.send_error(503, "Export is being rebuilt, retry")
+            return
+        with f:
+            self.send_response(200)
+            self.send_header("Content-Type", EXPORT_CONTENT_TYPES[fmt])
+            self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+            self.send_header(
+                "Content-Disposition", f'attachment; filename="{dataset.name}_{filename}"'
+            )
+            self.end_headers()
+            shutil.copyfileobj(f, self.wfile)
+
+    def do_POST(self):
+        if self.path.split("?")[0] != TELEMETRY_PATH:
+            self.send_error(404)
+            return
+        # Reading trusts the length, so only a plain non-negative integer up
+        # to the maximum is accepted
+        length = self.headers.get("Content-Length", "")
+        if not (length.isascii() and length.isdigit()):
+            self.send_error(400, "Content-Length must be a non-negative integer")
+            return
+        if int(length) > TELEMETRY_MAX_BODY:
+            self.send_error(413)
+            return
+        try:
+            events = json.loads(self.rfile.read(int(length)))["events"]
+            telemetry.add(
+                [event for event in events if isinstance(event, dict)], registry.governorates()
+            )
+        except (ValueError, KeyError, TypeError):
+            self.send_error(400)
+            return
+        self.send_response(204)
+        self.end_headers()
+
+
+def parse_dataset(value):
+    name, sep, directory = value.partition("=")
+    if not sep or not name or "/" in name:
+        raise argparse.ArgumentTypeError(f"expected NAME=DIRECTORY, got {value!r}")
+    return name, directory
+
 
 def main():
+    global registry
+
+    parser = argparse.ArgumentParser(description="Serve the interactive network visualization")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument(
+        "--dataset",
+        dest="datasets",
+        action="append",
+        type=parse_dataset,
+        metavar="NAME=DIRECTORY",
+        help="host the outputs in DIRECTORY under /datasets/NAME/ (repeatable; "
+             "the first one is also served at /). Default: the current directory",
+    )
+    parser.add_argument("--memory-budget", type=int, default=MEMORY_BUDGET_MB, metavar="MB",
+                        help="cached shard bytes kept across datasets (default: %(default)s)")
+    args = parser.parse_args()
+    port = args.port
+
     # Check if data file exists
-    if not os.path.exists("governorate_networks.json"):
+    if not args.datasets and not os.path.exists("governorate_networks.json"):
         print("⚠️  Warning: governorate_networks.json not found!")
-        print("   Running process_data.py to generate it...")
-        import subprocess
+        print("   Running the processing pipeline to generate it...")
+        # Imported here so pandas is only loaded when regeneration is needed
+        import syria_bi
 
-        result = subprocess.run(
-            [sys.executable, "process_data.py"], capture_output=True, text=True
-        )
-        if result.returncode != 0:
+        try:
+            df = syria_bi.load()
+            syria_bi.export(syria_bi.build_networks(df))
+            syria_bi.export_clusters(syria_bi.build_lod_clusters(df))
+            syria_bi.save_cube(syria_bi.build_cube(df))
+            syria_bi.save_cohorts(syria_bi.build_cohorts(df))
+            syria_bi.write_column_store(df, COLUMN_STORE_DIR)
+        except Exception as e:
             print("❌ Error processing data:")
-            print(result.stderr)
+            print(e)
             return
         print("✅ Data processed successfully!")
 
-    # Start server
+    # Datasets are loaded on first request; loaded ones are watched for changes
+    registry = DatasetRegistry(dict(args.datasets or [(DEFAULT_DATASET, ".")]),
+                               args.memory_budget << 20)
+    for dataset in registry.datasets.values():
+        if not os.path.exists(dataset.shards.path):
+            print(f"⚠️  Warning: {dataset.shards.path} not found (dataset '{dataset.name}')")
+    threading.Thread(target=registry.watch, daemon=True).start()
+
+    # Start server (threaded, so open event streams do not block other requests)
     handler = MyHTTPRequestHandler
 
     try:
-        with socketserver.TCPServer(("", PORT), handler) as httpd:
-            url = f"http://localhost:{PORT}/index.html"
+        with ThreadingServer(("", port), handler) as httpd:
+            url = f"http://localhost:{port}/index.html"
             print(f"\n{'='*60}")
             print(f"🚀 Server started successfully!")
             print(f"{'='*60}")
             print(f"📊 Open your browser and navigate to:")
             print(f"   {url}")
+            if args.datasets:
+                for name in registry.datasets:
+                    print(f"   http://localhost:{port}{DATASETS_PREFIX}{quote(name)}/index.html")
             print(f"\n💡 Press Ctrl+C to stop the server")
             print(f"{'='*60}\n")
 
@@ -64,9 +801,9 @@ def main():
         print("\n\n👋 Server stopped. Goodbye!")
     except OSError as e:
         if e.errno == 98 or e.errno == 48:  # Address already in use
-            print(f"\n❌ Port {PORT} is already in use!")
+            print(f"\n❌ Port {port} is already in use!")
             print(
-                f"   Please close the application using that port or change PORT in this script."
+                f"   Please close the application using that port or start with --port."
             )
         else:
             print(f"\n❌ Error starting server: {e}")
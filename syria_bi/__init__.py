@@ -0,0 +1,82 @@
+"""
+Syria BI processing pipeline as an importable package.
+
+    import syria_bi
+
+    df, corrections = syria_bi.correct(syria_bi.load(syria_bi.RAW_DATA_FILE))
+    results = syria_bi.verify(df)
+    syria_bi.export(syria_bi.build_networks(df))
+
+Stages pass DataFrames in memory. pandas and NumPy are only imported when a
+stage is first used, so importing the package itself is cheap.
+"""
+
+import importlib
+
+from .paths import (
+    CLUSTERS_DIR,
+    COHORTS_FILE,
+    COLUMN_STORE_DIR,
+    CORRECTED_DATA_FILE,
+    CORRECTIONS_LOG_FILE,
+    CUBE_FILE,
+    EXPORT_DIR,
+    NETWORKS_FILE,
+    RAW_DATA_FILE,
+    SKETCH_FILE,
+    VERIFICATION_REPORT_FILE,
+)
+
+# Public name -> submodule that defines it (imported on first access)
+_LAZY_ATTRIBUTES = {
+    "load": "storage",
+    "export": "storage",
+    "export_clusters": "storage",
+    "load_networks": "storage",
+    "correct": "correction",
+    "build_networks": "networks",
+    "build_lod_clusters": "networks",
+    "verify": "verification",
+    "summarize_networks": "verification",
+    "build_cube": "cube",
+    "save_cube": "cube",
+    "load_cube": "cube",
+    "build_cohorts": "cohorts",
+    "save_cohorts": "cohorts",
+    "load_cohorts": "cohorts",
+    "write_column_store": "columnstore",
+    "open_column_store": "columnstore",
+    "open_company_index": "indexes",
+    "sketch_csv": "sketches",
+    "save_sketch": "sketches",
+    "load_sketch": "sketches",
+    "export_graphs": "graph_export",
+}
+
+__all__ = [
+    "CLUSTERS_DIR",
+    "COHORTS_FILE",
+    "COLUMN_STORE_DIR",
+    "CORRECTED_DATA_FILE",
+    "CORRECTIONS_LOG_FILE",
+    "CUBE_FILE",
+    "EXPORT_DIR",
+    "NETWORKS_FILE",
+    "RAW_DATA_FILE",
+    "SKETCH_FILE",
+    "VERIFICATION_REPORT_FILE",
+    *_LAZY_ATTRIBUTES,
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module(f".{_LAZY_ATTRIBUTES[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,157 @@
+"""
+Implementation Cohorts
+Mean pre/post BI improvements and company counts by BI_Implementation_Year
+cohort, as dense year-indexed arrays for every governorate x industry.
+
+Years run over the full range of the dataset, so position ``i`` of every
+array is ``years[i]`` and cohorts without companies have count 0 and a
+null mean.
+"""
+
+import json
+
+import numpy as np
+
+from .instrumentation import timer
+from .paths import COHORTS_FILE
+from .stats import PAIRED_METRICS
+
+# Decimal places kept for means in the saved file
+MEAN_DECIMALS = 4
+
+
+class CohortTable:
+    """Dense cohort arrays: ``count`` is (G, I, Y), ``sums`` is (G, I, Y, M)"""
+
+    def __init__(self, governorates, industries, years, metrics, count, sums):
+        self.governorates = list(governorates)
+        self.industries = list(industries)
+        self.years = list(years)
+        self.metrics = list(metrics)
+        self.count = np.asarray(count, dtype=np.int64)
+        self.sums = np.asarray(sums, dtype=np.float64)
+
+    def _slice(self, governorate, industry=None):
+        g = self.governorates.index(governorate)
+        if industry is None:
+            return self.count[g].sum(axis=0), self.sums[g].sum(axis=0)
+        i = self.industries.index(industry)
+        return self.count[g, i], self.sums[g, i]
+
+    def series(self, governorate, metric, industry=None):
+        """Year-indexed mean of ``metric`` (NaN for empty cohorts) and counts"""
+        count, sums = self._slice(governorate, industry)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = sums[:, self.metrics.index(metric)] / count
+        return mean, count
+
+    @staticmethod
+    def _means(count, sums):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.round(sums / count[..., None], MEAN_DECIMALS)
+        # metric-major nested lists with None for empty cohorts
+        mean = np.moveaxis(mean, -1, 0)
+        return [np.where(np.isnan(m), None, m).tolist() for m in mean]
+
+    def merge(self, other):
+        """Table over both tables' governorates, industries and years with counts
+        and sums added (e.g. of two chunks of the dataset)"""
+        if other.metrics != self.metrics:
+            raise ValueError("Cannot merge cohort tables with different metrics")
+        governorates = sorted(set(self.governorates) | set(other.governorates))
+        industries = sorted(set(self.industries) | set(other.industries))
+        years = list(range(min(self.years + other.years), max(self.years + other.years) + 1))
+        shape = (len(governorates), len(industries), len(years))
+        count = np.zeros(shape, dtype=np.int64)
+        sums = np.zeros(shape + (len(self.metrics),))
+        for table in (self, other):
+            cells = np.ix_(
+                np.searchsorted(governorates, table.governorates),
+                np.searchsorted(industries, table.industries),
+                np.asarray(table.years, dtype=np.int64) - years[0],
+            )
+            count[cells] += table.count
+            sums[cells] += table.sums
+        return CohortTable(governorates, industries, years, self.metrics, count, sums)
+
+    def to_dict(self):
+        """Compact JSON form: per governorate, industry x year count, mean and
+        sum arrays (means are rounded for display, sums are exact)"""
+        governorates = {}
+        for g, gov in enumerate(self.governorates):
+            count, sums = self.count[g], self.sums[g]
+            total_count, total_sums = count.sum(axis=0), sums.sum(axis=0)
+            governorates[gov] = {
+                "count": count.tolist(),
+                "mean": dict(zip(self.metrics, self._means(count, sums))),
+                "sum": dict(zip(self.metrics, np.moveaxis(sums, -1, 0).tolist())),
+                "total": {
+                    "count": total_count.tolist(),
+                    "mean": dict(zip(self.metrics, self._means(total_count, total_sums))),
+                },
+            }
+        return {
+            "years": self.years,
+            "industries": self.industries,
+            "metrics": self.metrics,
+            "governorates": governorates,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        governorates = list(data["governorates"])
+        count = np.array([data["governorates"][g]["count"] for g in governorates], dtype=np.int64)
+        sums = np.array(
+            [[data["governorates"][g]["sum"][m] for m in data["metrics"]] for g in governorates],
+            dtype=np.float64,
+        )
+        # (G, M, I, Y) -> (G, I, Y, M)
+        sums = np.moveaxis(sums, 1, -1)
+        return cls(governorates, data["industries"], data["years"], data["metrics"], count, sums)
+
+
+def build_cohorts(df, metrics=PAIRED_METRICS):
+    """Build the cohort table from the company DataFrame in one grouped pass"""
+    with timer("cohorts"):
+        governorates = sorted(df["Governorate"].unique().tolist())
+        industries = sorted(df["Industry"].unique().tolist())
+        year_values = df["BI_Implementation_Year"].to_numpy(dtype=np.int64)
+        first_year = int(year_values.min())
+        years = list(range(first_year, int(year_values.max()) + 1))
+
+        shape = (len(governorates), len(industries), len(years))
+        flat = np.ravel_multi_index(
+            (
+                np.searchsorted(governorates, df["Governorate"].to_numpy()),
+                np.searchsorted(industries, df["Industry"].to_numpy()),
+                year_values - first_year,
+            ),
+            shape,
+        )
+        cells = int(np.prod(shape))
+        count = np.bincount(flat, minlength=cells)
+        sums = np.stack(
+            [
+                np.bincount(flat, weights=(df[post] - df[pre]).to_numpy(dtype=np.float64), minlength=cells)
+                for pre, post in metrics.values()
+            ],
+            axis=-1,
+        )
+        return CohortTable(
+            governorates,
+            industries,
+            years,
+            list(metrics),
+            count.reshape(shape),
+            sums.reshape(shape + (len(metrics),)),
+        )
+
+
+def save_cohorts(table, path=COHORTS_FILE):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(table.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+
+
+def load_cohorts(path=COHORTS_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return CohortTable.from_dict(json.load(f))
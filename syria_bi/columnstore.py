@@ -0,0 +1,187 @@
+"""
+Column Store
+On-disk, fixed-width copy of the company table: one ``.npy`` file per
+column, with string columns dictionary-encoded as integer codes plus a
+fixed-width dictionary. Columns are opened memory-mapped, so opening the
+store costs the same at any size and processes reading the same store share
+pages through the OS page cache instead of each holding a DataFrame.
+
+    write_column_store(df)
+    store = ColumnStore()
+    store["Post_BI_Decision_Making_Agility_Score"].mean()   # memory-mapped
+    store.codes("Governorate"), store.dictionary("Governorate")
+    store.to_pandas(["Governorate", "Industry"])
+    store.index().ids_in("Aleppo", "Finance")             # see syria_bi.indexes
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from .paths import COLUMN_STORE_DIR
+
+STORE_VERSION = 1
+MANIFEST = "manifest.json"
+
+
+def _code_dtype(size):
+    # -1 marks a missing value, so codes are signed
+    for dtype in (np.int8, np.int16, np.int32):
+        if size <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _encode_column(series):
+    """``(kind, arrays)`` for one column; arrays maps file suffix -> ndarray"""
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        return "numeric", {"": np.ascontiguousarray(series.to_numpy())}
+    codes, uniques = pd.factorize(series.astype(object), sort=True)
+    dictionary = np.asarray([str(value) for value in uniques], dtype=str)
+    if dictionary.size == 0:
+        dictionary = np.zeros(0, dtype="<U1")
+    return "dictionary", {
+        "": codes.astype(_code_dtype(len(uniques))),
+        ".dict": dictionary,
+    }
+
+
+def write_column_store(df, directory=COLUMN_STORE_DIR, indexes=True):
+    """Write ``df`` as a column store in ``directory`` (replaced atomically).
+
+    With ``indexes=True`` the secondary indexes of ``syria_bi.indexes`` are
+    built into the same directory before it is swapped in.
+    """
+    parent = os.path.dirname(os.path.abspath(directory))
+    temp_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(directory)}.", dir=parent)
+    try:
+        columns = []
+        for index, name in enumerate(df.columns):
+            kind, arrays = _encode_column(df[name])
+            stem = f"{index:03d}"
+            for suffix, array in arrays.items():
+                np.save(os.path.join(temp_dir, stem + suffix + ".npy"), array, allow_pickle=False)
+            columns.append({
+                "name": name,
+                "kind": kind,
+                "file": stem,
+                "dtype": str(arrays[""].dtype),
+            })
+        manifest = {"version": STORE_VERSION, "rows": len(df), "columns": columns}
+        with open(os.path.join(temp_dir, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        if indexes:
+            from .indexes import write_indexes
+
+            write_indexes(ColumnStore(temp_dir))
+        os.chmod(temp_dir, 0o755)
+
+        # Swap the new store in; readers see either the old or the new one
+        old_dir = None
+        if os.path.exists(directory):
+            old_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(directory)}.old.", dir=parent)
+            os.rmdir(old_dir)
+            os.replace(directory, old_dir)
+        os.replace(temp_dir, directory)
+        if old_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+    return directory
+
+
+class ColumnStore:
+    """Read-only, memory-mapped view of a column store directory"""
+
+    def __init__(self, directory=COLUMN_STORE_DIR):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported column store version: {manifest.get('version')}")
+        self.rows = manifest["rows"]
+        self._columns = {column["name"]: column for column in manifest["columns"]}
+        self._arrays = {}
+        self._index = None
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def __len__(self):
+        return self.rows
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def _open(self, name, suffix=""):
+        key = (name, suffix)
+        if key not in self._arrays:
+            column = self._columns[name]
+            path = os.path.join(self.directory, column["file"] + suffix + ".npy")
+            self._arrays[key] = np.load(path, mmap_mode="r", allow_pickle=False)
+        return self._arrays[key]
+
+    def is_dictionary(self, name):
+        return self._columns[name]["kind"] == "dictionary"
+
+    def codes(self, name):
+        """Integer codes of a dictionary-encoded column (memory-mapped)"""
+        if not self.is_dictionary(name):
+            raise TypeError(f"Column {name!r} is not dictionary-encoded")
+        return self._open(name)
+
+    def dictionary(self, name):
+        """Sorted distinct values of a dictionary-encoded column"""
+        if not self.is_dictionary(name):
+            raise TypeError(f"Column {name!r} is not dictionary-encoded")
+        return self._open(name, ".dict")
+
+    def code_of(self, name, value):
+        """Code of ``value`` in a dictionary column, or -1 if it does not occur"""
+        dictionary = self.dictionary(name)
+        position = int(np.searchsorted(dictionary, value))
+        if position < len(dictionary) and dictionary[position] == value:
+            return position
+        return -1
+
+    def __getitem__(self, name):
+        """Memory-mapped numeric column, or a decoded string column"""
+        if name not in self._columns:
+            raise KeyError(name)
+        if not self.is_dictionary(name):
+            return self._open(name)
+        codes = np.asarray(self.codes(name))
+        values = self.dictionary(name).astype(object)[np.maximum(codes, 0)]
+        values[codes < 0] = None
+        return values
+
+    def index(self):
+        """The store's ``CompanyIndex`` (Company_ID, governorate x industry and year lookups)"""
+        if self._index is None:
+            from .indexes import CompanyIndex
+
+            self._index = CompanyIndex(self)
+        return self._index
+
+    def to_pandas(self, columns=None):
+        """DataFrame of ``columns`` (default: all); strings become categoricals"""
+        data = {}
+        for name in columns or self.columns:
+            if self.is_dictionary(name):
+                data[name] = pd.Categorical.from_codes(
+                    np.asarray(self.codes(name)), categories=list(self.dictionary(name))
+                )
+            else:
+                data[name] = self._open(name)
+        return pd.DataFrame(data, copy=False)
+
+
+def open_column_store(directory=COLUMN_STORE_DIR):
+    """Open a column store written by ``write_column_store``"""
+    return ColumnStore(directory)
@@ -0,0 +1,209 @@
+"""
+Aggregation Cube
+Precomputed governorate x industry x BI_Implementation_Year rollups of the
+Syria BI dataset, with a small query API for means and standard deviations
+at any level without touching the raw rows.
+"""
+
+import json
+
+import numpy as np
+
+from .instrumentation import timer
+from .paths import CUBE_FILE
+
+DIMENSIONS = ["governorate", "industry", "year"]
+
+DIMENSION_COLUMNS = {
+    "governorate": "Governorate",
+    "industry": "Industry",
+    "year": "BI_Implementation_Year",
+}
+
+METRIC_COLUMNS = [
+    "Pre_BI_Decision_Making_Agility_Score",
+    "Post_BI_Decision_Making_Agility_Score",
+    "Pre_BI_Operational_Efficiency_Index",
+    "Post_BI_Operational_Efficiency_Index",
+    "Pre_BI_Data_Driven_Decisions_Percentage",
+    "Post_BI_Data_Driven_Decisions_Percentage",
+    "Revenue_Growth_After_BI_Percentage",
+    "Cost_Reduction_After_BI_Percentage",
+    "Customer_Satisfaction_Increase_After_BI_Percentage",
+    "Market_Share_Increase_After_BI_Percentage",
+    "Decision_Making_Agility_Improvement",
+    "Operational_Efficiency_Improvement",
+    "Data_Driven_Decisions_Improvement",
+]
+
+
+class AggregationCube:
+    """Dense count / sum / sum-of-squares cube over the three dimensions.
+
+    ``count`` has shape (G, I, Y); ``sums`` and ``sumsq`` have shape
+    (G, I, Y, M) with one slice per entry of ``metrics``.
+    """
+
+    def __init__(self, labels, metrics, count, sums, sumsq):
+        self.labels = labels
+        self.metrics = list(metrics)
+        self.count = np.asarray(count, dtype=np.int64)
+        self.sums = np.asarray(sums, dtype=np.float64)
+        self.sumsq = np.asarray(sumsq, dtype=np.float64)
+        self._index = {
+            dim: {value: i for i, value in enumerate(labels[dim])}
+            for dim in DIMENSIONS
+        }
+
+    def _select(self, where):
+        """Apply ``where`` filters, keeping every axis (filtered axes shrink)"""
+        count, sums, sumsq = self.count, self.sums, self.sumsq
+        labels = dict(self.labels)
+        for dim, values in (where or {}).items():
+            if dim not in DIMENSIONS:
+                raise ValueError(f"Unknown dimension: {dim}")
+            if not isinstance(values, (list, tuple, set)):
+                values = [values]
+            values = [v for v in self.labels[dim] if v in set(values)]
+            positions = [self._index[dim][v] for v in values]
+            axis = DIMENSIONS.index(dim)
+            count = np.take(count, positions, axis=axis)
+            sums = np.take(sums, positions, axis=axis)
+            sumsq = np.take(sumsq, positions, axis=axis)
+            labels[dim] = values
+        return labels, count, sums, sumsq
+
+    def rollup(self, by=(), where=None, metrics=None, ddof=1):
+        """Aggregate the cube to the dimensions in ``by``.
+
+        Returns a dict keyed by a tuple of dimension values (the empty tuple
+        for a grand total). Each entry holds the company count and, per
+        metric, the mean and standard deviation. Groups without companies are
+        omitted.
+        """
+        by = list(by)
+        for dim in by:
+            if dim not in DIMENSIONS:
+                raise ValueError(f"Unknown dimension: {dim}")
+        metrics = list(metrics) if metrics else self.metrics
+        metric_positions = [self.metrics.index(m) for m in metrics]
+
+        labels, count, sums, sumsq = self._select(where)
+        sums = sums[..., metric_positions]
+        sumsq = sumsq[..., metric_positions]
+
+        # Sum away every dimension that is not kept, then move kept ones first
+        drop = tuple(i for i, dim in enumerate(DIMENSIONS) if dim not in by)
+        count = count.sum(axis=drop)
+        sums = sums.sum(axis=drop)
+        sumsq = sumsq.sum(axis=drop)
+        kept = [dim for dim in DIMENSIONS if dim in by]
+        order = [kept.index(dim) for dim in by]
+        count = np.transpose(count, order)
+        sums = np.transpose(sums, order + [len(by)])
+        sumsq = np.transpose(sumsq, order + [len(by)])
+
+        n = count[..., None].astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = sums / n
+            var = (sumsq - sums * mean) / (n - ddof)
+        std = np.sqrt(np.clip(var, 0.0, None))
+
+        result = {}
+        for key in np.argwhere(count > 0):
+            key = tuple(key)
+            group = tuple(labels[dim][i] for dim, i in zip(by, key))
+            entry = {"count": int(count[key])}
+            for m, metric in enumerate(metrics):
+                s = std[key + (m,)]
+                entry[metric] = {
+                    "mean": float(mean[key + (m,)]),
+                    "std": float(s) if np.isfinite(s) else None,
+                }
+            result[group] = entry
+        return result
+
+    def compare_governorates(self, metric, where=None):
+        """Mean and standard deviation of one metric for every governorate"""
+        rollup = self.rollup(by=["governorate"], where=where, metrics=[metric])
+        return {key[0]: {"count": v["count"], **v[metric]} for key, v in rollup.items()}
+
+    def merge(self, other):
+        """Cube over the union of both cubes' labels with counts and sums added
+        (e.g. of two chunks of the dataset)"""
+        if other.metrics != self.metrics:
+            raise ValueError("Cannot merge cubes with different metrics")
+        labels = {
+            dim: sorted(set(self.labels[dim]) | set(other.labels[dim]))
+            for dim in DIMENSIONS
+        }
+        shape = tuple(len(labels[dim]) for dim in DIMENSIONS)
+        count = np.zeros(shape, dtype=np.int64)
+        sums = np.zeros(shape + (len(self.metrics),))
+        sumsq = np.zeros(shape + (len(self.metrics),))
+        for cube in (self, other):
+            cells = np.ix_(*[
+                np.searchsorted(labels[dim], cube.labels[dim]) for dim in DIMENSIONS
+            ])
+            count[cells] += cube.count
+            sums[cells] += cube.sums
+            sumsq[cells] += cube.sumsq
+        return AggregationCube(labels, self.metrics, count, sums, sumsq)
+
+    def to_dict(self):
+        """JSON-serializable form (dense arrays as nested lists)"""
+        return {
+            "dimensions": DIMENSIONS,
+            "labels": self.labels,
+            "metrics": self.metrics,
+            "count": self.count.tolist(),
+            "sum": self.sums.tolist(),
+            "sumsq": self.sumsq.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["labels"], data["metrics"], data["count"], data["sum"], data["sumsq"]
+        )
+
+
+def build_cube(df, metrics=METRIC_COLUMNS):
+    """Build the cube from the company DataFrame in one grouped pass"""
+    with timer("cube"):
+        labels = {
+            dim: sorted(df[column].unique().tolist())
+            for dim, column in DIMENSION_COLUMNS.items()
+        }
+        codes = [
+            np.searchsorted(labels[dim], df[DIMENSION_COLUMNS[dim]].to_numpy())
+            for dim in DIMENSIONS
+        ]
+        shape = tuple(len(labels[dim]) for dim in DIMENSIONS)
+        flat = np.ravel_multi_index(codes, shape)
+        cells = int(np.prod(shape))
+
+        values = df[list(metrics)].to_numpy(dtype=np.float64)
+        count = np.bincount(flat, minlength=cells)
+        sums = np.zeros((cells, len(metrics)))
+        sumsq = np.zeros((cells, len(metrics)))
+        np.add.at(sums, flat, values)
+        np.add.at(sumsq, flat, values * values)
+
+        return AggregationCube(
+            labels,
+            metrics,
+            count.reshape(shape),
+            sums.reshape(shape + (len(metrics),)),
+            sumsq.reshape(shape + (len(metrics),)),
+        )
+
+
+def save_cube(cube, path=CUBE_FILE):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cube.to_dict(), f, ensure_ascii=False)
+
+
+def load_cube(path=CUBE_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return AggregationCube.from_dict(json.load(f))
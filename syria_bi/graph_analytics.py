@@ -0,0 +1,207 @@
+"""
+Graph Analytics
+Centrality and connectivity metrics for the pre/post BI networks.
+
+All governorate networks are stacked into one block-diagonal sparse (CSR)
+adjacency matrix so every metric is computed for all governorates in a
+single batch of sparse matrix operations. ``build_networks`` passes the
+post and pre BI networks of all governorates, built over every company,
+in one call each.
+"""
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+# Number of BFS source nodes sampled per network for approximate betweenness
+BETWEENNESS_SAMPLES = 32
+
+# Number of most central nodes reported per network
+TOP_CENTRAL_NODES = 5
+
+
+def batch_adjacency(networks):
+    """Stack networks into one block-diagonal, undirected 0/1 CSR matrix.
+
+    ``networks`` is a list of ``{'nodes': [...], 'links': [...]}`` dicts.
+    Returns the matrix, the node ids in matrix order and the block offsets.
+    """
+    node_ids = []
+    rows = []
+    cols = []
+    offsets = [0]
+    for network in networks:
+        index = {node["id"]: i for i, node in enumerate(network["nodes"])}
+        base = offsets[-1]
+        for link in network["links"]:
+            source = link["source"]
+            target = link["target"]
+            # d3 replaces ids with node objects once a network has been simulated
+            source = source["id"] if isinstance(source, dict) else source
+            target = target["id"] if isinstance(target, dict) else target
+            if source in index and target in index and source != target:
+                rows.append(base + index[source])
+                cols.append(base + index[target])
+        node_ids.extend(node["id"] for node in network["nodes"])
+        offsets.append(base + len(network["nodes"]))
+
+    n = offsets[-1]
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    adjacency = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, cols)), shape=(n, n)
+    )
+    adjacency = adjacency + adjacency.T
+    adjacency.data[:] = 1.0
+    adjacency.eliminate_zeros()
+    return adjacency, node_ids, np.asarray(offsets)
+
+
+def triangles_per_node(adjacency, degree):
+    """Number of triangles through every node.
+
+    Edges are oriented from lower to higher degree so that no intermediate
+    product has to enumerate the wedges around hub nodes (a plain A @ A is
+    quadratic in the hub degree). Every triangle a < b < c is found once in
+    (L @ L) * L at [a, c] and once in (L.T @ L) * L at [b, c].
+    """
+    n = adjacency.shape[0]
+    rank = np.empty(n, dtype=np.int64)
+    rank[np.lexsort((np.arange(n), degree))] = np.arange(n)
+    upper = sparse.triu(adjacency, format="coo")
+    rows, cols = upper.row, upper.col
+    swap = rank[rows] > rank[cols]
+    rows, cols = np.where(swap, cols, rows), np.where(swap, rows, cols)
+    oriented = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+
+    by_ends = (oriented @ oriented).multiply(oriented)
+    by_middle = (oriented.T @ oriented).multiply(oriented)
+    return (
+        np.asarray(by_ends.sum(axis=1)).ravel()
+        + np.asarray(by_ends.sum(axis=0)).ravel()
+        + np.asarray(by_middle.sum(axis=1)).ravel()
+    )
+
+
+def _block_betweenness(adjacency, sources):
+    """Brandes dependencies from ``sources``, summed per node.
+
+    All breadth-first searches advance together as one dense
+    (sources x nodes) frontier multiplied by the sparse adjacency matrix.
+    """
+    n = adjacency.shape[0]
+    rows = np.arange(len(sources))
+
+    # Forward phase: shortest-path counts level by level
+    sigma = np.zeros((len(sources), n))
+    sigma[rows, sources] = 1.0
+    visited = sigma > 0
+    frontier = sigma.copy()
+    levels = [visited.copy()]
+    while True:
+        reached = np.asarray(frontier @ adjacency)
+        reached[visited] = 0.0
+        if not reached.any():
+            break
+        sigma += reached
+        visited |= reached > 0
+        levels.append(reached > 0)
+        frontier = reached
+
+    # Backward phase: accumulate dependencies from the deepest level up
+    delta = np.zeros_like(sigma)
+    safe_sigma = np.where(sigma > 0, sigma, 1.0)
+    for depth in range(len(levels) - 1, 0, -1):
+        weights = np.where(levels[depth], (1.0 + delta) / safe_sigma, 0.0)
+        pulled = np.asarray(weights @ adjacency)
+        delta += np.where(levels[depth - 1], pulled * sigma, 0.0)
+    delta[rows, sources] = 0.0
+    return delta.sum(axis=0)
+
+
+def approximate_betweenness(adjacency, offsets, samples=BETWEENNESS_SAMPLES, seed=42):
+    """Sampled-source Brandes betweenness (normalized) for every node.
+
+    Up to ``samples`` sources are drawn per block; blocks are searched
+    separately so the dense frontier never spans other governorates.
+    """
+    rng = np.random.default_rng(seed)
+    betweenness = np.zeros(adjacency.shape[0])
+    for start, end in zip(offsets[:-1], offsets[1:]):
+        size = end - start
+        if size < 3:
+            continue
+        k = min(samples, size)
+        sources = rng.choice(size, size=k, replace=False)
+        block = adjacency[start:end, start:end]
+        # Scale the sample up to all sources; undirected paths count twice
+        dependency = _block_betweenness(block, sources) * (size / k) / 2.0
+        betweenness[start:end] = dependency / ((size - 1) * (size - 2) / 2.0)
+    return betweenness
+
+
+def analyze_networks(networks, betweenness_samples=BETWEENNESS_SAMPLES, seed=42):
+    """Connectivity and centrality metrics for every network in ``networks``.
+
+    ``networks`` maps a name (e.g. governorate) to a node/link network.
+    Returns a dict with the same keys holding each network's metrics.
+    """
+    names = list(networks)
+    adjacency, node_ids, offsets = batch_adjacency([networks[n] for n in names])
+    sizes = np.diff(offsets)
+    block = np.repeat(np.arange(len(names)), sizes)
+
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    edges = np.bincount(block, weights=degree, minlength=len(names)) / 2.0
+
+    triangles = triangles_per_node(adjacency, degree)
+    pairs = degree * (degree - 1)
+    local_clustering = np.divide(2.0 * triangles, pairs, out=np.zeros_like(pairs), where=pairs > 0)
+
+    n_components, labels = connected_components(adjacency, directed=False)
+    component_sizes = np.bincount(labels, minlength=n_components)
+    component_block = np.zeros(n_components, dtype=np.int64)
+    component_block[labels] = block
+    components = np.bincount(component_block, minlength=len(names))
+    largest = np.zeros(len(names))
+    np.maximum.at(largest, component_block, component_sizes)
+
+    betweenness = approximate_betweenness(adjacency, offsets, betweenness_samples, seed)
+
+    results = {}
+    for b, name in enumerate(names):
+        start, end = offsets[b], offsets[b + 1]
+        n = int(sizes[b])
+        if n == 0:
+            results[name] = {"nodes": 0, "edges": 0}
+            continue
+        deg = degree[start:end].astype(np.int64)
+        degree_values, degree_counts = np.unique(deg, return_counts=True)
+        bc = betweenness[start:end]
+        top = np.argsort(bc)[::-1][:TOP_CENTRAL_NODES]
+        results[name] = {
+            "nodes": n,
+            "edges": int(edges[b]),
+            "density": float(2.0 * edges[b] / (n * (n - 1))) if n > 1 else 0.0,
+            "degree": {
+                "mean": float(deg.mean()),
+                "max": int(deg.max()),
+                "distribution": {
+                    str(d): int(c) for d, c in zip(degree_values.tolist(), degree_counts.tolist())
+                },
+            },
+            "connected_components": int(components[b]),
+            "largest_component_fraction": float(largest[b] / n),
+            "avg_clustering": float(local_clustering[start:end].mean()),
+            "transitivity": float(
+                2.0 * triangles[start:end].sum() / pairs[start:end].sum()
+            ) if pairs[start:end].sum() > 0 else 0.0,
+            "betweenness": {
+                "mean": float(bc.mean()),
+                "max": float(bc.max()),
+                "top": [
+                    {"id": node_ids[start + i], "value": float(bc[i])} for i in top
+                ],
+            },
+        }
+    return results
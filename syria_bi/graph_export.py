@@ -0,0 +1,374 @@
+"""
+Graph Export
+Writes the ``network`` and ``pre_bi_network`` graphs of every governorate to
+files that graph tools read directly:
+
+- ``graphml``: ``<graph>.graphml``
+- ``gexf``: ``<graph>.gexf`` (GEXF 1.2, edge ``strength`` as the weight)
+- ``parquet``: ``<graph>.edges.parquet`` edge list plus
+  ``<graph>.nodes.parquet`` node attributes (needs pyarrow)
+
+Each file holds the union of all governorates (node ids are globally unique)
+and every node and edge carries a ``governorate`` attribute. Governorates are
+converted in worker processes into per-governorate fragments; the attribute
+declarations are written once all types are known and the fragments are then
+concatenated, so no complete document is ever built in memory. Files are
+written to a temporary name and renamed into place when complete.
+
+    export_graphs(iter_json_object("governorate_networks.json"),
+                  "exports", formats=("graphml", "parquet"), workers=4)
+"""
+
+import json
+import math
+import os
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from xml.sax.saxutils import escape, quoteattr
+
+from .instrumentation import count, timer
+from .paths import EXPORT_DIR
+
+GRAPHS = ("network", "pre_bi_network")
+FORMATS = ("graphml", "gexf", "parquet")
+
+GROUP_ATTRIBUTE = "governorate"
+NODE_FIELDS = ("id",)
+EDGE_FIELDS = ("source", "target")
+# GEXF has dedicated slots for these, so they are not repeated as attributes
+GEXF_NODE_LABEL = "label"
+GEXF_EDGE_WEIGHT = "strength"
+
+# Attribute type -> (GraphML attr.type, GEXF type, Arrow type name)
+TYPES = {
+    "boolean": ("boolean", "boolean", "bool_"),
+    "long": ("long", "long", "int64"),
+    "double": ("double", "double", "float64"),
+    "string": ("string", "string", "string"),
+}
+
+GRAPHML_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<graphml xmlns="http://graphml.graphdrawing.org/xmlns" '
+    'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+    'xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns '
+    'http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">\n'
+)
+GEXF_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<gexf xmlns="http://www.gexf.net/1.2draft" version="1.2">\n'
+)
+
+
+def output_files(graph, fmt):
+    """File names written for one graph in one format"""
+    if fmt == "parquet":
+        return [f"{graph}.nodes.parquet", f"{graph}.edges.parquet"]
+    return [f"{graph}.{fmt}"]
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow)") from error
+    return pyarrow, pyarrow.parquet
+
+
+def _value_type(value):
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "long"
+    if isinstance(value, float):
+        return "double"
+    return "string"
+
+
+def _merge_types(types, other):
+    for name, kind in other.items():
+        previous = types.setdefault(name, kind)
+        if previous != kind:
+            types[name] = "double" if {previous, kind} <= {"long", "double"} else "string"
+    return types
+
+
+def _text(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _attributes(items, governorate, fields, types):
+    """``(field values, {name: value})`` per item, recording value types.
+
+    Missing and non-finite values are left out, as neither format has a
+    portable spelling for them.
+    """
+    rows = []
+    types.setdefault(GROUP_ATTRIBUTE, "string")
+    for item in items:
+        attributes = {GROUP_ATTRIBUTE: governorate}
+        for name, value in item.items():
+            if name in fields or value is None:
+                continue
+            if isinstance(value, float) and not math.isfinite(value):
+                continue
+            kind = _value_type(value)
+            if types.get(name) != kind:
+                _merge_types(types, {name: kind})
+            attributes[name] = value
+        rows.append(([str(item[field]) for field in fields], attributes))
+    return rows
+
+
+def _write_graphml(base, nodes, edges):
+    with open(base + ".graphml.nodes", "w", encoding="utf-8") as f:
+        for (node_id,), attributes in nodes:
+            data = "".join(
+                f'<data key="n_{name}">{escape(_text(value))}</data>'
+                for name, value in attributes.items()
+            )
+            f.write(f"<node id={quoteattr(node_id)}>{data}</node>\n")
+    with open(base + ".graphml.edges", "w", encoding="utf-8") as f:
+        for (source, target), attributes in edges:
+            data = "".join(
+                f'<data key="e_{name}">{escape(_text(value))}</data>'
+                for name, value in attributes.items()
+            )
+            f.write(f"<edge source={quoteattr(source)} target={quoteattr(target)}>{data}</edge>\n")
+
+
+def _gexf_values(attributes, skip):
+    values = "".join(
+        f"<attvalue for={quoteattr(name)} value={quoteattr(_text(value))}/>"
+        for name, value in attributes.items() if name != skip
+    )
+    return f"<attvalues>{values}</attvalues>"
+
+
+def _write_gexf(base, governorate, nodes, edges):
+    with open(base + ".gexf.nodes", "w", encoding="utf-8") as f:
+        for (node_id,), attributes in nodes:
+            label = attributes.get(GEXF_NODE_LABEL, node_id)
+            f.write(
+                f"<node id={quoteattr(node_id)} label={quoteattr(_text(label))}>"
+                f"{_gexf_values(attributes, GEXF_NODE_LABEL)}</node>\n"
+            )
+    with open(base + ".gexf.edges", "w", encoding="utf-8") as f:
+        for i, ((source, target), attributes) in enumerate(edges):
+            weight = attributes.get(GEXF_EDGE_WEIGHT)
+            weight = f' weight="{float(weight)!r}"' if isinstance(weight, (int, float)) else ""
+            f.write(
+                f"<edge id={quoteattr(f'{governorate}/{i}')} source={quoteattr(source)} "
+                f"target={quoteattr(target)}{weight}>"
+                f"{_gexf_values(attributes, GEXF_EDGE_WEIGHT)}</edge>\n"
+            )
+
+
+def _arrow_table(rows, fields, types):
+    pa, _ = _pyarrow()
+    columns = {field: [row[0][i] for row in rows] for i, field in enumerate(fields)}
+    schema = [pa.field(field, pa.string()) for field in fields]
+    for name, kind in types.items():
+        convert = _text if kind == "string" else float if kind == "double" else None
+        values = (attributes.get(name) for _, attributes in rows)
+        columns[name] = [
+            convert(value) if convert and value is not None else value for value in values
+        ]
+        schema.append(pa.field(name, getattr(pa, TYPES[kind][2])()))
+    return pa.Table.from_pydict(columns, schema=pa.schema(schema))
+
+
+def _write_parquet(base, nodes, edges, node_types, edge_types):
+    # Parts are uncompressed Arrow IPC files; only the combined file is Parquet
+    pa, _ = _pyarrow()
+    for suffix, table in ((".nodes.arrow", _arrow_table(nodes, NODE_FIELDS, node_types)),
+                          (".edges.arrow", _arrow_table(edges, EDGE_FIELDS, edge_types))):
+        with pa.OSFile(base + suffix, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _export_governorate(governorate, data, graphs, formats, directory, index):
+    """Write one governorate's fragments and return per-graph counts and types"""
+    stats = {}
+    with timer("graph_export", governorate):
+        for graph in graphs:
+            node_types, edge_types = {}, {}
+            nodes = _attributes(data[graph]["nodes"], governorate, NODE_FIELDS, node_types)
+            edges = _attributes(data[graph]["links"], governorate, EDGE_FIELDS, edge_types)
+            base = os.path.join(directory, f"{index:06d}.{graph}")
+            if "graphml" in formats:
+                _write_graphml(base, nodes, edges)
+            if "gexf" in formats:
+                _write_gexf(base, governorate, nodes, edges)
+            if "parquet" in formats:
+                _write_parquet(base, nodes, edges, node_types, edge_types)
+            stats[graph] = {
+                "base": base,
+                "nodes": len(nodes),
+                "edges": len(edges),
+                "node_types": node_types,
+                "edge_types": edge_types,
+            }
+    return stats
+
+
+@contextmanager
+def _atomic_output(path):
+    """Yield a temporary path next to ``path``, renamed over it on success"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory
+    )
+    os.close(fd)
+    try:
+        yield temp_path
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _append(f, path):
+    with open(path, "r", encoding="utf-8") as part:
+        shutil.copyfileobj(part, f)
+
+
+def _assemble_graphml(paths, graph, parts, node_types, edge_types):
+    with _atomic_output(paths[0]) as temp_path, open(temp_path, "w", encoding="utf-8") as f:
+        f.write(GRAPHML_HEADER)
+        for prefix, domain, types in (("n", "node", node_types), ("e", "edge", edge_types)):
+            for name, kind in types.items():
+                f.write(
+                    f"<key id={quoteattr(f'{prefix}_{name}')} for=\"{domain}\" "
+                    f"attr.name={quoteattr(name)} attr.type=\"{TYPES[kind][0]}\"/>\n"
+                )
+        f.write(f'<graph id={quoteattr(graph)} edgedefault="directed">\n')
+        for base in parts:
+            _append(f, base + ".graphml.nodes")
+        for base in parts:
+            _append(f, base + ".graphml.edges")
+        f.write("</graph>\n</graphml>\n")
+
+
+def _assemble_gexf(paths, graph, parts, node_types, edge_types):
+    with _atomic_output(paths[0]) as temp_path, open(temp_path, "w", encoding="utf-8") as f:
+        f.write(GEXF_HEADER)
+        f.write(f"<meta><description>{escape(graph)}</description></meta>\n")
+        f.write('<graph defaultedgetype="directed" mode="static">\n')
+        for domain, types, skip in (("node", node_types, GEXF_NODE_LABEL),
+                                    ("edge", edge_types, GEXF_EDGE_WEIGHT)):
+            f.write(f'<attributes class="{domain}">\n')
+            for name, kind in types.items():
+                if name != skip:
+                    f.write(
+                        f"<attribute id={quoteattr(name)} title={quoteattr(name)} "
+                        f"type=\"{TYPES[kind][1]}\"/>\n"
+                    )
+            f.write("</attributes>\n")
+        f.write("<nodes>\n")
+        for base in parts:
+            _append(f, base + ".gexf.nodes")
+        f.write("</nodes>\n<edges>\n")
+        for base in parts:
+            _append(f, base + ".gexf.edges")
+        f.write("</edges>\n</graph>\n</gexf>\n")
+
+
+def _assemble_parquet(paths, graph, parts, node_types, edge_types):
+    pa, pq = _pyarrow()
+    for path, suffix, fields, types in zip(paths, (".nodes.arrow", ".edges.arrow"),
+                                           (NODE_FIELDS, EDGE_FIELDS), (node_types, edge_types)):
+        schema = pa.schema(
+            [pa.field(field, pa.string()) for field in fields]
+            + [pa.field(name, getattr(pa, TYPES[kind][2])()) for name, kind in types.items()]
+        )
+        with _atomic_output(path) as temp_path:
+            with pq.ParquetWriter(temp_path, schema) as writer:
+                # One row group per governorate, conformed to the combined schema
+                for base in parts:
+                    with pa.memory_map(base + suffix) as source:
+                        table = pa.ipc.open_file(source).read_all()
+                        columns = [
+                            table.column(field.name).cast(field.type)
+                            if field.name in table.column_names
+                            else pa.nulls(len(table), field.type)
+                            for field in schema
+                        ]
+                        writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+
+
+ASSEMBLERS = {"graphml": _assemble_graphml, "gexf": _assemble_gexf, "parquet": _assemble_parquet}
+
+
+def export_graphs(networks, output_dir=EXPORT_DIR, formats=("graphml",), graphs=GRAPHS, workers=1,
+                  mp_context=None):
+    """Export ``(governorate, data)`` pairs, e.g. from ``iter_json_object`` or
+    ``build_networks``, and return ``{path: {"nodes": n, "edges": m}}``.
+
+    With ``workers > 1`` governorates are converted in worker processes (at
+    most two per worker in flight) and concatenated in input order;
+    ``mp_context`` selects how they are started.
+    """
+    formats, graphs = tuple(formats), tuple(graphs)
+    for fmt in formats:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format: {fmt} (expected one of {FORMATS})")
+    for graph in graphs:
+        if graph not in GRAPHS:
+            raise ValueError(f"Unknown graph: {graph} (expected one of {GRAPHS})")
+    if "parquet" in formats:
+        _pyarrow()
+
+    os.makedirs(output_dir, exist_ok=True)
+    parts_dir = tempfile.mkdtemp(prefix=".parts.", dir=output_dir)
+    try:
+        jobs = (
+            (governorate, data, graphs, formats, parts_dir, index)
+            for index, (governorate, data) in enumerate(networks)
+        )
+        results = []
+        if workers <= 1:
+            results.extend(_export_governorate(*job) for job in jobs)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as pool:
+                pending = deque()
+                for job in jobs:
+                    pending.append(pool.submit(_export_governorate, *job))
+                    if len(pending) >= 2 * workers:
+                        results.append(pending.popleft().result())
+                while pending:
+                    results.append(pending.popleft().result())
+        count("governorates_exported", len(results))
+
+        written = {}
+        for graph in graphs:
+            stats = [result[graph] for result in results]
+            node_types, edge_types = {}, {}
+            for item in stats:
+                _merge_types(node_types, item["node_types"])
+                _merge_types(edge_types, item["edge_types"])
+            parts = [item["base"] for item in stats]
+            totals = {
+                "nodes": sum(item["nodes"] for item in stats),
+                "edges": sum(item["edges"] for item in stats),
+            }
+            for fmt in formats:
+                paths = [os.path.join(output_dir, name) for name in output_files(graph, fmt)]
+                with timer(f"export_{fmt}"):
+                    ASSEMBLERS[fmt](paths, graph, parts, node_types, edge_types)
+                for path in paths:
+                    written[path] = totals
+        return written
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
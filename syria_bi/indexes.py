@@ -0,0 +1,188 @@
+"""
+Secondary Indexes
+Prebuilt lookup structures stored next to the column store:
+
+- Company_ID -> row offset: ids sorted, with their row offsets
+  (binary search, O(log n)).
+- (Governorate, Industry) -> company ids: postings lists in CSR form.
+  Postings are sorted by governorate code, then industry code, then id, so a
+  pair or a whole governorate is one contiguous slice (O(k)).
+- BI_Implementation_Year -> company ids: postings lists in the same form.
+
+    index = open_column_store().index()
+    index.row_of(1042)
+    index.ids_in("Aleppo", "Finance")
+    index.ids_in_year(2021)
+"""
+
+import json
+import os
+
+import numpy as np
+
+INDEX_MANIFEST = "indexes.json"
+INDEX_VERSION = 1
+
+ID_COLUMN = "Company_ID"
+GOVERNORATE_COLUMN = "Governorate"
+INDUSTRY_COLUMN = "Industry"
+YEAR_COLUMN = "BI_Implementation_Year"
+
+
+def _row_dtype(rows):
+    return np.int32 if rows <= np.iinfo(np.int32).max else np.int64
+
+
+def _postings(keys, n_keys, ids, row_dtype):
+    """CSR postings: ``offsets`` (n_keys + 1) and the rows/ids of each key, id-sorted"""
+    valid = np.flatnonzero((keys >= 0) & (keys < n_keys))
+    order = valid[np.lexsort((ids[valid], keys[valid]))]
+    offsets = np.zeros(n_keys + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys[valid], minlength=n_keys), out=offsets[1:])
+    return offsets, order.astype(row_dtype), np.asarray(ids[order])
+
+
+def write_indexes(store):
+    """Build the indexes of a ``ColumnStore`` and save them in its directory"""
+    ids = np.asarray(store[ID_COLUMN])
+    row_dtype = _row_dtype(len(ids))
+    arrays = {}
+
+    order = np.argsort(ids, kind="stable")
+    arrays["id_keys"] = ids[order]
+    arrays["id_rows"] = order.astype(row_dtype)
+
+    governorates = store.dictionary(GOVERNORATE_COLUMN)
+    industries = store.dictionary(INDUSTRY_COLUMN)
+    gov_codes = np.asarray(store.codes(GOVERNORATE_COLUMN), dtype=np.int64)
+    industry_codes = np.asarray(store.codes(INDUSTRY_COLUMN), dtype=np.int64)
+    group_keys = np.where(
+        (gov_codes >= 0) & (industry_codes >= 0),
+        gov_codes * len(industries) + industry_codes,
+        -1,
+    )
+    (arrays["group_offsets"], arrays["group_rows"], arrays["group_ids"]) = _postings(
+        group_keys, len(governorates) * len(industries), ids, row_dtype
+    )
+
+    years = np.asarray(store[YEAR_COLUMN]).astype(np.int64)
+    first_year = int(years.min()) if len(years) else 0
+    n_years = int(years.max()) - first_year + 1 if len(years) else 0
+    (arrays["year_offsets"], arrays["year_rows"], arrays["year_ids"]) = _postings(
+        years - first_year, n_years, ids, row_dtype
+    )
+
+    for name, array in arrays.items():
+        np.save(os.path.join(store.directory, f"index_{name}.npy"), array, allow_pickle=False)
+    manifest = {
+        "version": INDEX_VERSION,
+        "rows": len(ids),
+        "unique_ids": bool(len(ids) < 2 or np.all(arrays["id_keys"][1:] != arrays["id_keys"][:-1])),
+        "first_year": first_year,
+        "years": n_years,
+    }
+    with open(os.path.join(store.directory, INDEX_MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+class CompanyIndex:
+    """Lookup API over the indexes of a ``ColumnStore`` (memory-mapped)"""
+
+    def __init__(self, store):
+        self.store = store
+        with open(os.path.join(store.directory, INDEX_MANIFEST), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != INDEX_VERSION or manifest.get("rows") != len(store):
+            raise ValueError(f"Indexes in {store.directory} are missing or stale; rebuild the store")
+        self.first_year = manifest["first_year"]
+        self.n_years = manifest["years"]
+        self._arrays = {}
+
+    def _array(self, name):
+        if name not in self._arrays:
+            path = os.path.join(self.store.directory, f"index_{name}.npy")
+            self._arrays[name] = np.load(path, mmap_mode="r", allow_pickle=False)
+        return self._arrays[name]
+
+    # Company_ID -> row
+
+    def rows_of(self, company_ids):
+        """Row offsets of ``company_ids`` (-1 where an id does not exist)"""
+        keys = self._array("id_keys")
+        company_ids = np.asarray(company_ids)
+        if len(keys) == 0:
+            return np.full(company_ids.shape, -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(keys, company_ids), len(keys) - 1)
+        found = keys[positions] == company_ids
+        return np.where(found, self._array("id_rows")[positions], -1)
+
+    def row_of(self, company_id):
+        """Row offset of one company, or None"""
+        row = int(self.rows_of([company_id])[0])
+        return None if row < 0 else row
+
+    def company(self, company_id):
+        """One company's record as a dict, or None"""
+        row = self.row_of(company_id)
+        if row is None:
+            return None
+        record = {}
+        for name in self.store.columns:
+            if self.store.is_dictionary(name):
+                code = int(self.store.codes(name)[row])
+                record[name] = str(self.store.dictionary(name)[code]) if code >= 0 else None
+            else:
+                record[name] = self.store[name][row].item()
+        return record
+
+    # (Governorate, Industry) -> ids
+
+    def _group_slice(self, governorate, industry=None):
+        gov_code = self.store.code_of(GOVERNORATE_COLUMN, governorate)
+        n_industries = len(self.store.dictionary(INDUSTRY_COLUMN))
+        if gov_code < 0:
+            return slice(0, 0)
+        offsets = self._array("group_offsets")
+        if industry is None:
+            start, stop = gov_code * n_industries, (gov_code + 1) * n_industries
+        else:
+            industry_code = self.store.code_of(INDUSTRY_COLUMN, industry)
+            if industry_code < 0:
+                return slice(0, 0)
+            start = gov_code * n_industries + industry_code
+            stop = start + 1
+        return slice(int(offsets[start]), int(offsets[stop]))
+
+    def ids_in(self, governorate, industry=None):
+        """Company ids of a governorate (or governorate x industry), grouped by
+        industry and ascending within each industry"""
+        return self._array("group_ids")[self._group_slice(governorate, industry)]
+
+    def rows_in(self, governorate, industry=None):
+        """Row offsets matching ``ids_in``"""
+        return self._array("group_rows")[self._group_slice(governorate, industry)]
+
+    # BI_Implementation_Year -> ids
+
+    def _year_slice(self, year):
+        position = int(year) - self.first_year
+        if not 0 <= position < self.n_years:
+            return slice(0, 0)
+        offsets = self._array("year_offsets")
+        return slice(int(offsets[position]), int(offsets[position + 1]))
+
+    def ids_in_year(self, year):
+        """Ascending company ids that implemented BI in ``year``"""
+        return self._array("year_ids")[self._year_slice(year)]
+
+    def rows_in_year(self, year):
+        """Row offsets matching ``ids_in_year``"""
+        return self._array("year_rows")[self._year_slice(year)]
+
+
+def open_company_index(directory=None):
+    """``CompanyIndex`` of the column store in ``directory`` (default location if None)"""
+    from .columnstore import open_column_store
+
+    store = open_column_store() if directory is None else open_column_store(directory)
+    return store.index()
@@ -0,0 +1,185 @@
+"""
+Instrumentation: cumulative timers and counters around the pipeline stages.
+
+Timers and counters are recorded globally and, when a governorate is given,
+also for that governorate, so a slow export can be traced to the stage and
+governorate responsible. Timers may nest (e.g. 'links' runs inside
+'network_post'); each one reports its own inclusive time.
+
+    with timer('load'):
+        df = pd.read_csv(path)
+    count('rows', len(df))
+    report()  # {'stages': ..., 'counters': ..., 'governorates': ...}
+
+``profile()`` additionally runs a block under cProfile or tracemalloc and
+writes the results together with a JSON timing report.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+PROFILE_DIR = "profile"
+PROFILE_MODES = ("cprofile", "tracemalloc")
+
+
+class Recorder:
+    """Thread-safe accumulator of named timers and counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.timers = {}
+            self.counters = {}
+            self.governorates = {}
+
+    def _scopes(self, governorate):
+        scopes = [(self.timers, self.counters)]
+        if governorate is not None:
+            entry = self.governorates.setdefault(str(governorate), {"stages": {}, "counters": {}})
+            scopes.append((entry["stages"], entry["counters"]))
+        return scopes
+
+    def add_time(self, name, seconds, governorate=None):
+        with self._lock:
+            for timers, _ in self._scopes(governorate):
+                timer = timers.setdefault(name, {"seconds": 0.0, "calls": 0})
+                timer["seconds"] += seconds
+                timer["calls"] += 1
+
+    @contextmanager
+    def timer(self, name, governorate=None):
+        """Time the enclosed block under ``name`` (and ``governorate``)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started, governorate)
+
+    def count(self, name, n=1, governorate=None):
+        """Add ``n`` to the counter ``name`` (and the governorate's counter)"""
+        with self._lock:
+            for _, counters in self._scopes(governorate):
+                counters[name] = counters.get(name, 0) + n
+
+    def report(self):
+        """Timers and counters as a JSON-serializable dict"""
+        with self._lock:
+            return json.loads(json.dumps({
+                "stages": self.timers,
+                "counters": self.counters,
+                "governorates": self.governorates,
+            }))
+
+
+RECORDER = Recorder()
+timer = RECORDER.timer
+count = RECORDER.count
+report = RECORDER.report
+reset = RECORDER.reset
+
+
+def format_report(data=None, top=5):
+    """Plain-text summary: stage totals and the slowest governorates"""
+    data = data or report()
+    lines = [f"{'Stage':22} | {'Calls':>7} | {'Seconds':>9}", "-" * 44]
+    for name, timer_ in sorted(data["stages"].items(), key=lambda item: -item[1]["seconds"]):
+        lines.append(f"{name:22} | {timer_['calls']:7d} | {timer_['seconds']:9.3f}")
+
+    totals = {
+        gov: entry["stages"].get("governorate", {}).get("seconds", 0.0)
+        for gov, entry in data["governorates"].items()
+    }
+    if any(totals.values()):
+        lines += ["", f"Slowest governorates (build time, top {top}):"]
+        for gov, seconds in sorted(totals.items(), key=lambda item: -item[1])[:top]:
+            stages = data["governorates"][gov]["stages"]
+            detail = ", ".join(
+                f"{name} {t['seconds']:.3f}s" for name, t in stages.items() if name != "governorate"
+            )
+            lines.append(f"  {gov:14} {seconds:8.3f}s  ({detail})")
+    return "\n".join(lines)
+
+
+@contextmanager
+def profile(name, mode="cprofile", output_dir=PROFILE_DIR):
+    """Run the enclosed block under ``mode`` and write profiling output.
+
+    Writes ``{name}.timings.json`` (the timer report plus wall time) and
+    either ``{name}.prof`` / ``{name}.pstats.txt`` (cProfile) or
+    ``{name}.tracemalloc.txt`` (top allocations and peak traced memory).
+    Yields the path of the timing report.
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode: {mode} (expected one of {PROFILE_MODES})")
+    os.makedirs(output_dir, exist_ok=True)
+    base = os.path.join(output_dir, name)
+    reset()
+
+    profiler = None
+    if mode == "cprofile":
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    else:
+        import tracemalloc
+
+        tracemalloc.start(25)
+
+    started = time.perf_counter()
+    try:
+        yield base + ".timings.json"
+    finally:
+        wall = time.perf_counter() - started
+        extra = {}
+        if mode == "cprofile":
+            import io
+            import pstats
+
+            profiler.disable()
+            profiler.dump_stats(base + ".prof")
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(40)
+            with open(base + ".pstats.txt", "w", encoding="utf-8") as f:
+                f.write(stream.getvalue())
+        else:
+            import tracemalloc
+
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            extra["traced_memory_bytes"] = {"current": current, "peak": peak}
+            with open(base + ".tracemalloc.txt", "w", encoding="utf-8") as f:
+                f.write(f"Peak traced memory: {peak / (1 << 20):.1f} MiB\n\n")
+                for stat in snapshot.statistics("lineno")[:40]:
+                    f.write(f"{stat}\n")
+
+        timings = {"name": name, "mode": mode, "wall_seconds": wall, **extra, **report()}
+        with open(base + ".timings.json", "w", encoding="utf-8") as f:
+            json.dump(timings, f, indent=2)
+
+
+def add_profile_arguments(parser):
+    """Add ``--profile [cprofile|tracemalloc]`` and ``--profile-dir`` to a CLI"""
+    parser.add_argument("--profile", nargs="?", const="cprofile", choices=PROFILE_MODES,
+                        help="profile the run (default mode: cprofile) and write a JSON timing report")
+    parser.add_argument("--profile-dir", default=PROFILE_DIR,
+                        help=f"directory for profiling output (default: {PROFILE_DIR})")
+
+
+@contextmanager
+def profile_from_args(args, name):
+    """``profile()`` if ``--profile`` was given, then print the timing summary"""
+    if not args.profile:
+        yield None
+        return
+    with profile(name, args.profile, args.profile_dir) as path:
+        yield path
+    print("\n" + format_report())
+    print(f"\nTiming report saved to {path}")
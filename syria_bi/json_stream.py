@@ -0,0 +1,162 @@
+"""
+Streaming JSON Writer
+Writes a top-level JSON object one key at a time so only the entry being
+written has to be held in memory. Output goes to a temporary file next to
+the target, which is atomically renamed into place when writing succeeds.
+``iter_json_object`` reads such a file back the same way.
+"""
+
+import json
+import os
+import tempfile
+
+try:
+    import orjson
+except ImportError:  # optional faster encoder
+    orjson = None
+
+
+def _default(value):
+    # NumPy scalars and arrays that slipped through without conversion
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class StreamingJSONWriter:
+    """Incrementally write ``{key: value, ...}`` to ``path``.
+
+    With ``compact=True`` no whitespace is emitted; otherwise the output is
+    identical to ``json.dump(obj, f, indent=2, ensure_ascii=False)``.
+    ``fast=True`` uses orjson for compact output when it is installed; orjson
+    writes NaN and infinities as ``null`` and may spell floats differently,
+    so indented output always uses the standard encoder.
+
+        with StreamingJSONWriter('out.json') as writer:
+            for key, value in items:
+                writer.write(key, value)
+    """
+
+    def __init__(self, path, compact=True, fast=True):
+        self.path = path
+        self.compact = compact
+        self.use_orjson = fast and compact and orjson is not None
+        self.count = 0
+        self._file = None
+        self._temp_path = None
+
+    def __enter__(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, self._temp_path = tempfile.mkstemp(
+            prefix=f".{os.path.basename(self.path)}.", suffix=".tmp", dir=directory
+        )
+        self._file = os.fdopen(fd, "wb")
+        self._file.write(b"{")
+        return self
+
+    def _encode(self, value):
+        if self.use_orjson:
+            option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            return orjson.dumps(value, default=_default, option=option)
+        if self.compact:
+            text = json.dumps(
+                value, ensure_ascii=False, separators=(",", ":"), default=_default
+            )
+        else:
+            text = json.dumps(value, ensure_ascii=False, indent=2, default=_default)
+        return text.encode("utf-8")
+
+    def write(self, key, value):
+        """Encode one entry, append it to the output and return its size in bytes"""
+        key = json.dumps(str(key), ensure_ascii=False).encode("utf-8")
+        value = self._encode(value)
+        if self.compact:
+            chunk = key + b":" + value
+            separator = b","
+        else:
+            chunk = b"  " + key + b": " + value.replace(b"\n", b"\n  ")
+            separator = b",\n"
+        chunk = (separator if self.count else b"" if self.compact else b"\n") + chunk
+        self._file.write(chunk)
+        self.count += 1
+        return len(chunk)
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                if not self.compact and self.count:
+                    self._file.write(b"\n")
+                self._file.write(b"}")
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._file.close()
+            if exc_type is None:
+                os.chmod(self._temp_path, 0o644)
+                os.replace(self._temp_path, self.path)
+        finally:
+            if os.path.exists(self._temp_path):
+                os.remove(self._temp_path)
+        return False
+
+
+def iter_json_object(path, chunk_size=1 << 20):
+    """Yield the ``(key, value)`` entries of a top-level JSON object in
+    ``path`` one at a time, holding only the entry being parsed in memory"""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        position = 0
+        eof = False
+
+        def fill():
+            # Read at least as much as is still unparsed, so an entry that
+            # spans many chunks is retried at doubling sizes: linear overall
+            nonlocal buffer, position, eof
+            chunk = f.read(max(chunk_size, len(buffer) - position))
+            buffer = buffer[position:] + chunk
+            position = 0
+            eof = not chunk
+            return not eof
+
+        def skip_space():
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position] in " \t\r\n":
+                    position += 1
+                if position < len(buffer) or not fill():
+                    return buffer[position:position + 1]
+
+        def expect(characters):
+            nonlocal position
+            found = skip_space()
+            if not found or found not in characters:
+                raise ValueError(f"Expected one of {characters!r} in {path}, found {found!r}")
+            position += 1
+            return found
+
+        def decode():
+            nonlocal position
+            skip_space()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if not fill():
+                        raise
+                    continue
+                # A number at the end of the buffer may continue in the next chunk
+                if end == len(buffer) and not eof and fill():
+                    continue
+                position = end
+                return value
+
+        expect("{")
+        if skip_space() == "}":
+            return
+        while True:
+            key = decode()
+            expect(":")
+            yield key, decode()
+            if expect(",}") == "}":
+                return
+
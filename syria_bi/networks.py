@@ -0,0 +1,464 @@
+"""
+Network Builder
+Per-governorate metrics, post/pre BI networks and the clustered
+(level-of-detail) network, built from the company DataFrame.
+"""
+
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+from .graph_analytics import analyze_networks
+from .instrumentation import count, timer
+from .stats import bootstrap_intervals
+
+# Level-of-detail settings: companies are grouped into one cluster per
+# industry x BI_Implementation_Year bucket (bucket width in years)
+LOD_YEAR_BUCKET = 1
+
+# Number of bootstrap resamples for the pre/post BI confidence intervals
+BOOTSTRAP_RESAMPLES = 1000
+
+# Seed of the simulated inter-company (data_flow) links. Each governorate
+# draws from its own stream, so its networks do not depend on the others.
+NETWORK_SEED = 42
+
+
+def build_lod_network(gov, gov_df, industries):
+    """Build the clustered (level-of-detail) network for one governorate.
+
+    Every company is assigned to an industry x implementation-year cluster.
+    Cluster nodes carry aggregated metrics and member counts only; the member
+    companies are built by ``build_lod_clusters`` into separate files that
+    the frontend fetches when a cluster is expanded.
+    """
+    industry_list = industries.tolist()
+    nodes = [{
+        'id': f'{gov}_hub',
+        'type': 'decision_maker',
+        'label': f'{gov} Hub',
+        'size': 50,
+        'group': 0
+    }]
+    links = []
+
+    industry_counts = gov_df['Industry'].value_counts()
+    for industry in industry_list:
+        if industry not in industry_counts:
+            continue
+        n_members = int(industry_counts[industry])
+        nodes.append({
+            'id': f'{gov}_{industry}',
+            'type': 'process',
+            'label': industry,
+            'size': 30 + n_members * 2,
+            'group': industry_list.index(industry) + 1,
+            'company_count': n_members
+        })
+        links.append({
+            'source': f'{gov}_hub',
+            'target': f'{gov}_{industry}',
+            'type': 'governance',
+            'strength': n_members / 10
+        })
+
+    summary = _lod_groups(gov_df).agg(
+        member_count=('Company_ID', 'size'),
+        agility=('Post_BI_Decision_Making_Agility_Score', 'mean'),
+        pre_agility=('Pre_BI_Decision_Making_Agility_Score', 'mean'),
+        efficiency=('Post_BI_Operational_Efficiency_Index', 'mean'),
+        pre_efficiency=('Pre_BI_Operational_Efficiency_Index', 'mean'),
+        data_driven=('Post_BI_Data_Driven_Decisions_Percentage', 'mean'),
+        pre_data_driven=('Pre_BI_Data_Driven_Decisions_Percentage', 'mean'),
+        revenue_growth=('Revenue_Growth_After_BI_Percentage', 'mean'),
+    )
+
+    for (industry, year), row in summary.iterrows():
+        cluster_id = _cluster_id(gov, industry, year)
+        label = f'{industry} {int(year)}'
+        if LOD_YEAR_BUCKET > 1:
+            label = f'{industry} {int(year)}-{int(year) + LOD_YEAR_BUCKET - 1}'
+        member_count = int(row['member_count'])
+        nodes.append({
+            'id': cluster_id,
+            'type': 'cluster',
+            'label': label,
+            'size': 12 + np.sqrt(member_count) * 4,
+            'group': industry_list.index(industry) + 1,
+            'industry': industry,
+            'bi_year': int(year),
+            'parent': f'{gov}_{industry}',
+            'member_count': member_count,
+            'agility': float(row['agility']),
+            'pre_agility': float(row['pre_agility']),
+            'efficiency': float(row['efficiency']),
+            'pre_efficiency': float(row['pre_efficiency']),
+            'data_driven': float(row['data_driven']),
+            'pre_data_driven': float(row['pre_data_driven']),
+            'revenue_growth': float(row['revenue_growth'])
+        })
+        links.append({
+            'source': cluster_id,
+            'target': f'{gov}_{industry}',
+            'type': 'belongs_to',
+            'strength': min(member_count / 5, 2.0)
+        })
+
+    return {
+        'nodes': nodes,
+        'links': links
+    }
+
+
+def lod_cluster_members(gov, gov_df, industries):
+    """Member companies of each cluster of ``build_lod_network``, as
+    ``{cluster id: [company node, ...]}`` (all companies, no sampling)"""
+    industry_list = industries.tolist()
+    clusters = {}
+    for (industry, year), members in _lod_groups(gov_df):
+        clusters[_cluster_id(gov, industry, year)] = [{
+            'id': f'company_{company_id}',
+            'type': 'data_source',
+            'label': f'Company {company_id}',
+            'size': 10 + (agility + efficiency / 10),
+            'group': industry_list.index(industry) + 1,
+            'industry': industry,
+            'bi_year': int(bi_year),
+            'agility': agility,
+            'pre_agility': pre_agility,
+            'efficiency': efficiency,
+            'pre_efficiency': pre_efficiency,
+            'data_driven': data_driven,
+            'revenue_growth': revenue_growth
+        } for company_id, bi_year, agility, pre_agility, efficiency, pre_efficiency, data_driven, revenue_growth
+            in zip(members['Company_ID'].tolist(),
+                   members['BI_Implementation_Year'].tolist(),
+                   members['Post_BI_Decision_Making_Agility_Score'].tolist(),
+                   members['Pre_BI_Decision_Making_Agility_Score'].tolist(),
+                   members['Post_BI_Operational_Efficiency_Index'].tolist(),
+                   members['Pre_BI_Operational_Efficiency_Index'].tolist(),
+                   members['Post_BI_Data_Driven_Decisions_Percentage'].tolist(),
+                   members['Revenue_Growth_After_BI_Percentage'].tolist())]
+
+    return clusters
+
+
+def _lod_groups(gov_df):
+    bucket = (gov_df['BI_Implementation_Year'] // LOD_YEAR_BUCKET) * LOD_YEAR_BUCKET
+    return gov_df.assign(_bucket=bucket).groupby(['Industry', '_bucket'], sort=True)
+
+
+def _cluster_id(gov, industry, year):
+    return f'{gov}_{industry}_{int(year)}'
+
+
+def build_governorate(gov, gov_df, industries, governorate_ci, industry_ci, analytics,
+                      seed=NETWORK_SEED):
+    """Build the metrics and all networks of one governorate.
+
+    ``industries`` is the array of industries of the full dataset (it fixes
+    node groups); ``governorate_ci`` and ``industry_ci`` are the bootstrap
+    intervals from ``bootstrap_intervals`` for the whole dataset, and
+    ``analytics`` is this governorate's entry of ``network_analytics``.
+    """
+    # Calculate aggregated metrics
+    with timer('metrics', gov):
+        metrics = _governorate_metrics(gov, gov_df, governorate_ci, industry_ci)
+
+    # Company nodes (Data Sources) - sample for visualization
+    sampled_companies = _sample_companies(gov_df)
+
+    with timer('network_post', gov):
+        network = _build_post_network(gov, gov_df, industries, sampled_companies,
+                                      _link_rng(gov, seed))
+    with timer('network_pre', gov):
+        pre_bi_network = _build_pre_network(gov, gov_df, industries, sampled_companies,
+                                            _link_rng(gov, seed))
+
+    metrics['network_analytics'] = analytics
+    with timer('lod_network', gov):
+        lod_network = build_lod_network(gov, gov_df, industries)
+
+    for name, net in (('post', network), ('pre', pre_bi_network), ('lod', lod_network)):
+        count(f'{name}_nodes', len(net['nodes']), gov)
+        count(f'{name}_links', len(net['links']), gov)
+
+    return {
+        'metrics': metrics,
+        'network': network,
+        'pre_bi_network': pre_bi_network,
+        'lod_network': lod_network
+    }
+
+
+def _governorate_metrics(gov, gov_df, governorate_ci, industry_ci):
+    return {
+        'total_companies': len(gov_df),
+        'industries': gov_df['Industry'].value_counts().to_dict(),
+        'avg_pre_bi_agility': gov_df['Pre_BI_Decision_Making_Agility_Score'].mean(),
+        'avg_post_bi_agility': gov_df['Post_BI_Decision_Making_Agility_Score'].mean(),
+        'avg_pre_bi_efficiency': gov_df['Pre_BI_Operational_Efficiency_Index'].mean(),
+        'avg_post_bi_efficiency': gov_df['Post_BI_Operational_Efficiency_Index'].mean(),
+        'avg_pre_bi_data_driven': gov_df['Pre_BI_Data_Driven_Decisions_Percentage'].mean(),
+        'avg_post_bi_data_driven': gov_df['Post_BI_Data_Driven_Decisions_Percentage'].mean(),
+        'avg_revenue_growth': gov_df['Revenue_Growth_After_BI_Percentage'].mean(),
+        'avg_cost_reduction': gov_df['Cost_Reduction_After_BI_Percentage'].mean(),
+        'avg_customer_satisfaction': gov_df['Customer_Satisfaction_Increase_After_BI_Percentage'].mean(),
+        'avg_market_share': gov_df['Market_Share_Increase_After_BI_Percentage'].mean(),
+        'avg_agility_improvement': gov_df['Decision_Making_Agility_Improvement'].mean(),
+        'avg_efficiency_improvement': gov_df['Operational_Efficiency_Improvement'].mean(),
+        'avg_data_driven_improvement': gov_df['Data_Driven_Decisions_Improvement'].mean(),
+        'bi_years': sorted(gov_df['BI_Implementation_Year'].unique().tolist()),
+        'improvement_ci': governorate_ci[gov],
+        'industry_improvement_ci': {
+            industry: ci for (ci_gov, industry), ci in industry_ci.items() if ci_gov == gov
+        }
+    }
+
+
+def network_analytics(df, industries, seed=NETWORK_SEED):
+    """Connectivity and centrality of every governorate's post/pre BI network.
+
+    The networks are built over all companies of each governorate, not the
+    visualization sample, and all governorates are analyzed in one batch per
+    network. Returns ``{governorate: {'population', 'seed', 'post', 'pre'}}``.
+    """
+    post, pre = {}, {}
+    for gov, gov_df in df.groupby('Governorate', sort=False):
+        post[gov] = _build_post_network(gov, gov_df, industries, gov_df, _link_rng(gov, seed))
+        pre[gov] = _build_pre_network(gov, gov_df, industries, gov_df, _link_rng(gov, seed))
+    post = analyze_networks(post)
+    pre = analyze_networks(pre)
+    return {
+        # The data_flow links are simulated; the seed makes them reproducible
+        gov: {'population': 'all_companies', 'seed': seed, 'post': post[gov], 'pre': pre[gov]}
+        for gov in post
+    }
+
+
+def _link_rng(gov, seed):
+    return np.random.default_rng([seed, zlib.crc32(str(gov).encode('utf-8'))])
+
+
+def _sample_companies(gov_df):
+    company_sample_size = min(50, len(gov_df))  # Limit to 50 for performance
+    return gov_df.sample(n=company_sample_size, random_state=42) if len(gov_df) > company_sample_size else gov_df
+
+
+def _build_post_network(gov, gov_df, industries, companies, rng):
+    # Generate network nodes and links
+    # Nodes: Companies (Data Sources), Industries (Processes/Silos), Governorate (Decision Maker Hub)
+    nodes = []
+    links = []
+    
+    # Add governorate as central decision maker hub
+    nodes.append({
+        'id': f'{gov}_hub',
+        'type': 'decision_maker',
+        'label': f'{gov} Hub',
+        'size': 50,
+        'group': 0
+    })
+    
+    # Add industry nodes (Processes/Silos)
+    industry_nodes = {}
+    for idx, industry in enumerate(industries):
+        industry_companies = gov_df[gov_df['Industry'] == industry]
+        if len(industry_companies) > 0:
+            node_id = f'{gov}_{industry}'
+            industry_nodes[industry] = node_id
+            nodes.append({
+                'id': node_id,
+                'type': 'process',
+                'label': industry,
+                'size': 30 + len(industry_companies) * 2,
+                'group': idx + 1,
+                'company_count': len(industry_companies)
+            })
+        
+            # Link industry to governorate hub
+            links.append({
+                'source': f'{gov}_hub',
+                'target': node_id,
+                'type': 'governance',
+                'strength': len(industry_companies) / 10
+            })
+    
+    # Add company nodes (Data Sources)
+    industry_groups = {industry: idx + 1 for idx, industry in enumerate(industries.tolist())}
+    earlier_companies = defaultdict(list)
+    for idx, company in zip(companies.index, companies.to_dict('records')):
+        company_id = f'company_{company["Company_ID"]}'
+        industry = company['Industry']
+    
+        # Determine node properties based on BI metrics
+        agility_score = company['Post_BI_Decision_Making_Agility_Score']
+        efficiency = company['Post_BI_Operational_Efficiency_Index']
+    
+        nodes.append({
+            'id': company_id,
+            'type': 'data_source',
+            'label': f"Company {company['Company_ID']}",
+            'size': 10 + (agility_score + efficiency / 10),
+            'group': industry_groups[industry],
+            'industry': industry,
+            'agility': agility_score,
+            'efficiency': efficiency,
+            'data_driven': company['Post_BI_Data_Driven_Decisions_Percentage'],
+            'revenue_growth': company['Revenue_Growth_After_BI_Percentage']
+        })
+    
+        # Link company to its industry
+        if industry in industry_nodes:
+            links.append({
+                'source': company_id,
+                'target': industry_nodes[industry],
+                'type': 'belongs_to',
+                'strength': 1.0
+            })
+    
+        # Create some inter-company connections (simulating data sharing)
+        if idx % 3 == 0 and earlier_companies[industry]:
+            with timer('links', gov):
+                # Connect to a random earlier company in same industry
+                targets = earlier_companies[industry]
+                links.append({
+                    'source': company_id,
+                    'target': targets[rng.integers(len(targets))],
+                    'type': 'data_flow',
+                    'strength': 0.5
+                })
+        earlier_companies[industry].append(company_id)
+
+    return {
+        'nodes': nodes,
+        'links': links
+    }
+
+
+def _build_pre_network(gov, gov_df, industries, companies, rng):
+    # Generate pre-BI network (more fragmented, fewer connections)
+    pre_bi_nodes = []
+    pre_bi_links = []
+    
+    # Add governorate hub
+    pre_bi_nodes.append({
+        'id': f'{gov}_hub',
+        'type': 'decision_maker',
+        'label': f'{gov} Hub',
+        'size': 40,
+        'group': 0
+    })
+    
+    # Add industry nodes (more isolated)
+    industry_nodes = {}
+    for idx, industry in enumerate(industries):
+        industry_companies = gov_df[gov_df['Industry'] == industry]
+        if len(industry_companies) > 0:
+            node_id = f'{gov}_{industry}'
+            industry_nodes[industry] = node_id
+            pre_bi_nodes.append({
+                'id': node_id,
+                'type': 'process',
+                'label': industry,
+                'size': 25 + len(industry_companies) * 1.5,
+                'group': idx + 1,
+                'company_count': len(industry_companies)
+            })
+        
+            # Weaker connection to hub
+            pre_bi_links.append({
+                'source': f'{gov}_hub',
+                'target': node_id,
+                'type': 'governance',
+                'strength': len(industry_companies) / 20
+            })
+    
+    # Add company nodes with pre-BI metrics
+    industry_groups = {industry: idx + 1 for idx, industry in enumerate(industries.tolist())}
+    earlier_companies = defaultdict(list)
+    for idx, company in zip(companies.index, companies.to_dict('records')):
+        company_id = f'company_{company["Company_ID"]}'
+        industry = company['Industry']
+    
+        agility_score = company['Pre_BI_Decision_Making_Agility_Score']
+        efficiency = company['Pre_BI_Operational_Efficiency_Index']
+    
+        pre_bi_nodes.append({
+            'id': company_id,
+            'type': 'data_source',
+            'label': f"Company {company['Company_ID']}",
+            'size': 8 + (agility_score + efficiency / 15),
+            'group': industry_groups[industry],
+            'industry': industry,
+            'agility': agility_score,
+            'efficiency': efficiency,
+            'data_driven': company['Pre_BI_Data_Driven_Decisions_Percentage']
+        })
+    
+        # Link company to industry (weaker)
+        if industry in industry_nodes:
+            pre_bi_links.append({
+                'source': company_id,
+                'target': industry_nodes[industry],
+                'type': 'belongs_to',
+                'strength': 0.7
+            })
+    
+        # Fewer inter-company connections (fragmented)
+        if idx % 7 == 0 and earlier_companies[industry]:
+            with timer('links', gov):
+                targets = earlier_companies[industry]
+                pre_bi_links.append({
+                    'source': company_id,
+                    'target': targets[rng.integers(len(targets))],
+                    'type': 'data_flow',
+                    'strength': 0.3
+                })
+        earlier_companies[industry].append(company_id)
+
+    return {
+        'nodes': pre_bi_nodes,
+        'links': pre_bi_links
+    }
+
+
+def build_networks(df, bootstrap_resamples=BOOTSTRAP_RESAMPLES, seed=NETWORK_SEED):
+    """Yield ``(governorate, data)`` pairs, one governorate at a time.
+
+    Being a generator, it lets writers emit each governorate as soon as it
+    is built instead of holding the whole output in memory. The same
+    ``seed`` gives the same networks.
+    """
+    governorates = df['Governorate'].unique()
+    industries = df['Industry'].unique()
+
+    # Bootstrap confidence intervals of the paired pre/post BI differences,
+    # computed for all governorates and governorate x industry groups at once
+    with timer('bootstrap'):
+        governorate_ci = bootstrap_intervals(df, 'Governorate', n_resamples=bootstrap_resamples)
+        industry_ci = bootstrap_intervals(df, ['Governorate', 'Industry'], n_resamples=bootstrap_resamples)
+
+    # Graph analytics over the full-population networks of all governorates
+    with timer('analytics'):
+        analytics = network_analytics(df, industries, seed)
+
+    for gov in governorates:
+        with timer('governorate', gov):
+            gov_df = df[df['Governorate'] == gov]
+            count('companies', len(gov_df), gov)
+            data = build_governorate(gov, gov_df, industries, governorate_ci, industry_ci,
+                                     analytics[gov], seed)
+        yield gov, data
+
+
+def build_lod_clusters(df):
+    """Yield ``(governorate, {cluster id: [company node, ...]})`` pairs: the
+    member companies of the clusters in each governorate's ``lod_network``.
+    """
+    industries = df['Industry'].unique()
+    for gov in df['Governorate'].unique():
+        with timer('lod_clusters', gov):
+            clusters = lod_cluster_members(gov, df[df['Governorate'] == gov], industries)
+        yield gov, clusters
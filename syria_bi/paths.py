@@ -0,0 +1,16 @@
+"""
+Default file locations, relative to the working directory.
+Kept free of heavy imports so it can be read without loading pandas.
+"""
+
+RAW_DATA_FILE = "expanded_syria_bi_data.csv"
+CORRECTED_DATA_FILE = "expanded_syria_bi_data_corrected.csv"
+NETWORKS_FILE = "governorate_networks.json"
+CLUSTERS_DIR = "governorate_clusters"
+CUBE_FILE = "governorate_cube.json"
+COHORTS_FILE = "governorate_cohorts.json"
+CORRECTIONS_LOG_FILE = "data_corrections_log.txt"
+VERIFICATION_REPORT_FILE = "data_verification_report.txt"
+COLUMN_STORE_DIR = "company_columns"
+SKETCH_FILE = "governorate_sketches.json"
+EXPORT_DIR = "exports"
@@ -0,0 +1,291 @@
+"""
+Pipeline orchestrator: raw -> correct -> process -> verify as a DAG of stages.
+
+Every stage has a cache key built from its code, parameters, input files and
+the last run of each stage it depends on, so a stage reruns whenever one of
+its dependencies did. A stage whose key matches the manifest of its last
+run, and whose output files are unchanged, is skipped. Values are
+passed between stages in memory; a skipped stage's value is only reloaded
+from its output files if a stage that does run needs it, so the CSV is read
+at most once per run.
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import time
+from datetime import datetime
+
+from .paths import (
+    CLUSTERS_DIR,
+    COHORTS_FILE,
+    COLUMN_STORE_DIR,
+    CORRECTED_DATA_FILE,
+    CORRECTIONS_LOG_FILE,
+    CUBE_FILE,
+    NETWORKS_FILE,
+    RAW_DATA_FILE,
+    VERIFICATION_REPORT_FILE,
+)
+
+CACHE_DIR = ".pipeline_cache"
+
+# Bump to invalidate every cached stage (e.g. after a change outside syria_bi)
+PIPELINE_VERSION = 1
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def code_digest(modules):
+    """SHA-256 over the source of ``modules`` without importing them"""
+    digest = hashlib.sha256()
+    for name in modules:
+        origin = importlib.util.find_spec(name).origin
+        with open(origin, "rb") as f:
+            digest.update(name.encode("utf-8") + b"\0" + f.read())
+    return digest.hexdigest()
+
+
+def _file_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class Stage:
+    """One pipeline step.
+
+    ``run(inputs)`` receives the values of ``deps`` (in order), writes
+    ``outputs`` and returns the stage value. ``load()`` rebuilds the value
+    from ``outputs`` when the stage is skipped; without it the value recorded
+    in the manifest (which must then be JSON-serializable) is reused.
+    """
+
+    def __init__(self, name, run, deps=(), input_files=(), outputs=(), modules=(),
+                 params=None, load=None):
+        self.name = name
+        self.run = run
+        self.deps = tuple(deps)
+        self.input_files = tuple(input_files)
+        self.outputs = tuple(outputs)
+        self.modules = tuple(modules)
+        self.params = params or {}
+        self.load = load
+
+
+class Pipeline:
+    """Runs stages in dependency order with on-disk stage caching"""
+
+    def __init__(self, stages, cache_dir=CACHE_DIR):
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache_dir = cache_dir
+        self._keys = {}
+        self._values = {}
+        self.report = []
+
+    def order(self, targets=None):
+        """Topological order of ``targets`` (default: all) and their dependencies"""
+        ordered = []
+        seen = set()
+
+        def visit(name, path=()):
+            if name in path:
+                raise ValueError(f"Dependency cycle: {' -> '.join(path + (name,))}")
+            if name in seen:
+                return
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name}")
+            for dep in self.stages[name].deps:
+                visit(dep, path + (name,))
+            seen.add(name)
+            ordered.append(name)
+
+        for name in targets or self.stages:
+            visit(name)
+        return ordered
+
+    def key(self, name):
+        """Cache key of a stage; only final once its dependencies are up to date"""
+        if name not in self._keys:
+            stage = self.stages[name]
+            payload = {
+                "stage": name,
+                "pipeline_version": PIPELINE_VERSION,
+                "code": code_digest(stage.modules),
+                "params": stage.params,
+                "inputs": {path: file_digest(path) for path in stage.input_files},
+                "deps": {dep: self.run_stamp(dep) for dep in stage.deps},
+            }
+            encoded = json.dumps(payload, sort_keys=True).encode("utf-8")
+            self._keys[name] = hashlib.sha256(encoded).hexdigest()
+        return self._keys[name]
+
+    def run_stamp(self, name):
+        """Digest of what the last run of a stage handed to its dependents:
+        its key, output file stamps and recorded value"""
+        manifest = self._read_manifest(name)
+        if manifest is None:
+            return None
+        payload = {field: manifest.get(field) for field in ("key", "outputs", "value")}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _manifest_path(self, name):
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    def _read_manifest(self, name):
+        try:
+            with open(self._manifest_path(name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_manifest(self, name, value):
+        stage = self.stages[name]
+        manifest = {
+            "key": self.key(name),
+            "outputs": {path: _file_stamp(path) for path in stage.outputs},
+            "value": value if stage.load is None else None,
+            "finished": datetime.now().isoformat(timespec="seconds"),
+        }
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = self._manifest_path(name) + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, default=str)
+        os.replace(temp_path, self._manifest_path(name))
+
+    def is_cached(self, name):
+        manifest = self._read_manifest(name)
+        if manifest is None or manifest.get("key") != self.key(name):
+            return False
+        for path in self.stages[name].outputs:
+            if not os.path.exists(path) or _file_stamp(path) != manifest["outputs"].get(path):
+                return False
+        return True
+
+    def value(self, name):
+        """Value of a stage, reloading a skipped stage's value on first use"""
+        if name not in self._values:
+            stage = self.stages[name]
+            if stage.load is not None:
+                self._values[name] = stage.load()
+            else:
+                self._values[name] = self._read_manifest(name)["value"]
+        return self._values[name]
+
+    def run(self, targets=None, force=False):
+        """Run ``targets`` and their dependencies; returns the stage report"""
+        self.report = []
+        self._keys = {}
+        for name in self.order(targets):
+            stage = self.stages[name]
+            started = time.perf_counter()
+            if not force and self.is_cached(name):
+                status = "cached"
+            else:
+                inputs = [self.value(dep) for dep in stage.deps]
+                self._values[name] = stage.run(*inputs)
+                self._write_manifest(name, self._values[name])
+                status = "ran"
+            self.report.append({
+                "stage": name,
+                "status": status,
+                "seconds": time.perf_counter() - started,
+            })
+        return self.report
+
+
+def _load_raw():
+    from .storage import load
+
+    return load(RAW_DATA_FILE)
+
+
+def _load_corrected():
+    from .storage import load
+
+    return load(CORRECTED_DATA_FILE)
+
+
+def _correct(raw):
+    from .correction import correct, write_corrections_log
+
+    df, corrections_made = correct(raw)
+    df.to_csv(CORRECTED_DATA_FILE, index=False, encoding="utf-8")
+    write_corrections_log(len(raw), df, corrections_made)
+    return df
+
+
+def _process(df, compact=True):
+    from .cube import build_cube, save_cube
+    from .networks import build_lod_clusters, build_networks
+    from .storage import export, export_clusters
+
+    count = export(build_networks(df), NETWORKS_FILE, compact=compact)
+    export_clusters(build_lod_clusters(df), CLUSTERS_DIR)
+    save_cube(build_cube(df), CUBE_FILE)
+    return {"governorates": count}
+
+
+def _cohorts(df):
+    from .cohorts import build_cohorts, save_cohorts
+
+    save_cohorts(build_cohorts(df), COHORTS_FILE)
+    return {"rows": len(df)}
+
+
+def _columns(df):
+    from .columnstore import write_column_store
+
+    write_column_store(df, COLUMN_STORE_DIR)
+    return {"rows": len(df)}
+
+
+def _verify_accuracy(raw):
+    from .verification import render_verification_report, verify
+
+    results = verify(raw)
+    with open(VERIFICATION_REPORT_FILE, "w", encoding="utf-8") as f:
+        f.write(render_verification_report(raw, results))
+    return results
+
+
+def _verify_networks(processed):
+    from .storage import load_networks
+    from .verification import summarize_networks
+
+    return summarize_networks(load_networks(NETWORKS_FILE))
+
+
+def default_stages(compact=True):
+    """The README workflow as stages:
+    correct_data_issues -> process_data -> verify_data_accuracy / verify_data
+    """
+    return [
+        Stage("raw", _load_raw, input_files=[RAW_DATA_FILE],
+              modules=["syria_bi.storage"], load=_load_raw),
+        Stage("correct", _correct, deps=["raw"],
+              outputs=[CORRECTED_DATA_FILE, CORRECTIONS_LOG_FILE],
+              modules=["syria_bi.correction"], load=_load_corrected),
+        Stage("process", lambda df: _process(df, compact=compact), deps=["correct"],
+              outputs=[NETWORKS_FILE, CLUSTERS_DIR, CUBE_FILE],
+              modules=["syria_bi.networks", "syria_bi.stats", "syria_bi.graph_analytics",
+                       "syria_bi.cube", "syria_bi.json_stream", "syria_bi.storage"],
+              params={"compact": compact}),
+        Stage("cohorts", _cohorts, deps=["correct"], outputs=[COHORTS_FILE],
+              modules=["syria_bi.cohorts", "syria_bi.stats"]),
+        Stage("columns", _columns, deps=["correct"],
+              outputs=[os.path.join(COLUMN_STORE_DIR, "manifest.json")],
+              modules=["syria_bi.columnstore", "syria_bi.indexes"]),
+        Stage("verify_accuracy", _verify_accuracy, deps=["raw"],
+              outputs=[VERIFICATION_REPORT_FILE],
+              modules=["syria_bi.verification", "syria_bi.sketches"]),
+        Stage("verify_networks", _verify_networks, deps=["process"],
+              modules=["syria_bi.verification", "syria_bi.sketches", "syria_bi.storage"]),
+    ]
@@ -0,0 +1,592 @@
+"""
+Streaming Sketches
+Mergeable summaries of the company table for inputs too large to load:
+
+- ``QuantileSketch``: relative-error quantiles (DDSketch) with exact
+  count, sum, min and max.
+- ``HyperLogLog``: distinct counts; exact while a column has at most
+  ``2 ** precision`` distinct values, approximate (about 1.6% standard error
+  at the default precision) beyond that.
+- ``DatasetSketch``: one ``ColumnSketch`` per column, overall and per
+  governorate, plus exact tallies of low-cardinality columns and named row
+  counters. Memory depends on the number of columns and governorates, not on
+  the number of rows.
+
+Every sketch has ``merge(other)``, so chunks can be sketched separately (in
+other processes too) and combined, and ``to_dict`` / ``from_dict``.
+
+    sketch = sketch_csv("expanded_syria_bi_data.csv", chunk_size=100_000, workers=4)
+    sketch.columns["Pre_BI_Decision_Making_Agility_Score"].quantiles.quantile(0.95)
+    sketch.columns["Reference"].distinct.estimate()
+    sketch.summary("Aleppo")
+"""
+
+import base64
+import json
+import math
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import count, timer
+from .paths import SKETCH_FILE
+
+SKETCH_VERSION = 1
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+MAX_BUCKETS = 2048
+# Magnitudes at or below this are counted as zero
+MIN_INDEXABLE = 1e-9
+
+DEFAULT_PRECISION = 12
+
+DEFAULT_CHUNK_SIZE = 100_000
+GROUP_COLUMN = "Governorate"
+# Columns with few distinct values, tallied exactly
+EXACT_COLUMNS = ("Governorate", "Industry", "BI_Implementation_Year")
+
+SUMMARY_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _encode_array(array):
+    return base64.b64encode(np.ascontiguousarray(array).tobytes()).decode("ascii")
+
+
+def _decode_array(text, dtype):
+    return np.frombuffer(base64.b64decode(text), dtype=dtype).copy()
+
+
+class QuantileSketch:
+    """DDSketch: values are counted in logarithmic buckets of width ``gamma``.
+
+    Every quantile is within ``relative_accuracy`` of a value of that rank
+    (until more than ``max_buckets`` buckets are needed, when the buckets
+    closest to zero are folded together). Count, sum, min and max are exact.
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY, max_buckets=MAX_BUCKETS):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.zero = 0
+        self.positive = {}  # bucket key -> count
+        self.negative = {}
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else math.nan
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.sum += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        magnitude = np.abs(values)
+        indexable = magnitude > MIN_INDEXABLE
+        self.zero += int(len(values) - indexable.sum())
+        keys = np.ceil(np.log(magnitude[indexable]) / self._log_gamma).astype(np.int64)
+        positive = values[indexable] > 0
+        self._add_keys(self.positive, keys[positive])
+        self._add_keys(self.negative, keys[~positive])
+
+    def _add_keys(self, store, keys):
+        if not len(keys):
+            return
+        unique, counts = np.unique(keys, return_counts=True)
+        for key, n in zip(unique.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + n
+        self._collapse(store)
+
+    def _collapse(self, store):
+        # Fold the buckets closest to zero into one once there are too many
+        if len(store) <= self.max_buckets:
+            return
+        keys = sorted(store)
+        folded = keys[:len(keys) - self.max_buckets]
+        target = keys[len(folded)]
+        store[target] += sum(store.pop(key) for key in folded)
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge quantile sketches with different accuracy")
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.zero += other.zero
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, n in theirs.items():
+                mine[key] = mine.get(key, 0) + n
+            self._collapse(mine)
+        return self
+
+    def _value(self, key):
+        # Midpoint (in relative terms) of bucket ``key``
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q):
+        """Approximate ``q``-quantile (0 <= q <= 1); NaN for an empty sketch"""
+        if not self.count:
+            return math.nan
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = 0
+        value = self.max
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                value = -self._value(key)
+                break
+        else:
+            seen += self.zero
+            if seen > rank:
+                value = 0.0
+            else:
+                for key in sorted(self.positive):
+                    seen += self.positive[key]
+                    if seen > rank:
+                        value = self._value(key)
+                        break
+        return min(max(value, self.min), self.max)
+
+    def to_dict(self):
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "zero": self.zero,
+            "positive": sorted(self.positive.items()),
+            "negative": sorted(self.negative.items()),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["relative_accuracy"], data["max_buckets"])
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        if data["count"]:
+            sketch.min, sketch.max = data["min"], data["max"]
+        sketch.zero = data["zero"]
+        sketch.positive = {key: n for key, n in data["positive"]}
+        sketch.negative = {key: n for key, n in data["negative"]}
+        return sketch
+
+
+def hash_values(values):
+    """64-bit hashes of the non-missing ``values`` (equal values hash equally
+    across chunks; integers and floats are hashed as floats)"""
+    values = np.asarray(values)
+    if values.dtype.kind in "iuf":
+        values = values.astype(np.float64)
+    return pd.util.hash_array(values[~pd.isna(values)])
+
+
+def _bit_length(values):
+    """Bit length of every element of a uint64 array"""
+    values = values.copy()
+    length = np.zeros(values.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = values >= np.uint64(1 << shift)
+        length[high] += shift
+        values[high] >>= np.uint64(shift)
+    return length + (values > 0)
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter with ``2 ** precision`` registers.
+
+    Up to that many distinct values the hashes themselves are kept (a sorted
+    uint64 array, no larger than the registers in bytes), so small columns
+    are counted exactly; past it the sketch switches to registers.
+    """
+
+    def __init__(self, precision=DEFAULT_PRECISION):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.hashes = np.zeros(0, dtype=np.uint64)
+        self.registers = None
+
+    @property
+    def size(self):
+        return 1 << self.precision
+
+    def add(self, values):
+        self.add_hashes(hash_values(values))
+
+    def add_hashes(self, hashes):
+        if self.registers is None:
+            self.hashes = np.union1d(self.hashes, hashes)
+            if len(self.hashes) <= self.size:
+                return
+            hashes, self.hashes = self.hashes, None
+            self.registers = np.zeros(self.size, dtype=np.uint8)
+        # Top bits pick the register; the rank is the position of the first
+        # set bit in the rest of the hash
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.intp)
+        rest = hashes & np.uint64((1 << (64 - p)) - 1)
+        rank = (64 - p) - _bit_length(rest) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLogs with different precision")
+        if other.registers is None:
+            self.add_hashes(other.hashes)
+        elif self.registers is None:
+            hashes = self.hashes
+            self.hashes, self.registers = None, other.registers.copy()
+            self.add_hashes(hashes)
+        else:
+            np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        """Estimated number of distinct values"""
+        if self.registers is None:
+            return len(self.hashes)
+        m = self.size
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        raw = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+    def to_dict(self):
+        if self.registers is None:
+            return {"precision": self.precision, "hashes": _encode_array(self.hashes.astype("<u8"))}
+        return {"precision": self.precision, "registers": _encode_array(self.registers)}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["precision"])
+        if "registers" in data:
+            sketch.hashes = None
+            sketch.registers = _decode_array(data["registers"], np.uint8)
+        else:
+            sketch.hashes = _decode_array(data["hashes"], "<u8").astype(np.uint64)
+        return sketch
+
+
+def _is_numeric(series):
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+class ColumnSketch:
+    """Non-missing count, distinct count and (numeric columns) quantiles of one column"""
+
+    def __init__(self, numeric, relative_accuracy=DEFAULT_RELATIVE_ACCURACY,
+                 precision=DEFAULT_PRECISION):
+        self.count = 0
+        self.missing = 0
+        self.distinct = HyperLogLog(precision)
+        self.quantiles = QuantileSketch(relative_accuracy) if numeric else None
+
+    @staticmethod
+    def prepare(series, numeric=True):
+        """``(valid, hashes, numbers)`` row arrays of a chunk, computed once and
+        shared by the overall and per-governorate sketches of the column
+        (``numbers`` is None unless ``numeric``)"""
+        valid = series.notna().to_numpy()
+        values = series.to_numpy()
+        if values.dtype.kind in "iuf":
+            values = values.astype(np.float64)
+        hashes = pd.util.hash_array(values)
+        numbers = None
+        if numeric:
+            numbers = pd.to_numeric(series, errors="coerce").astype("float64").to_numpy()
+        return valid, hashes, numbers
+
+    def update(self, series):
+        self.add(*self.prepare(series, self.quantiles is not None))
+
+    def add(self, valid, hashes, numbers):
+        """Add rows given as arrays from ``prepare`` (or a subset of them)"""
+        n = int(valid.sum())
+        self.count += n
+        self.missing += len(valid) - n
+        self.distinct.add_hashes(hashes[valid])
+        if self.quantiles is not None and numbers is not None:
+            self.quantiles.add(numbers)
+
+    def merge(self, other):
+        self.count += other.count
+        self.missing += other.missing
+        self.distinct.merge(other.distinct)
+        if other.quantiles is not None:
+            if self.quantiles is None:
+                self.quantiles = QuantileSketch(other.quantiles.relative_accuracy)
+            self.quantiles.merge(other.quantiles)
+        return self
+
+    def summary(self, quantiles=SUMMARY_QUANTILES):
+        result = {
+            "count": self.count,
+            "missing": self.missing,
+            "distinct": self.distinct.estimate(),
+        }
+        if self.quantiles is not None and self.quantiles.count:
+            result["mean"] = self.quantiles.mean
+            result["min"] = self.quantiles.min
+            for q in quantiles:
+                result[f"p{round(q * 100):g}"] = self.quantiles.quantile(q)
+            result["max"] = self.quantiles.max
+        return result
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "missing": self.missing,
+            "distinct": self.distinct.to_dict(),
+            "quantiles": self.quantiles.to_dict() if self.quantiles is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(numeric=False)
+        sketch.count = data["count"]
+        sketch.missing = data["missing"]
+        sketch.distinct = HyperLogLog.from_dict(data["distinct"])
+        if data["quantiles"] is not None:
+            sketch.quantiles = QuantileSketch.from_dict(data["quantiles"])
+        return sketch
+
+
+class DatasetSketch:
+    """Single-pass, bounded-memory summary of the company table.
+
+    ``counters`` maps a name to ``fn(df) -> boolean Series``; the number of
+    matching rows is added up over all chunks. ``samples`` maps a name to
+    ``(column, fn, limit)`` and keeps the first ``limit`` distinct values of
+    ``column`` in rows where ``fn`` holds. Both must be module-level functions
+    so the sketch can be built in worker processes. A sketch read back with
+    ``from_dict`` keeps their results but can only grow by merging.
+    """
+
+    def __init__(self, group_column=GROUP_COLUMN, exact_columns=EXACT_COLUMNS,
+                 counters=None, samples=None, relative_accuracy=DEFAULT_RELATIVE_ACCURACY,
+                 precision=DEFAULT_PRECISION):
+        self.group_column = group_column
+        self.exact_columns = tuple(exact_columns)
+        self.relative_accuracy = relative_accuracy
+        self.precision = precision
+        self._counter_functions = dict(counters or {})
+        self._sample_functions = dict(samples or {})
+
+        self.rows = 0
+        self.first = None  # first row, e.g. for the primary reference
+        self.columns = {}  # column -> ColumnSketch, in column order
+        self.groups = {}  # governorate -> {"rows": n, "columns": {column: ColumnSketch}}
+        self.value_counts = {column: Counter() for column in self.exact_columns}
+        self.counters = {name: 0 for name in self._counter_functions}
+        self.samples = {name: [] for name in self._sample_functions}
+        self.sample_limits = {name: spec[2] for name, spec in self._sample_functions.items()}
+
+    def _column(self, sketches, name, numeric):
+        if name not in sketches:
+            sketches[name] = ColumnSketch(numeric, self.relative_accuracy, self.precision)
+        return sketches[name]
+
+    def update(self, df):
+        """Add one chunk of rows"""
+        with timer("sketch"):
+            if not len(df):
+                return self
+            if self.first is None:
+                self.first = df.iloc[:1].to_dict("records")[0]
+            self.rows += len(df)
+            groups = df.groupby(self.group_column, sort=False).indices
+            for gov, positions in groups.items():
+                group = self.groups.setdefault(gov, {"rows": 0, "columns": {}})
+                group["rows"] += len(positions)
+
+            for name in df.columns:
+                overall = self._column(self.columns, name, _is_numeric(df[name]))
+                numeric = overall.quantiles is not None
+                valid, hashes, numbers = ColumnSketch.prepare(df[name], numeric)
+                overall.add(valid, hashes, numbers)
+                for gov, positions in groups.items():
+                    self._column(self.groups[gov]["columns"], name, numeric).add(
+                        valid[positions],
+                        hashes[positions],
+                        numbers[positions] if numeric else None,
+                    )
+
+            for column in self.exact_columns:
+                counts = df[column].value_counts()
+                self.value_counts[column].update(dict(zip(counts.index.tolist(), counts.tolist())))
+            for name, fn in self._counter_functions.items():
+                self.counters[name] += int(fn(df).sum())
+            for name, (column, fn, limit) in self._sample_functions.items():
+                self._add_samples(name, df.loc[fn(df), column].unique().tolist())
+        count("rows_sketched", len(df))
+        return self
+
+    def _add_samples(self, name, values):
+        kept = self.samples[name]
+        for value in values:
+            if len(kept) >= self.sample_limits[name]:
+                break
+            if value not in kept:
+                kept.append(value)
+
+    @staticmethod
+    def _merge_columns(mine, theirs):
+        for name, sketch in theirs.items():
+            if name in mine:
+                mine[name].merge(sketch)
+            else:
+                mine[name] = ColumnSketch.from_dict(sketch.to_dict())
+
+    def merge(self, other):
+        """Add the rows summarized by ``other`` (assumed to come after this sketch's rows)"""
+        if self.first is None:
+            self.first = other.first
+        self.rows += other.rows
+        self._merge_columns(self.columns, other.columns)
+        for gov, theirs in other.groups.items():
+            group = self.groups.setdefault(gov, {"rows": 0, "columns": {}})
+            group["rows"] += theirs["rows"]
+            self._merge_columns(group["columns"], theirs["columns"])
+        for column, counts in other.value_counts.items():
+            self.value_counts.setdefault(column, Counter()).update(counts)
+        for name, n in other.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + n
+        for name, values in other.samples.items():
+            self.samples.setdefault(name, [])
+            self.sample_limits.setdefault(name, other.sample_limits[name])
+            self._add_samples(name, values)
+        return self
+
+    def summary(self, governorate=None):
+        """``{column: ColumnSketch.summary()}`` overall or for one governorate"""
+        columns = self.columns if governorate is None else self.groups[governorate]["columns"]
+        return {name: sketch.summary() for name, sketch in columns.items()}
+
+    def to_dict(self):
+        def columns(sketches):
+            return {name: sketch.to_dict() for name, sketch in sketches.items()}
+
+        return {
+            "version": SKETCH_VERSION,
+            "group_column": self.group_column,
+            "relative_accuracy": self.relative_accuracy,
+            "precision": self.precision,
+            "rows": self.rows,
+            "first": self.first,
+            "columns": columns(self.columns),
+            "groups": {
+                gov: {"rows": group["rows"], "columns": columns(group["columns"])}
+                for gov, group in sorted(self.groups.items())
+            },
+            "value_counts": {
+                column: sorted(counts.items()) for column, counts in self.value_counts.items()
+            },
+            "counters": self.counters,
+            "samples": {
+                name: {"limit": self.sample_limits[name], "values": values}
+                for name, values in self.samples.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != SKETCH_VERSION:
+            raise ValueError(f"Unsupported sketch version: {data.get('version')}")
+        sketch = cls(
+            data["group_column"],
+            exact_columns=list(data["value_counts"]),
+            relative_accuracy=data["relative_accuracy"],
+            precision=data["precision"],
+        )
+        sketch.rows = data["rows"]
+        sketch.first = data["first"]
+        sketch.columns = {
+            name: ColumnSketch.from_dict(column) for name, column in data["columns"].items()
+        }
+        sketch.groups = {
+            gov: {
+                "rows": group["rows"],
+                "columns": {
+                    name: ColumnSketch.from_dict(column) for name, column in group["columns"].items()
+                },
+            }
+            for gov, group in data["groups"].items()
+        }
+        sketch.value_counts = {
+            column: Counter({value: n for value, n in counts})
+            for column, counts in data["value_counts"].items()
+        }
+        sketch.counters = dict(data["counters"])
+        sketch.samples = {name: list(entry["values"]) for name, entry in data["samples"].items()}
+        sketch.sample_limits = {name: entry["limit"] for name, entry in data["samples"].items()}
+        return sketch
+
+
+def read_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the CSV at ``path`` as DataFrames of at most ``chunk_size`` rows"""
+    with pd.read_csv(path, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def _sketch_chunk(chunk, options):
+    return DatasetSketch(**options).update(chunk)
+
+
+def sketch_csv(path, chunk_size=DEFAULT_CHUNK_SIZE, workers=1, **options):
+    """Sketch a CSV in one pass over ``chunk_size``-row chunks.
+
+    ``options`` are passed to ``DatasetSketch``. With ``workers > 1`` chunks
+    are sketched in worker processes (at most two per worker in flight) and
+    merged in file order.
+    """
+    sketch = DatasetSketch(**options)
+    if workers <= 1:
+        for chunk in read_chunks(path, chunk_size):
+            sketch.update(chunk)
+        return sketch
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in read_chunks(path, chunk_size):
+            pending.append(pool.submit(_sketch_chunk, chunk, options))
+            if len(pending) >= 2 * workers:
+                sketch.merge(pending.popleft().result())
+        while pending:
+            sketch.merge(pending.popleft().result())
+    count("rows_sketched", sketch.rows)
+    return sketch
+
+
+def save_sketch(sketch, path=SKETCH_FILE):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(sketch.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+
+
+def load_sketch(path=SKETCH_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return DatasetSketch.from_dict(json.load(f))
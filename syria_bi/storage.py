@@ -0,0 +1,68 @@
+"""
+Loading the company table and writing processed networks.
+"""
+
+import json
+import os
+
+import pandas as pd
+
+from .instrumentation import count, timer
+from .json_stream import StreamingJSONWriter
+from .paths import CLUSTERS_DIR, CORRECTED_DATA_FILE, NETWORKS_FILE, RAW_DATA_FILE
+
+
+def default_data_file():
+    """The corrected dataset if it exists, otherwise the raw one"""
+    return CORRECTED_DATA_FILE if os.path.exists(CORRECTED_DATA_FILE) else RAW_DATA_FILE
+
+
+def load(path=None):
+    """Read the company table into a DataFrame"""
+    with timer('load'):
+        df = pd.read_csv(path or default_data_file())
+    count('rows_loaded', len(df))
+    return df
+
+
+def export(networks, path=NETWORKS_FILE, compact=True):
+    """Stream ``(governorate, data)`` pairs to ``path``.
+
+    Returns the number of governorates written.
+    """
+    with StreamingJSONWriter(path, compact=compact) as writer:
+        for gov, data in networks:
+            with timer('serialize', gov):
+                count('bytes_written', writer.write(gov, data), gov)
+    return writer.count
+
+
+def cluster_file(gov, directory=CLUSTERS_DIR):
+    """Path of the member file of one governorate's clusters"""
+    return os.path.join(directory, f"{gov}.json")
+
+
+def export_clusters(clusters, directory=CLUSTERS_DIR):
+    """Write ``(governorate, {cluster id: members})`` pairs to one file per
+    governorate in ``directory``, removing files of other governorates.
+
+    Returns the number of governorates written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    written = set()
+    for gov, members in clusters:
+        path = cluster_file(gov, directory)
+        with StreamingJSONWriter(path) as writer:
+            for cluster_id, companies in members.items():
+                count('bytes_written', writer.write(cluster_id, companies), gov)
+        written.add(os.path.basename(path))
+    for name in os.listdir(directory):
+        if name.endswith(".json") and name not in written:
+            os.remove(os.path.join(directory, name))
+    return len(written)
+
+
+def load_networks(path=NETWORKS_FILE):
+    """Read a processed networks file back into a dict"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,151 @@
+"""
+Synthetic data generator producing CSVs with the schema of
+expanded_syria_bi_data.csv at any size.
+
+Governorate, industry (per governorate) and implementation-year frequencies
+and the metric distributions are fitted from a reference dataset (the
+shipped raw CSV by default). Rows are generated and written in chunks, so
+memory use does not depend on the number of rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .paths import RAW_DATA_FILE
+
+RESEARCH_REFERENCE = (
+    "Hayan Hamdan (2022) - Effect of Business Intelligence System on "
+    "Organizational Agility: Evidence from Syria"
+)
+SYNTHETIC_REFERENCE = "Synthetic Data Model (2025) - Simulated BI Impact in "
+
+# (pre-BI column, post-BI column, improvement column)
+PAIRED_COLUMNS = [
+    ("Pre_BI_Decision_Making_Agility_Score", "Post_BI_Decision_Making_Agility_Score",
+     "Decision_Making_Agility_Improvement"),
+    ("Pre_BI_Operational_Efficiency_Index", "Post_BI_Operational_Efficiency_Index",
+     "Operational_Efficiency_Improvement"),
+    ("Pre_BI_Data_Driven_Decisions_Percentage", "Post_BI_Data_Driven_Decisions_Percentage",
+     "Data_Driven_Decisions_Improvement"),
+]
+
+OUTCOME_COLUMNS = [
+    "Revenue_Growth_After_BI_Percentage",
+    "Cost_Reduction_After_BI_Percentage",
+    "Customer_Satisfaction_Increase_After_BI_Percentage",
+    "Market_Share_Increase_After_BI_Percentage",
+]
+
+COLUMN_ORDER = [
+    "Company_ID", "Governorate", "Industry", "BI_Implementation_Year",
+    "Pre_BI_Decision_Making_Agility_Score", "Post_BI_Decision_Making_Agility_Score",
+    "Pre_BI_Operational_Efficiency_Index", "Post_BI_Operational_Efficiency_Index",
+    "Pre_BI_Data_Driven_Decisions_Percentage", "Post_BI_Data_Driven_Decisions_Percentage",
+    *OUTCOME_COLUMNS,
+    "Reference",
+    "Decision_Making_Agility_Improvement", "Operational_Efficiency_Improvement",
+    "Data_Driven_Decisions_Improvement",
+]
+
+
+def _moments(series):
+    return {
+        "mean": float(series.mean()),
+        "std": float(series.std()),
+        "min": float(series.min()),
+        "max": float(series.max()),
+    }
+
+
+def fit_profile(df):
+    """Frequencies and metric distributions of a reference dataset"""
+    governorates = sorted(df["Governorate"].unique().tolist())
+    industries = sorted(df["Industry"].unique().tolist())
+    years = sorted(df["BI_Implementation_Year"].unique().tolist())
+
+    gov_freq = df["Governorate"].value_counts(normalize=True).reindex(governorates).to_numpy()
+    industry_given_gov = (
+        pd.crosstab(df["Governorate"], df["Industry"], normalize="index")
+        .reindex(index=governorates, columns=industries, fill_value=0.0)
+        .to_numpy()
+    )
+    year_freq = df["BI_Implementation_Year"].value_counts(normalize=True).reindex(years).to_numpy()
+    research = df["Reference"].astype(str).str.contains("Hayan Hamdan")
+
+    return {
+        "governorates": governorates,
+        "industries": industries,
+        "years": years,
+        "governorate_p": gov_freq,
+        "industry_given_governorate_p": industry_given_gov,
+        "year_p": year_freq,
+        "research_fraction": float(research.mean()),
+        "pre": {pre: _moments(df[pre]) for pre, _, _ in PAIRED_COLUMNS},
+        "post": {post: _moments(df[post]) for _, post, _ in PAIRED_COLUMNS},
+        "improvement": {
+            post: _moments(df[post] - df[pre]) for pre, post, _ in PAIRED_COLUMNS
+        },
+        "outcomes": {col: _moments(df[col]) for col in OUTCOME_COLUMNS},
+    }
+
+
+def _normal(rng, moments, size):
+    values = rng.normal(moments["mean"], moments["std"], size)
+    return np.round(np.clip(values, moments["min"], moments["max"]), 1)
+
+
+def generate_chunk(profile, n_rows, rng, first_id=1, first_sample=0):
+    """Generate ``n_rows`` synthetic companies as a DataFrame"""
+    gov_codes = rng.choice(len(profile["governorates"]), size=n_rows, p=profile["governorate_p"])
+    cdf = np.cumsum(profile["industry_given_governorate_p"], axis=1)[gov_codes]
+    industry_codes = (rng.random(n_rows)[:, None] > cdf).sum(axis=1)
+    industry_codes = np.minimum(industry_codes, len(profile["industries"]) - 1)
+    year_codes = rng.choice(len(profile["years"]), size=n_rows, p=profile["year_p"])
+
+    governorates = np.asarray(profile["governorates"], dtype=object)[gov_codes]
+    data = {
+        "Company_ID": np.arange(first_id, first_id + n_rows),
+        "Governorate": governorates,
+        "Industry": np.asarray(profile["industries"], dtype=object)[industry_codes],
+        "BI_Implementation_Year": np.asarray(profile["years"])[year_codes],
+    }
+
+    improvements = {}
+    for pre, post, improvement in PAIRED_COLUMNS:
+        pre_values = _normal(rng, profile["pre"][pre], n_rows)
+        # Post-BI values are the pre-BI value plus a sampled improvement
+        gain = rng.normal(profile["improvement"][post]["mean"], profile["improvement"][post]["std"], n_rows)
+        post_moments = profile["post"][post]
+        post_values = np.round(np.clip(pre_values + gain, post_moments["min"], post_moments["max"]), 1)
+        data[pre] = pre_values
+        data[post] = post_values
+        improvements[improvement] = post_values - pre_values
+
+    for column in OUTCOME_COLUMNS:
+        data[column] = _normal(rng, profile["outcomes"][column], n_rows)
+
+    research = rng.random(n_rows) < profile["research_fraction"]
+    samples = first_sample + np.cumsum(research) - 1
+    references = SYNTHETIC_REFERENCE + pd.Series(governorates, dtype=object)
+    research_refs = RESEARCH_REFERENCE + " (Sample " + pd.Series(samples[research]).astype(str) + ")"
+    references[research] = research_refs.to_numpy()
+    data["Reference"] = references.to_numpy()
+    data.update(improvements)
+
+    return pd.DataFrame(data)[COLUMN_ORDER], int(research.sum())
+
+
+def write_synthetic_csv(path, n_rows, seed=42, chunk_size=250_000, reference=RAW_DATA_FILE):
+    """Write ``n_rows`` synthetic companies to ``path`` in chunks"""
+    profile = fit_profile(pd.read_csv(reference))
+    rng = np.random.default_rng(seed)
+    written = 0
+    samples = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        while written < n_rows:
+            size = min(chunk_size, n_rows - written)
+            chunk, research = generate_chunk(profile, size, rng, first_id=written + 1, first_sample=samples)
+            chunk.to_csv(f, index=False, header=written == 0)
+            written += size
+            samples += research
+    return written
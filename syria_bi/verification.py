@@ -0,0 +1,493 @@
+"""
+Data verification checks for the Syria BI dataset.
+Every check returns a result dict and leaves the DataFrame unchanged.
+
+Each check gathers a few facts from the data (min/max, distinct values,
+row counts) and judges them in a shared ``_*_result`` function, so
+``verify_sketch`` produces the same results from a single-pass
+``DatasetSketch`` as ``verify`` does from a DataFrame.
+"""
+
+import contextlib
+import io
+
+from .instrumentation import timer
+from .sketches import DEFAULT_CHUNK_SIZE, DatasetSketch, sketch_csv
+
+# Official 14 governorates of Syria (verified from official sources)
+OFFICIAL_GOVERNORATES = {
+    'Aleppo', 'Damascus', 'Homs', 'Hama', 'Latakia', 'Tartus', 
+    'Idlib', 'Daraa', 'As-Suwayda', 'Quneitra', 'Rif Dimashq',
+    'Al-Hasakah', 'Ar-Raqqah', 'Deir ez-Zor'
+}
+
+# Expected industries (common business sectors)
+EXPECTED_INDUSTRIES = {
+    'Telecommunications', 'Healthcare', 'Finance', 'Services',
+    'Manufacturing', 'Education', 'Retail'
+}
+
+# Columns whose min/max are checked against their expected range
+RANGE_COLUMNS = [
+    'Pre_BI_Decision_Making_Agility_Score',
+    'Post_BI_Decision_Making_Agility_Score',
+    'Pre_BI_Operational_Efficiency_Index',
+    'Post_BI_Operational_Efficiency_Index',
+]
+
+PERCENTAGE_FIELDS = [
+    'Pre_BI_Data_Driven_Decisions_Percentage',
+    'Post_BI_Data_Driven_Decisions_Percentage',
+    'Revenue_Growth_After_BI_Percentage',
+    'Cost_Reduction_After_BI_Percentage',
+    'Customer_Satisfaction_Increase_After_BI_Percentage',
+    'Market_Share_Increase_After_BI_Percentage'
+]
+
+BASE_REFERENCE = "Hayan Hamdan (2022)"
+
+
+# Row predicates counted by the checks (module-level so sketches can be
+# built in worker processes)
+
+def _agility_mismatch(df):
+    calc = df['Post_BI_Decision_Making_Agility_Score'] - df['Pre_BI_Decision_Making_Agility_Score']
+    return (calc - df['Decision_Making_Agility_Improvement']).abs() > 0.01
+
+def _efficiency_mismatch(df):
+    calc = df['Post_BI_Operational_Efficiency_Index'] - df['Pre_BI_Operational_Efficiency_Index']
+    return (calc - df['Operational_Efficiency_Improvement']).abs() > 1.0  # Allow larger tolerance for efficiency
+
+def _data_driven_mismatch(df):
+    calc = df['Post_BI_Data_Driven_Decisions_Percentage'] - df['Pre_BI_Data_Driven_Decisions_Percentage']
+    return (calc - df['Data_Driven_Decisions_Improvement']).abs() > 0.01
+
+def _recent_implementation(df):
+    return df['BI_Implementation_Year'] >= 2023
+
+def _negative_agility(df):
+    return df['Post_BI_Decision_Making_Agility_Score'] < df['Pre_BI_Decision_Making_Agility_Score']
+
+def _negative_efficiency(df):
+    return df['Post_BI_Operational_Efficiency_Index'] < df['Pre_BI_Operational_Efficiency_Index']
+
+def _negative_data_driven(df):
+    return df['Post_BI_Data_Driven_Decisions_Percentage'] < df['Pre_BI_Data_Driven_Decisions_Percentage']
+
+def _large_agility_jump(df):
+    return df['Decision_Making_Agility_Improvement'] > 7.0
+
+def _non_matching_reference(df):
+    return ~df['Reference'].astype(str).str.contains(BASE_REFERENCE, regex=False)
+
+CHECK_COUNTERS = {
+    'agility_mismatch': _agility_mismatch,
+    'efficiency_mismatch': _efficiency_mismatch,
+    'data_driven_mismatch': _data_driven_mismatch,
+    'recent_implementation': _recent_implementation,
+    'negative_agility': _negative_agility,
+    'negative_efficiency': _negative_efficiency,
+    'negative_data_driven': _negative_data_driven,
+    'large_agility_jump': _large_agility_jump,
+}
+
+# name -> (column, predicate, number of distinct values kept)
+CHECK_SAMPLES = {
+    'non_matching_references': ('Reference', _non_matching_reference, 3),
+}
+
+def _counts(df, names):
+    return {name: int(CHECK_COUNTERS[name](df).sum()) for name in names}
+
+def verify_governorates(df):
+    """Verify governorate names match official list"""
+    return _governorate_result(set(df['Governorate'].unique()))
+
+def _governorate_result(found_govs):
+    issues = []
+    
+    # Check for missing governorates
+    missing = OFFICIAL_GOVERNORATES - found_govs
+    if missing:
+        issues.append(f"Missing governorates: {missing}")
+    
+    # Check for extra/unrecognized governorates
+    extra = found_govs - OFFICIAL_GOVERNORATES
+    if extra:
+        issues.append(f"Unrecognized governorates: {extra}")
+    
+    # Check for typos or variations
+    variations = {}
+    for gov in found_govs:
+        if gov not in OFFICIAL_GOVERNORATES:
+            # Find closest match
+            for official in OFFICIAL_GOVERNORATES:
+                if gov.lower() in official.lower() or official.lower() in gov.lower():
+                    variations[gov] = official
+                    break
+    
+    return {
+        'status': 'PASS' if not issues else 'ISSUES',
+        'issues': issues,
+        'found_count': len(found_govs),
+        'expected_count': len(OFFICIAL_GOVERNORATES),
+        'variations': variations
+    }
+
+def verify_data_ranges(df):
+    """Verify data ranges are reasonable"""
+    columns = RANGE_COLUMNS + PERCENTAGE_FIELDS
+    return _range_result(
+        {column: df[column].min() for column in columns},
+        {column: df[column].max() for column in columns},
+        _counts(df, ['agility_mismatch', 'efficiency_mismatch', 'data_driven_mismatch'])
+    )
+
+def _range_result(low, high, counts):
+    issues = []
+    warnings = []
+    
+    # Check Pre-BI Agility (should be 1-10 scale, typically lower)
+    pre_min, pre_max = low['Pre_BI_Decision_Making_Agility_Score'], high['Pre_BI_Decision_Making_Agility_Score']
+    if pre_min < 1.0 or pre_max > 10.0:
+        issues.append(f"Pre-BI Agility out of expected range (1-10): {pre_min:.2f} - {pre_max:.2f}")
+    if pre_max > 7.0:
+        warnings.append(f"Pre-BI Agility unusually high: max = {pre_max:.2f}")
+    
+    # Check Post-BI Agility (should be 1-10 scale, typically higher)
+    post_min, post_max = low['Post_BI_Decision_Making_Agility_Score'], high['Post_BI_Decision_Making_Agility_Score']
+    if post_min < 1.0 or post_max > 10.0:
+        issues.append(f"Post-BI Agility out of expected range (1-10): {post_min:.2f} - {post_max:.2f}")
+    if post_min < 4.0:
+        warnings.append(f"Post-BI Agility unusually low: min = {post_min:.2f}")
+    
+    # Check Efficiency Index (should be 0-100)
+    for label, column in (('Pre-BI', 'Pre_BI_Operational_Efficiency_Index'),
+                          ('Post-BI', 'Post_BI_Operational_Efficiency_Index')):
+        if low[column] < 0 or high[column] > 100:
+            issues.append(f"{label} Efficiency out of range (0-100): {low[column]:.2f} - {high[column]:.2f}")
+    
+    # Check Percentage fields (should be 0-100)
+    for field in PERCENTAGE_FIELDS:
+        if low[field] < 0 or high[field] > 100:
+            issues.append(f"{field} out of range (0-100): {low[field]:.2f} - {high[field]:.2f}")
+    
+    # Check if calculated improvements match stored values (allowing for floating point errors)
+    if counts['agility_mismatch']:
+        issues.append(f"Agility improvement calculation mismatch in {counts['agility_mismatch']} rows")
+    if counts['efficiency_mismatch']:
+        issues.append(f"Efficiency improvement calculation mismatch in {counts['efficiency_mismatch']} rows")
+    if counts['data_driven_mismatch']:
+        issues.append(f"Data-driven improvement calculation mismatch in {counts['data_driven_mismatch']} rows")
+    
+    return {
+        'status': 'PASS' if not issues else 'ISSUES',
+        'issues': issues,
+        'warnings': warnings
+    }
+
+def verify_temporal_consistency(df):
+    """Verify temporal consistency (BI implementation years)"""
+    return _temporal_result(
+        df['BI_Implementation_Year'].unique(), _counts(df, ['recent_implementation'])
+    )
+
+def _temporal_result(years, counts):
+    issues = []
+    warnings = []
+    
+    # Check BI implementation years
+    bi_years = sorted(years)
+    current_year = 2024
+    
+    # Check for future dates
+    future_years = [y for y in bi_years if y > current_year]
+    if future_years:
+        issues.append(f"Future BI implementation years found: {future_years}")
+    
+    # Check for unrealistic past dates (before 2000)
+    old_years = [y for y in bi_years if y < 2000]
+    if old_years:
+        issues.append(f"Unrealistically old BI implementation years: {old_years}")
+    
+    # Check if post-BI metrics make sense relative to implementation year
+    # Companies with BI in 2024 shouldn't have extensive post-BI data yet
+    if counts['recent_implementation'] > 0:
+        warnings.append(f"{counts['recent_implementation']} companies implemented BI in 2023-2024, post-BI metrics may be preliminary")
+    
+    return {
+        'status': 'PASS' if not issues else 'ISSUES',
+        'issues': issues,
+        'warnings': warnings,
+        'year_range': f"{min(bi_years)} - {max(bi_years)}"
+    }
+
+def verify_logical_consistency(df):
+    """Verify logical consistency (e.g., post-BI should generally be better than pre-BI)"""
+    return _logical_result(_counts(df, [
+        'negative_agility', 'negative_efficiency', 'negative_data_driven', 'large_agility_jump'
+    ]))
+
+def _logical_result(counts):
+    issues = []
+    warnings = []
+    
+    # Post-BI agility should generally be higher than Pre-BI
+    if counts['negative_agility'] > 0:
+        warnings.append(f"{counts['negative_agility']} companies show decreased agility after BI (may be valid but unusual)")
+    
+    # Post-BI efficiency should generally be higher
+    if counts['negative_efficiency'] > 0:
+        warnings.append(f"{counts['negative_efficiency']} companies show decreased efficiency after BI (may be valid but unusual)")
+    
+    # Post-BI data-driven decisions should generally be higher
+    if counts['negative_data_driven'] > 0:
+        warnings.append(f"{counts['negative_data_driven']} companies show decreased data-driven decisions after BI (may be valid but unusual)")
+    
+    # Check for unrealistic improvements
+    if counts['large_agility_jump'] > 0:
+        warnings.append(f"{counts['large_agility_jump']} companies show very large agility improvements (>7 points)")
+    
+    return {
+        'status': 'PASS',
+        'issues': issues,
+        'warnings': warnings
+    }
+
+def verify_reference_consistency(df):
+    """Verify reference field consistency"""
+    references = df['Reference'].unique()
+    # Check if they're all variations of the same study
+    non_matching = [r for r in references if BASE_REFERENCE not in r]
+    return _reference_result(
+        len(references), non_matching, references[0] if len(references) > 0 else None
+    )
+
+def _reference_result(reference_count, non_matching, primary_reference):
+    issues = []
+    
+    # Check if all references are the same
+    if reference_count > 1:
+        warnings = [f"Multiple references found: {reference_count} unique references"]
+        if non_matching:
+            issues.append(f"Non-matching references: {non_matching[:3]}")
+    else:
+        warnings = []
+    
+    return {
+        'status': 'PASS' if not issues else 'ISSUES',
+        'issues': issues,
+        'warnings': warnings,
+        'reference_count': reference_count,
+        'primary_reference': primary_reference
+    }
+
+def _run_checks(checks):
+    results = {}
+    for name, check in checks.items():
+        with timer(f'verify_{name}'):
+            results[name] = check()
+    results['total_issues'] = sum(
+        len(results[name]['issues'])
+        for name in ('governorates', 'ranges', 'temporal', 'logical', 'references')
+    )
+    results['total_warnings'] = sum(
+        len(results[name]['warnings'])
+        for name in ('ranges', 'temporal', 'logical', 'references')
+    )
+    return results
+
+def verify(df):
+    """Run every verification check and count issues and warnings"""
+    checks = {
+        'governorates': verify_governorates,
+        'ranges': verify_data_ranges,
+        'temporal': verify_temporal_consistency,
+        'logical': verify_logical_consistency,
+        'references': verify_reference_consistency
+    }
+    return _run_checks({name: (lambda check=check: check(df)) for name, check in checks.items()})
+
+def sketch_for_verification(path, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    """Sketch ``path`` in one chunked pass, collecting everything ``verify_sketch`` needs"""
+    return sketch_csv(path, chunk_size, workers, counters=CHECK_COUNTERS, samples=CHECK_SAMPLES)
+
+def verify_sketch(sketch):
+    """``verify`` from a ``DatasetSketch`` built with ``CHECK_COUNTERS`` and ``CHECK_SAMPLES``.
+
+    Min/max, row counts and governorate/year sets are exact; the reference
+    count is a HyperLogLog estimate once it exceeds the sketch precision.
+    """
+    columns = RANGE_COLUMNS + PERCENTAGE_FIELDS
+    quantiles = {column: sketch.columns[column].quantiles for column in columns}
+    checks = {
+        'governorates': lambda: _governorate_result(set(sketch.value_counts['Governorate'])),
+        'ranges': lambda: _range_result(
+            {column: q.min for column, q in quantiles.items()},
+            {column: q.max for column, q in quantiles.items()},
+            sketch.counters
+        ),
+        'temporal': lambda: _temporal_result(sketch.value_counts['BI_Implementation_Year'], sketch.counters),
+        'logical': lambda: _logical_result(sketch.counters),
+        'references': lambda: _reference_result(
+            sketch.columns['Reference'].distinct.estimate(),
+            sketch.samples['non_matching_references'],
+            (sketch.first or {}).get('Reference')
+        )
+    }
+    return _run_checks(checks)
+
+def _overview(source):
+    """Record count, column count and BI_Implementation_Year range of a DataFrame or sketch"""
+    if isinstance(source, DatasetSketch):
+        years = list(source.value_counts['BI_Implementation_Year'])
+        return source.rows, len(source.columns), min(years), max(years)
+    years = source['BI_Implementation_Year']
+    return len(source), len(source.columns), years.min(), years.max()
+
+def summarize_networks(data):
+    """Company, node and link counts per governorate of a processed networks dict"""
+    return {
+        gov: {
+            'companies': data[gov]['metrics']['total_companies'],
+            'nodes': len(data[gov]['network']['nodes']),
+            'links': len(data[gov]['network']['links'])
+        }
+        for gov in sorted(data.keys())
+    }
+
+def generate_verification_report(df, results=None):
+    """Generate comprehensive verification report (``df`` may also be a ``DatasetSketch``)"""
+    if results is None:
+        results = verify_sketch(df) if isinstance(df, DatasetSketch) else verify(df)
+    records, columns, first_year, last_year = _overview(df)
+    
+    print("=" * 80)
+    print("DATA VERIFICATION REPORT - Syria BI Dataset")
+    print("=" * 80)
+    print(f"\nDataset Overview:")
+    print(f"  Total Records: {records:,}")
+    print(f"  Total Columns: {columns}")
+    print(f"  Date Range: {first_year} - {last_year}")
+    
+    print("\n" + "=" * 80)
+    print("1. GOVERNORATE VERIFICATION")
+    print("=" * 80)
+    gov_result = results['governorates']
+    print(f"Status: {gov_result['status']}")
+    print(f"Found: {gov_result['found_count']} governorates")
+    print(f"Expected: {gov_result['expected_count']} governorates")
+    if gov_result['issues']:
+        for issue in gov_result['issues']:
+            print(f"  ⚠️  {issue}")
+    if gov_result.get('variations'):
+        print(f"  ℹ️  Variations found: {gov_result['variations']}")
+    
+    print("\n" + "=" * 80)
+    print("2. DATA RANGE VERIFICATION")
+    print("=" * 80)
+    range_result = results['ranges']
+    print(f"Status: {range_result['status']}")
+    if range_result['issues']:
+        for issue in range_result['issues']:
+            print(f"  ❌ {issue}")
+    if range_result['warnings']:
+        for warning in range_result['warnings']:
+            print(f"  ⚠️  {warning}")
+    
+    print("\n" + "=" * 80)
+    print("3. TEMPORAL CONSISTENCY VERIFICATION")
+    print("=" * 80)
+    temporal_result = results['temporal']
+    print(f"Status: {temporal_result['status']}")
+    print(f"Year Range: {temporal_result['year_range']}")
+    if temporal_result['issues']:
+        for issue in temporal_result['issues']:
+            print(f"  ❌ {issue}")
+    if temporal_result['warnings']:
+        for warning in temporal_result['warnings']:
+            print(f"  ⚠️  {warning}")
+    
+    print("\n" + "=" * 80)
+    print("4. LOGICAL CONSISTENCY VERIFICATION")
+    print("=" * 80)
+    logical_result = results['logical']
+    print(f"Status: {logical_result['status']}")
+    if logical_result['issues']:
+        for issue in logical_result['issues']:
+            print(f"  ❌ {issue}")
+    if logical_result['warnings']:
+        for warning in logical_result['warnings']:
+            print(f"  ⚠️  {warning}")
+    
+    print("\n" + "=" * 80)
+    print("5. REFERENCE VERIFICATION")
+    print("=" * 80)
+    ref_result = results['references']
+    print(f"Status: {ref_result['status']}")
+    print(f"Reference Count: {ref_result['reference_count']}")
+    if ref_result['primary_reference']:
+        print(f"Primary Reference: {ref_result['primary_reference'][:100]}...")
+    if ref_result['issues']:
+        for issue in ref_result['issues']:
+            print(f"  ❌ {issue}")
+    if ref_result['warnings']:
+        for warning in ref_result['warnings']:
+            print(f"  ⚠️  {warning}")
+    
+    print("\n" + "=" * 80)
+    print("6. DATA QUALITY SUMMARY")
+    print("=" * 80)
+    
+    # Calculate overall status
+    all_issues = results['total_issues']
+    all_warnings = results['total_warnings']
+    
+    print(f"Total Issues Found: {all_issues}")
+    print(f"Total Warnings: {all_warnings}")
+    
+    if all_issues == 0:
+        print("\n✅ OVERALL STATUS: DATA APPEARS ACCURATE AND RELIABLE")
+        print("   All critical checks passed. Data is suitable for analysis.")
+    elif all_issues < 5:
+        print("\n⚠️  OVERALL STATUS: DATA MOSTLY ACCURATE WITH MINOR ISSUES")
+        print("   Some issues detected but data is generally reliable.")
+    else:
+        print("\n❌ OVERALL STATUS: DATA HAS SIGNIFICANT ISSUES")
+        print("   Multiple issues detected. Review recommended before use.")
+    
+    print("\n" + "=" * 80)
+    print("RECOMMENDATIONS")
+    print("=" * 80)
+    
+    recommendations = []
+    
+    if all_issues == 0 and all_warnings == 0:
+        recommendations.append("✅ Data quality is excellent. No corrections needed.")
+    else:
+        if gov_result['issues']:
+            recommendations.append("Review and standardize governorate names")
+        if range_result['issues']:
+            recommendations.append("Review data ranges and correct out-of-range values")
+        if temporal_result['issues']:
+            recommendations.append("Verify and correct temporal inconsistencies")
+        if logical_result['warnings']:
+            recommendations.append("Review cases with unexpected patterns (e.g., negative improvements)")
+        if ref_result['issues']:
+            recommendations.append("Standardize reference citations")
+    
+    if not recommendations:
+        recommendations.append("Data appears ready for use. Monitor for any anomalies during analysis.")
+    
+    for i, rec in enumerate(recommendations, 1):
+        print(f"{i}. {rec}")
+    
+    print("\n" + "=" * 80)
+    return results
+
+def render_verification_report(df, results=None):
+    """The verification report as text instead of printing it"""
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        generate_verification_report(df, results)
+    return buffer.getvalue()
@@ -0,0 +1,64 @@
+"""Test that cohort series agree with pandas groupby and survive the JSON round trip"""
+
+import json
+
+import numpy as np
+import pytest
+
+from syria_bi import RAW_DATA_FILE, build_cohorts, load
+from syria_bi.cohorts import CohortTable
+from syria_bi.sketches import read_chunks
+from syria_bi.stats import PAIRED_METRICS
+
+
+@pytest.fixture(scope="module")
+def df():
+    return load(RAW_DATA_FILE)
+
+
+@pytest.fixture(scope="module")
+def table(df):
+    return build_cohorts(df)
+
+
+def expected_series(table, group, metric):
+    pre, post = PAIRED_METRICS[metric]
+    grouped = (group[post] - group[pre]).groupby(group["BI_Implementation_Year"])
+    mean = grouped.mean().reindex(table.years).to_numpy()
+    count = grouped.size().reindex(table.years, fill_value=0).to_numpy()
+    return mean, count
+
+
+@pytest.mark.parametrize("metric", list(PAIRED_METRICS))
+def test_series_match_groupby(df, table, metric):
+    for governorate, group in df.groupby("Governorate"):
+        mean, count = table.series(governorate, metric)
+        expected_mean, expected_count = expected_series(table, group, metric)
+        np.testing.assert_array_equal(count, expected_count)
+        np.testing.assert_allclose(mean, expected_mean)
+    for (governorate, industry), group in df.groupby(["Governorate", "Industry"]):
+        mean, count = table.series(governorate, metric, industry)
+        expected_mean, expected_count = expected_series(table, group, metric)
+        np.testing.assert_array_equal(count, expected_count)
+        np.testing.assert_allclose(mean, expected_mean)
+
+
+def test_round_trip_keeps_exact_sums(table):
+    copy = CohortTable.from_dict(json.loads(json.dumps(table.to_dict())))
+    assert (copy.governorates, copy.industries, copy.years, copy.metrics) == (
+        table.governorates, table.industries, table.years, table.metrics
+    )
+    np.testing.assert_array_equal(copy.count, table.count)
+    np.testing.assert_array_equal(copy.sums, table.sums)
+
+
+def test_chunk_merge_matches_single_pass(table):
+    merged = None
+    for chunk in read_chunks(RAW_DATA_FILE, 211):
+        chunk_table = CohortTable.from_dict(build_cohorts(chunk).to_dict())
+        merged = chunk_table if merged is None else merged.merge(chunk_table)
+    assert (merged.governorates, merged.industries, merged.years) == (
+        table.governorates, table.industries, table.years
+    )
+    np.testing.assert_array_equal(merged.count, table.count)
+    np.testing.assert_allclose(merged.sums, table.sums)
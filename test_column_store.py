@@ -0,0 +1,82 @@
+"""Test that column store reads and index lookups agree with pandas"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from syria_bi import RAW_DATA_FILE, load, open_company_index, write_column_store
+from syria_bi.columnstore import open_column_store
+
+
+@pytest.fixture(scope="module")
+def df():
+    return load(RAW_DATA_FILE)
+
+
+@pytest.fixture(scope="module")
+def store(df, tmp_path_factory):
+    directory = tmp_path_factory.mktemp("store") / "company_columns"
+    write_column_store(df, str(directory))
+    return open_column_store(str(directory))
+
+
+def test_columns_round_trip(df, store):
+    assert len(store) == len(df)
+    assert store.columns == list(df.columns)
+    for column in df.columns:
+        expected = df[column]
+        if store.is_dictionary(column):
+            actual = pd.Series(store[column], dtype=object)
+            assert actual.where(actual.notna(), None).tolist() == (
+                expected.astype(object).where(expected.notna(), None).tolist()
+            )
+            assert list(store.dictionary(column)) == sorted(expected.dropna().astype(str).unique())
+        else:
+            np.testing.assert_array_equal(np.asarray(store[column]), expected.to_numpy())
+
+
+def test_to_pandas_matches(df, store):
+    columns = ["Governorate", "Industry", "BI_Implementation_Year"]
+    frame = store.to_pandas(columns)
+    assert list(frame.columns) == columns
+    for column in columns:
+        assert frame[column].tolist() == df[column].tolist()
+
+
+def test_id_lookups(df, store):
+    index = store.index()
+    ids = df["Company_ID"].to_numpy()
+    rows = index.rows_of(ids)
+    np.testing.assert_array_equal(ids[rows], ids)
+    assert index.row_of(ids.max() + 1) is None
+    assert index.rows_of([ids.min() - 1])[0] == -1
+
+    record = index.company(int(ids[17]))
+    expected = df.iloc[int(rows[17])]
+    for column, value in record.items():
+        if isinstance(value, float):
+            assert value == pytest.approx(expected[column], nan_ok=True)
+        else:
+            assert value == expected[column]
+    assert index.company(ids.max() + 1) is None
+
+
+def test_group_and_year_lookups(df, store):
+    index = store.index()
+    for (governorate, industry), group in df.groupby(["Governorate", "Industry"]):
+        ids = index.ids_in(governorate, industry)
+        assert ids.tolist() == sorted(group["Company_ID"])
+        rows = index.rows_in(governorate, industry)
+        np.testing.assert_array_equal(df["Company_ID"].to_numpy()[rows], ids)
+    for governorate, group in df.groupby("Governorate"):
+        assert sorted(index.ids_in(governorate).tolist()) == sorted(group["Company_ID"])
+    for year, group in df.groupby("BI_Implementation_Year"):
+        assert index.ids_in_year(year).tolist() == sorted(group["Company_ID"])
+    assert len(index.ids_in("Nowhere")) == 0
+    assert len(index.ids_in("Aleppo", "Nothing")) == 0
+    assert len(index.ids_in_year(1900)) == 0
+
+
+def test_open_company_index_by_directory(store):
+    index = open_company_index(store.directory)
+    assert len(index.ids_in_year(2021)) == len(store.index().ids_in_year(2021))
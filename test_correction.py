@@ -0,0 +1,30 @@
+"""Test that correct() gives the Unusual data quality flag priority over Preliminary"""
+
+import pandas as pd
+import pytest
+
+from syria_bi import CORRECTED_DATA_FILE, RAW_DATA_FILE, correct, load
+
+
+@pytest.fixture(scope="module")
+def corrected():
+    df, _ = correct(load(RAW_DATA_FILE), verified_date="2025-01-01")
+    return df
+
+
+def test_unusual_wins_over_preliminary(corrected):
+    negative = (
+        corrected["Has_Negative_Agility_Improvement"]
+        | corrected["Has_Negative_Efficiency_Improvement"]
+    )
+    recent = corrected["Is_Recent_Implementation"]
+    # The dataset has rows that are both, which the old order marked Preliminary
+    assert (negative & recent).any()
+    assert (corrected.loc[negative, "Data_Quality_Flag"] == "Unusual").all()
+    assert (corrected.loc[recent & ~negative, "Data_Quality_Flag"] == "Preliminary").all()
+    assert (corrected.loc[~negative & ~recent, "Data_Quality_Flag"] == "Normal").all()
+
+
+def test_flags_match_committed_corrected_file(corrected):
+    committed = pd.read_csv(CORRECTED_DATA_FILE)
+    assert corrected["Data_Quality_Flag"].tolist() == committed["Data_Quality_Flag"].tolist()
@@ -0,0 +1,80 @@
+"""Test that cube rollups and governorate comparisons agree with pandas groupby"""
+
+import numpy as np
+import pytest
+
+from syria_bi import RAW_DATA_FILE, build_cube, load
+from syria_bi.cube import DIMENSION_COLUMNS, METRIC_COLUMNS, AggregationCube
+from syria_bi.sketches import read_chunks
+
+METRIC = "Decision_Making_Agility_Improvement"
+
+
+@pytest.fixture(scope="module")
+def df():
+    return load(RAW_DATA_FILE)
+
+
+@pytest.fixture(scope="module")
+def cube(df):
+    return build_cube(df)
+
+
+def assert_matches_groupby(rollup, df, by, metrics=METRIC_COLUMNS):
+    columns = [DIMENSION_COLUMNS[dim] for dim in by]
+    groups = df.groupby(columns) if columns else [((), df)]
+    expected_keys = set()
+    for key, group in groups:
+        key = key if isinstance(key, tuple) else (key,)
+        expected_keys.add(key)
+        entry = rollup[key]
+        assert entry["count"] == len(group)
+        for metric in metrics:
+            assert entry[metric]["mean"] == pytest.approx(group[metric].mean())
+            if len(group) > 1:
+                # Sums of squares cancel to about 1e-7 in groups of equal values
+                assert entry[metric]["std"] == pytest.approx(group[metric].std(), abs=1e-6)
+            else:
+                assert entry[metric]["std"] is None
+    assert set(rollup) == expected_keys
+
+
+@pytest.mark.parametrize("by", [
+    (), ("governorate",), ("industry",), ("year",),
+    ("governorate", "industry"), ("year", "governorate"), ("governorate", "industry", "year"),
+])
+def test_rollup_matches_groupby(df, cube, by):
+    assert_matches_groupby(cube.rollup(by=by), df, by)
+
+
+def test_rollup_with_filter(df, cube):
+    where = {"industry": ["Manufacturing", "Retail"], "year": 2020}
+    subset = df[df["Industry"].isin(where["industry"]) & (df["BI_Implementation_Year"] == 2020)]
+    rollup = cube.rollup(by=["governorate"], where=where, metrics=[METRIC])
+    assert_matches_groupby(rollup, subset, ["governorate"], [METRIC])
+
+
+def test_compare_governorates(df, cube):
+    comparison = cube.compare_governorates(METRIC)
+    grouped = df.groupby("Governorate")[METRIC]
+    assert set(comparison) == set(grouped.groups)
+    for gov, values in grouped:
+        assert comparison[gov]["count"] == len(values)
+        assert comparison[gov]["mean"] == pytest.approx(values.mean())
+        assert comparison[gov]["std"] == pytest.approx(values.std())
+
+
+def test_chunk_merge_and_round_trip_match_single_pass(df, cube):
+    merged = None
+    for chunk in read_chunks(RAW_DATA_FILE, 211):
+        merged = build_cube(chunk) if merged is None else merged.merge(build_cube(chunk))
+    merged = AggregationCube.from_dict(merged.to_dict())
+    assert merged.labels == cube.labels
+    np.testing.assert_array_equal(merged.count, cube.count)
+    np.testing.assert_allclose(merged.sums, cube.sums)
+    np.testing.assert_allclose(merged.sumsq, cube.sumsq)
+
+
+def test_unknown_dimension_is_rejected(cube):
+    with pytest.raises(ValueError, match="Unknown dimension"):
+        cube.rollup(by=["city"])
@@ -0,0 +1,59 @@
+"""Test graph analytics metrics against networkx on small graphs"""
+
+import networkx as nx
+import pytest
+
+from syria_bi.graph_analytics import analyze_networks
+
+
+def as_network(graph):
+    return {
+        "nodes": [{"id": str(node)} for node in graph.nodes],
+        "links": [{"source": str(u), "target": str(v)} for u, v in graph.edges],
+    }
+
+
+GRAPHS = {
+    "karate": nx.karate_club_graph(),
+    "lollipop": nx.lollipop_graph(5, 4),
+    # Two components plus an isolated node
+    "split": nx.union(nx.cycle_graph(5), nx.path_graph(["a", "b", "c", "d"])).copy(),
+}
+GRAPHS["split"].add_node("lonely")
+
+
+@pytest.fixture(scope="module")
+def results():
+    # More samples than nodes: betweenness uses every source and is exact
+    return analyze_networks({name: as_network(g) for name, g in GRAPHS.items()},
+                            betweenness_samples=100)
+
+
+@pytest.mark.parametrize("name", list(GRAPHS))
+def test_metrics_match_networkx(results, name):
+    graph = GRAPHS[name]
+    result = results[name]
+    degrees = [d for _, d in graph.degree]
+    assert result["nodes"] == graph.number_of_nodes()
+    assert result["edges"] == graph.number_of_edges()
+    assert result["density"] == pytest.approx(nx.density(graph))
+    assert result["degree"]["mean"] == pytest.approx(sum(degrees) / len(degrees))
+    assert result["degree"]["max"] == max(degrees)
+    assert result["connected_components"] == nx.number_connected_components(graph)
+    largest = max(len(c) for c in nx.connected_components(graph))
+    assert result["largest_component_fraction"] == pytest.approx(largest / len(graph))
+    assert result["avg_clustering"] == pytest.approx(nx.average_clustering(graph))
+    assert result["transitivity"] == pytest.approx(nx.transitivity(graph))
+
+    betweenness = nx.betweenness_centrality(graph)
+    assert result["betweenness"]["max"] == pytest.approx(max(betweenness.values()))
+    assert result["betweenness"]["mean"] == pytest.approx(sum(betweenness.values()) / len(graph))
+    for top in result["betweenness"]["top"]:
+        node = next(n for n in graph.nodes if str(n) == top["id"])
+        assert top["value"] == pytest.approx(betweenness[node])
+
+
+def test_batch_matches_single_network(results):
+    for name, graph in GRAPHS.items():
+        alone = analyze_networks({name: as_network(graph)}, betweenness_samples=100)[name]
+        assert alone == results[name]
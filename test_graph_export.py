@@ -0,0 +1,94 @@
+"""Test that exported GraphML, GEXF and Parquet files round-trip the processed networks"""
+
+import itertools
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from syria_bi import NETWORKS_FILE, export_graphs
+from syria_bi.graph_export import GRAPHS
+from syria_bi.json_stream import StreamingJSONWriter, iter_json_object
+
+GRAPHML = "{http://graphml.graphdrawing.org/xmlns}"
+GEXF = "{http://www.gexf.net/1.2draft}"
+
+
+@pytest.fixture(scope="module")
+def networks():
+    with open(NETWORKS_FILE, "r", encoding="utf-8") as f:
+        return dict(itertools.islice(json.load(f).items(), 4))
+
+
+def totals(networks, graph):
+    nodes = sum(len(data[graph]["nodes"]) for data in networks.values())
+    edges = sum(len(data[graph]["links"]) for data in networks.values())
+    return nodes, edges
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096, 1 << 20])
+def test_iter_json_object_round_trip(tmp_path, networks, chunk_size):
+    for compact in (True, False):
+        path = tmp_path / f"networks_{compact}.json"
+        with StreamingJSONWriter(str(path), compact=compact) as writer:
+            for gov, data in networks.items():
+                writer.write(gov, data)
+        assert list(iter_json_object(str(path), chunk_size)) == list(networks.items())
+
+
+def test_graphml_round_trip(tmp_path, networks):
+    written = export_graphs(networks.items(), str(tmp_path), formats=["graphml"])
+    for graph in GRAPHS:
+        path = tmp_path / f"{graph}.graphml"
+        assert written[str(path)] == dict(zip(("nodes", "edges"), totals(networks, graph)))
+        root = ET.parse(path).getroot()
+        keys = {key.get("id"): key.get("attr.name") for key in root.iter(GRAPHML + "key")}
+        nodes = list(root.iter(GRAPHML + "node"))
+        edges = list(root.iter(GRAPHML + "edge"))
+        assert (len(nodes), len(edges)) == totals(networks, graph)
+
+        expected = {node["id"]: (gov, node) for gov, data in networks.items()
+                    for node in data[graph]["nodes"]}
+        for node in nodes:
+            gov, source = expected[node.get("id")]
+            values = {keys[data.get("key")]: data.text for data in node}
+            assert values.pop("governorate") == gov
+            assert set(values) == set(source) - {"id"}
+            assert values["label"] == source["label"]
+
+
+def test_gexf_round_trip(tmp_path, networks):
+    export_graphs(networks.items(), str(tmp_path), formats=["gexf"])
+    for graph in GRAPHS:
+        root = ET.parse(tmp_path / f"{graph}.gexf").getroot()
+        edges = list(root.iter(GEXF + "edge"))
+        assert (len(list(root.iter(GEXF + "node"))), len(edges)) == totals(networks, graph)
+        assert len({edge.get("id") for edge in edges}) == len(edges)
+        strengths = [link["strength"] for data in networks.values() for link in data[graph]["links"]]
+        assert [float(edge.get("weight")) for edge in edges] == strengths
+
+
+def test_parquet_round_trip(tmp_path, networks):
+    pq = pytest.importorskip("pyarrow.parquet")
+    export_graphs(networks.items(), str(tmp_path), formats=["parquet"])
+    for graph in GRAPHS:
+        nodes = pq.read_table(tmp_path / f"{graph}.nodes.parquet")
+        edges = pq.read_table(tmp_path / f"{graph}.edges.parquet")
+        assert (nodes.num_rows, edges.num_rows) == totals(networks, graph)
+        assert edges.column_names[:3] == ["source", "target", "governorate"]
+        assert pq.ParquetFile(tmp_path / f"{graph}.edges.parquet").num_row_groups == len(networks)
+        links = [link for data in networks.values() for link in data[graph]["links"]]
+        assert edges.column("source").to_pylist() == [link["source"] for link in links]
+
+
+def test_parallel_export_is_identical(tmp_path, networks):
+    export_graphs(networks.items(), str(tmp_path / "serial"), formats=["graphml", "gexf"])
+    export_graphs(networks.items(), str(tmp_path / "parallel"), formats=["graphml", "gexf"],
+                  workers=2)
+    for name in ("network.graphml", "pre_bi_network.gexf"):
+        assert (tmp_path / "parallel" / name).read_bytes() == (tmp_path / "serial" / name).read_bytes()
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unknown export format"):
+        export_graphs([], str(tmp_path), formats=["csv"])
@@ -0,0 +1,65 @@
+"""Test the clustered (level-of-detail) network's member files and the reproducibility of the networks"""
+
+import json
+
+import pytest
+
+from syria_bi import RAW_DATA_FILE, build_lod_clusters, build_networks, export_clusters, load
+from syria_bi.networks import build_lod_network
+from syria_bi.storage import cluster_file
+
+
+@pytest.fixture(scope="module")
+def df():
+    return load(RAW_DATA_FILE)
+
+
+@pytest.fixture(scope="module")
+def clusters(df):
+    return dict(build_lod_clusters(df))
+
+
+def test_cluster_members_match_aggregates(df, clusters):
+    industries = df["Industry"].unique()
+    assert set(clusters) == set(df["Governorate"].unique())
+    for gov, gov_df in df.groupby("Governorate"):
+        lod = build_lod_network(gov, gov_df, industries)
+        assert set(lod) == {"nodes", "links"}
+        cluster_nodes = [node for node in lod["nodes"] if node["type"] == "cluster"]
+        assert {node["id"] for node in cluster_nodes} == set(clusters[gov])
+        for node in cluster_nodes:
+            members = clusters[gov][node["id"]]
+            assert len(members) == node["member_count"]
+            assert {member["industry"] for member in members} == {node["industry"]}
+            for name in ("agility", "pre_agility", "efficiency", "revenue_growth"):
+                mean = sum(member[name] for member in members) / len(members)
+                assert mean == pytest.approx(node[name])
+        # Every company is in exactly one cluster
+        ids = [member["id"] for members in clusters[gov].values() for member in members]
+        assert sorted(ids) == sorted(f"company_{i}" for i in gov_df["Company_ID"])
+
+
+def test_export_clusters_writes_one_file_per_governorate(tmp_path, clusters):
+    stale = tmp_path / "Nowhere.json"
+    stale.write_text("{}")
+    assert export_clusters(clusters.items(), str(tmp_path)) == len(clusters)
+    assert not stale.exists()
+    for gov, members in clusters.items():
+        with open(cluster_file(gov, str(tmp_path)), encoding="utf-8") as f:
+            assert json.load(f) == members
+
+
+def test_networks_are_reproducible(df):
+    first = json.dumps(dict(build_networks(df, bootstrap_resamples=20)))
+    assert json.dumps(dict(build_networks(df, bootstrap_resamples=20))) == first
+    assert json.dumps(dict(build_networks(df, bootstrap_resamples=20, seed=7))) != first
+
+
+def test_analytics_cover_every_company(df):
+    for gov, data in build_networks(df, bootstrap_resamples=20):
+        gov_df = df[df["Governorate"] == gov]
+        analytics = data["metrics"]["network_analytics"]
+        assert analytics["population"] == "all_companies"
+        for name in ("post", "pre"):
+            # Hub, industries and every company, not the 50-company sample
+            assert analytics[name]["nodes"] == 1 + gov_df["Industry"].nunique() + len(gov_df)
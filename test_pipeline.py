@@ -0,0 +1,83 @@
+"""Test that pipeline stages are skipped when up to date and rerun when a dependency ran"""
+
+import itertools
+
+import pytest
+
+from syria_bi.pipeline import Pipeline, Stage
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "input.txt").write_text("first")
+    return tmp_path
+
+
+def make_stages(calls):
+    runs = itertools.count()
+
+    def produce():
+        # Output differs on every run
+        calls.append("produce")
+        value = f"{open('input.txt').read()}-{next(runs)}"
+        with open("produced.txt", "w") as f:
+            f.write(value)
+        return {"value": value}
+
+    def summarize(produced):
+        calls.append("summarize")
+        with open("produced.txt") as f:
+            return {"seen": f.read()}
+
+    return [
+        Stage("produce", produce, input_files=["input.txt"], outputs=["produced.txt"]),
+        Stage("summarize", summarize, deps=["produce"]),
+    ]
+
+
+def statuses(pipeline, **kwargs):
+    return {entry["stage"]: entry["status"] for entry in pipeline.run(**kwargs)}
+
+
+def test_unchanged_stages_are_cached(workdir):
+    calls = []
+    assert statuses(Pipeline(make_stages(calls))) == {"produce": "ran", "summarize": "ran"}
+    pipeline = Pipeline(make_stages(calls))
+    assert statuses(pipeline) == {"produce": "cached", "summarize": "cached"}
+    assert calls == ["produce", "summarize"]
+    # A cached stage's value comes back from its manifest
+    assert pipeline.value("summarize") == {"seen": "first-0"}
+
+
+def test_dependents_rerun_when_an_output_is_deleted(workdir):
+    calls = []
+    statuses(Pipeline(make_stages(calls)))
+    (workdir / "produced.txt").unlink()
+    pipeline = Pipeline(make_stages(calls))
+    assert statuses(pipeline) == {"produce": "ran", "summarize": "ran"}
+    assert pipeline.value("summarize") == {"seen": open("produced.txt").read()}
+    assert statuses(Pipeline(make_stages(calls))) == {"produce": "cached", "summarize": "cached"}
+
+
+def test_dependents_rerun_when_an_input_changes(workdir):
+    calls = []
+    statuses(Pipeline(make_stages(calls)))
+    (workdir / "input.txt").write_text("second")
+    pipeline = Pipeline(make_stages(calls))
+    assert statuses(pipeline) == {"produce": "ran", "summarize": "ran"}
+    assert pipeline.value("summarize")["seen"].startswith("second")
+
+
+def test_dependent_reruns_after_dependency_ran_alone(workdir):
+    calls = []
+    pipeline = Pipeline(make_stages(calls))
+    statuses(pipeline)
+    assert statuses(pipeline, targets=["produce"], force=True) == {"produce": "ran"}
+    assert statuses(pipeline) == {"produce": "cached", "summarize": "ran"}
+
+
+def test_dependency_cycle_is_rejected(workdir):
+    stages = [Stage("a", lambda b: b, deps=["b"]), Stage("b", lambda a: a, deps=["a"])]
+    with pytest.raises(ValueError, match="cycle"):
+        Pipeline(stages).order()
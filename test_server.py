@@ -0,0 +1,213 @@
+"""Test start_server.py: telemetry percentiles, request validation, shard diffing and dataset caching"""
+
+import json
+import os
+import socket
+import threading
+
+import numpy as np
+import pytest
+
+import start_server
+from start_server import (
+    COLUMN_STORE_DIR,
+    PERCENTILES,
+    DatasetRegistry,
+    ShardCache,
+    ShardStore,
+    TelemetryStore,
+)
+from syria_bi import RAW_DATA_FILE, load, write_column_store
+
+
+def event(value, name="render_network", view="post", governorate="Aleppo"):
+    return {"name": name, "view": view, "governorate": governorate, "value": value}
+
+
+def test_percentiles_match_nearest_rank():
+    values = np.random.default_rng(4).lognormal(size=537)
+    summary = TelemetryStore.summarize(values.tolist())
+    assert summary["count"] == len(values)
+    assert summary["mean"] == pytest.approx(values.mean())
+    assert summary["max"] == values.max()
+    for p in PERCENTILES:
+        assert summary[f"p{p}"] == np.percentile(values, p, method="inverted_cdf")
+
+
+def test_report_groups_by_metric_view_and_governorate():
+    store = TelemetryStore()
+    store.add([event(v) for v in range(1, 101)], {"Aleppo"})
+    store.add([event(5, governorate="Homs")], {"Aleppo", "Homs"})
+    entry = store.report()["render_network"]["post"]
+    assert entry["all"]["count"] == 101
+    assert entry["governorates"]["Aleppo"]["p90"] == 90
+    assert entry["governorates"]["Homs"]["count"] == 1
+
+
+def test_unknown_keys_are_not_stored():
+    store = TelemetryStore()
+    store.add([
+        event(1, name="made_up"),
+        event(1, view="other"),
+        event(1, name=["render_network"]),
+        event(float("nan")),
+        event(True),
+        event(1, governorate="Atlantis"),
+    ], {"Aleppo"})
+    assert set(store.samples) == {("render_network", "post", None)}
+
+
+def test_samples_per_key_are_capped():
+    store = TelemetryStore(max_samples=10)
+    store.add([event(v) for v in range(100)], {"Aleppo"})
+    assert store.report()["render_network"]["post"]["all"]["count"] == 10
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(start_server, "telemetry", TelemetryStore())
+    httpd = start_server.ThreadingServer(("127.0.0.1", 0), start_server.MyHTTPRequestHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def post(address, length, body=b""):
+    with socket.create_connection(address, timeout=5) as conn:
+        header = f"Content-Length: {length}\r\n" if length is not None else ""
+        conn.sendall(
+            f"POST /api/telemetry HTTP/1.0\r\n{header}Content-Type: application/json\r\n\r\n"
+            .encode("ascii") + body
+        )
+        return int(conn.makefile("rb").readline().split()[1])
+
+
+@pytest.mark.parametrize("length, status", [
+    (None, 400), ("-5", 400), ("abc", 400), ("1_0", 400), ("99999999999", 413),
+])
+def test_invalid_content_length_is_rejected(server, length, status):
+    assert post(server, length) == status
+
+
+def test_valid_post_is_recorded(server):
+    body = json.dumps({"events": [event(12.5)]}).encode("utf-8")
+    assert post(server, str(len(body)), body) == 204
+    assert start_server.telemetry.report()["render_network"]["post"]["all"]["count"] == 1
+
+
+def test_company_index_is_cached_until_the_column_store_changes(tmp_path):
+    df = load(RAW_DATA_FILE)
+    directory = str(tmp_path / COLUMN_STORE_DIR)
+    write_column_store(df.head(50), directory)
+    registry = DatasetRegistry({"main": str(tmp_path)})
+    dataset = registry.datasets["main"]
+    index = registry.company_index(dataset)
+    assert registry.company_index(dataset) is index
+
+    write_column_store(df.head(80), directory)
+    index = registry.company_index(dataset)
+    assert index.company(int(df["Company_ID"].iloc[79])) is not None
+    assert registry.company_index(dataset) is index
+
+
+def write_networks(path, networks):
+    path.write_text(json.dumps(networks))
+    # Coarse file timestamps could hide a rewrite within the same tick
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_shard_cache_announces_changed_and_removed_shards(tmp_path):
+    path = tmp_path / "governorate_networks.json"
+    write_networks(path, {"Aleppo": {"n": 1}, "Homs": {"n": 2}, "Hama": {"n": 3}})
+    shards = ShardCache(str(path))
+    assert shards.refresh()
+    first = shards.manifest()
+    assert first["version"] == 1
+    assert shards.changes_since(0)["changed"] == first["shards"]
+
+    write_networks(path, {"Aleppo": {"n": 1}, "Homs": {"n": 20}, "Idlib": {"n": 4}})
+    assert shards.refresh()
+    changes = shards.changes_since(1)
+    assert changes["version"] == 2
+    assert list(changes["changed"]) == ["Homs", "Idlib"]
+    assert changes["removed"] == ["Hama"]
+    assert shards.manifest()["shards"]["Aleppo"] == first["shards"]["Aleppo"]
+    assert shards.changes_since(2) == {"version": 2, "changed": {}, "removed": []}
+
+
+def test_unchanged_reload_announces_nothing(tmp_path):
+    path = tmp_path / "governorate_networks.json"
+    write_networks(path, {"Aleppo": {"n": 1}, "Homs": {"n": 2}})
+    shards = ShardCache(str(path))
+    shards.refresh()
+    manifest = shards.manifest()
+
+    shards.unload()
+    assert shards.store.bytes == 0
+    assert shards.manifest() == manifest
+    write_networks(path, {"Homs": {"n": 2}, "Aleppo": {"n": 1}})
+    assert not shards.refresh()
+    assert shards.loaded
+    assert shards.manifest() == manifest
+    assert shards.changes_since(manifest["version"])["changed"] == {}
+
+
+def test_identical_shards_share_bytes_across_datasets(tmp_path):
+    store = ShardStore()
+    caches = []
+    for name, homs in (("a", 2), ("b", 20)):
+        path = tmp_path / f"{name}.json"
+        write_networks(path, {"Aleppo": {"n": 1}, "Homs": {"n": homs}})
+        caches.append(ShardCache(str(path), store))
+        caches[-1].refresh()
+    assert len(store.entries) == 3
+    assert store.bytes < sum(cache.size() for cache in caches)
+    caches[0].unload()
+    assert store.bytes == caches[1].size()
+
+
+@pytest.fixture
+def registry(tmp_path):
+    directories = {}
+    for name in ("a", "b", "c"):
+        directory = tmp_path / name
+        directory.mkdir()
+        write_networks(directory / "governorate_networks.json", {"Aleppo": {"payload": name * 1000}})
+        directories[name] = str(directory)
+    # Room for two of the three datasets
+    return DatasetRegistry(directories, budget=2500)
+
+
+def loaded(registry):
+    return sorted(name for name, d in registry.datasets.items() if d.shards.loaded)
+
+
+def test_least_recently_used_dataset_is_evicted(registry):
+    registry.get("a")
+    registry.get("b").company_index = ("stamp", object())
+    registry.get("a")
+    registry.get("c")
+    assert loaded(registry) == ["a", "c"]
+    assert registry.datasets["b"].company_index is None
+    assert registry.store.bytes <= registry.budget
+    assert registry.get("b") is not None
+    assert loaded(registry) == ["b", "c"]
+
+
+def test_datasets_in_use_are_not_evicted(registry):
+    with registry.use("a"), registry.use("b") as dataset:
+        assert dataset.users == 1
+        registry.get("c")
+        # Both older datasets are pinned, so the budget is exceeded for now
+        assert loaded(registry) == ["a", "b", "c"]
+        assert registry.store.bytes > registry.budget
+    # b is released first and, with a still pinned, is the one evicted
+    assert loaded(registry) == ["a", "c"]
+
+
+def test_unknown_dataset_is_none(registry):
+    assert registry.get("missing") is None
+    with registry.use("missing") as dataset:
+        assert dataset is None
@@ -0,0 +1,99 @@
+"""Test that sketch-mode verification matches the exact report and that sketches merge consistently"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from syria_bi import RAW_DATA_FILE, load
+from syria_bi.sketches import DatasetSketch, HyperLogLog, QuantileSketch, read_chunks, sketch_csv
+from syria_bi.verification import (
+    CHECK_COUNTERS,
+    CHECK_SAMPLES,
+    render_verification_report,
+    sketch_for_verification,
+)
+
+
+def copy(sketch):
+    return type(sketch).from_dict(sketch.to_dict())
+
+
+@pytest.mark.parametrize("chunk_size", [97, 1000, 100_000])
+def test_sketch_report_matches_exact_report(chunk_size):
+    exact = render_verification_report(load(RAW_DATA_FILE))
+    sketched = render_verification_report(sketch_for_verification(RAW_DATA_FILE, chunk_size))
+    assert sketched == exact
+
+
+def test_parallel_sketch_matches_serial():
+    options = {"counters": CHECK_COUNTERS, "samples": CHECK_SAMPLES}
+    serial = sketch_csv(RAW_DATA_FILE, chunk_size=150, **options)
+    parallel = sketch_csv(RAW_DATA_FILE, chunk_size=150, workers=2, **options)
+    assert parallel.to_dict() == serial.to_dict()
+
+
+def test_quantile_merge_is_associative_and_accurate():
+    rng = np.random.default_rng(1)
+    parts = [rng.lognormal(size=5000), rng.normal(size=5000), rng.uniform(-3, 50, 5000)]
+    sketches = []
+    for values in parts:
+        sketch = QuantileSketch()
+        sketch.add(values)
+        sketches.append(sketch)
+
+    left = copy(sketches[0])
+    left.merge(sketches[1])
+    left.merge(sketches[2])
+    right = copy(sketches[1])
+    right.merge(sketches[2])
+    right.merge(copy(sketches[0]))
+
+    left_dict, right_dict = left.to_dict(), right.to_dict()
+    assert left_dict.pop("sum") == pytest.approx(right_dict.pop("sum"))
+    assert left_dict == right_dict
+
+    values = np.sort(np.concatenate(parts))
+    for q in (0.01, 0.25, 0.5, 0.9, 0.99):
+        expected = values[int(q * (len(values) - 1))]
+        assert abs(left.quantile(q) - expected) <= 0.01 * abs(expected) + 1e-9
+
+
+@pytest.mark.parametrize("distinct", [1000, 200_000])
+def test_hyperloglog_merge_is_associative(distinct):
+    # 1000 values stay in the exact set; 200k switch to registers
+    values = np.arange(distinct)
+    chunks = np.array_split(np.random.default_rng(2).permutation(values), 3)
+    sketches = []
+    for chunk in chunks:
+        sketch = HyperLogLog(precision=12)
+        sketch.add(pd.Series(chunk))
+        sketches.append(sketch)
+
+    left = copy(sketches[0])
+    left.merge(sketches[1])
+    left.merge(sketches[2])
+    right = copy(sketches[2])
+    right.merge(sketches[1])
+    right.merge(copy(sketches[0]))
+
+    assert left.to_dict() == right.to_dict()
+    assert left.estimate() == pytest.approx(distinct, rel=0.05)
+    if distinct <= left.size:
+        assert left.estimate() == distinct
+
+
+def test_dataset_sketch_merge_matches_single_pass():
+    options = {"counters": CHECK_COUNTERS, "samples": CHECK_SAMPLES}
+    whole = DatasetSketch(**options).update(load(RAW_DATA_FILE))
+    merged = DatasetSketch(**options)
+    for chunk in read_chunks(RAW_DATA_FILE, 211):
+        merged.merge(DatasetSketch(**options).update(chunk))
+
+    assert merged.rows == whole.rows
+    assert merged.counters == whole.counters
+    assert merged.value_counts == whole.value_counts
+    for governorate in [None, *whole.groups]:
+        expected, actual = whole.summary(governorate), merged.summary(governorate)
+        assert actual.keys() == expected.keys()
+        for column, summary in expected.items():
+            assert actual[column] == pytest.approx(summary, nan_ok=True)
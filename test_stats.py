@@ -0,0 +1,60 @@
+"""Test bootstrap confidence intervals: point estimates, determinism and coverage"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from syria_bi import RAW_DATA_FILE, load
+from syria_bi.stats import PAIRED_METRICS, bootstrap_group_means, bootstrap_intervals
+
+
+@pytest.fixture(scope="module")
+def df():
+    return load(RAW_DATA_FILE)
+
+
+def test_point_estimates_match_groupby(df):
+    intervals = bootstrap_intervals(df, ["Governorate", "Industry"], n_resamples=200)
+    for (gov, industry), group in df.groupby(["Governorate", "Industry"]):
+        for name, (pre, post) in PAIRED_METRICS.items():
+            entry = intervals[(gov, industry)][name]
+            assert entry["n"] == len(group)
+            assert entry["mean"] == pytest.approx((group[post] - group[pre]).mean())
+            assert entry["ci_low"] <= entry["mean"] <= entry["ci_high"]
+
+
+def test_same_seed_gives_same_intervals(df):
+    first = bootstrap_intervals(df, "Governorate", n_resamples=300, seed=7)
+    assert bootstrap_intervals(df, "Governorate", n_resamples=300, seed=7) == first
+    assert bootstrap_intervals(df, "Governorate", n_resamples=300, seed=8) != first
+
+
+@pytest.mark.parametrize("block_draws", [1, 1000, 1 << 30])
+def test_block_size_does_not_change_resamples(block_draws):
+    rng = np.random.default_rng(3)
+    values = rng.normal(size=(500, 2))
+    codes = rng.integers(0, 6, size=500)
+    expected = bootstrap_group_means(values, codes, 7, 40, np.random.default_rng(11))
+    actual = bootstrap_group_means(values, codes, 7, 40, np.random.default_rng(11), block_draws)
+    np.testing.assert_array_equal(actual, expected)
+    # Group 6 has no rows
+    assert np.isnan(actual[:, 6]).all()
+
+
+def test_ci_coverage():
+    # 400 groups of 60 companies whose improvements have a known mean of 2
+    rng = np.random.default_rng(5)
+    n_groups, size, true_mean = 400, 60, 2.0
+    rows = n_groups * size
+    frame = pd.DataFrame({"group": np.repeat(np.arange(n_groups), size)})
+    for pre, post in PAIRED_METRICS.values():
+        frame[pre] = rng.uniform(0, 50, rows)
+        frame[post] = frame[pre] + rng.normal(true_mean, 1.5, rows)
+
+    intervals = bootstrap_intervals(frame, "group", n_resamples=500, seed=1)
+    covered = [
+        entry["ci_low"] <= true_mean <= entry["ci_high"]
+        for metrics in intervals.values() for entry in metrics.values()
+    ]
+    assert len(covered) == n_groups * len(PAIRED_METRICS)
+    assert 0.92 <= np.mean(covered) <= 0.98